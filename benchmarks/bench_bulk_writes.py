@@ -0,0 +1,84 @@
+"""Compare entry write throughput: one commit per entry, grouped transaction and bulk API.
+
+Usage:
+    uv run python benchmarks/bench_bulk_writes.py [--entries 5000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "time_tracker"))
+
+from db_operations import Database  # noqa: E402
+
+
+def make_rows(project_id: int, count: int):
+    """Build a week-of-timesheet style list of entry tuples."""
+    return [
+        (project_id, f"2024-01-{i % 7 + 1:02d}", 1.0 + (i % 8) / 2, f"Entry {i}")
+        for i in range(count)
+    ]
+
+
+def single_commits(db: Database, rows):
+    for row in rows:
+        db.create_entry(*row)
+
+
+def grouped_transaction(db: Database, rows):
+    with db.transaction():
+        for row in rows:
+            db.create_entry(*row)
+
+
+def bulk_insert(db: Database, rows):
+    db.create_entries_bulk(rows)
+
+
+def bulk_update(db: Database, rows):
+    entry_ids = [entry[0] for entry in db.get_entries_for_project(rows[0][0])]
+    db.update_entries_bulk(
+        (entry_id, "2024-02-01", 2.0, "Corrected") for entry_id in entry_ids
+    )
+
+
+def bulk_delete(db: Database, rows):
+    entry_ids = [entry[0] for entry in db.get_entries_for_project(rows[0][0])]
+    db.delete_entries_bulk(entry_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=5000, help="number of entries per scenario")
+    args = parser.parse_args()
+
+    scenarios = [
+        ("create_entry, one commit each", single_commits, False),
+        ("create_entry in transaction()", grouped_transaction, False),
+        ("create_entries_bulk", bulk_insert, False),
+        ("update_entries_bulk", bulk_update, True),
+        ("delete_entries_bulk", bulk_delete, True),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database()
+        db.connect(os.path.join(tmp_dir, "bench.db"))
+
+        for index, (label, scenario, needs_data) in enumerate(scenarios):
+            project_id = db.create_project(f"Scenario {index}")
+            rows = make_rows(project_id, args.entries)
+            if needs_data:
+                db.create_entries_bulk(rows)
+
+            start = time.perf_counter()
+            scenario(db, rows)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<32} {args.entries / elapsed:12,.0f} rows/s  ({elapsed * 1000:.1f} ms)")
+
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Compare write and read latency with SQLite defaults vs. the connection profile.
+
+Usage:
+    uv run python benchmarks/bench_connection_profile.py [--entries 2000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "time_tracker"))
+
+from db_operations import Database  # noqa: E402
+
+# SQLite's own defaults, used as the "before" profile
+SQLITE_DEFAULTS = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "cache_size": "-2000",
+    "mmap_size": "0",
+    "temp_store": "DEFAULT",
+    "foreign_keys": "OFF",
+}
+
+
+def run(profile_overrides, entries: int):
+    """Time single-entry writes and per-project reads on a fresh database file."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database()
+        db.connect(os.path.join(tmp_dir, "bench.db"))
+        for pragma, value in profile_overrides.items():
+            db.set_connection_profile(pragma, value)
+
+        project_id = db.create_project("Benchmark")
+
+        write_times = []
+        for i in range(entries):
+            start = time.perf_counter()
+            db.create_entry(project_id, f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}", 1.5, f"Entry {i}")
+            write_times.append(time.perf_counter() - start)
+
+        read_times = []
+        for _ in range(50):
+            start = time.perf_counter()
+            db.get_entries_for_project(project_id, "2024-03-01", "2024-09-30")
+            read_times.append(time.perf_counter() - start)
+
+        db.close()
+    return write_times, read_times
+
+
+def summarize(label: str, times):
+    """Format median and p95 latency in milliseconds."""
+    times = sorted(times)
+    p95 = times[int(len(times) * 0.95) - 1]
+    return f"{label:<8} median {statistics.median(times) * 1000:8.3f} ms   p95 {p95 * 1000:8.3f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=2000, help="number of entries to write")
+    args = parser.parse_args()
+
+    for name, overrides in (("defaults", SQLITE_DEFAULTS), ("profile", {})):
+        write_times, read_times = run(overrides, args.entries)
+        print(f"== {name} ==")
+        print(summarize("write", write_times))
+        print(summarize("read", read_times))
+
+
+if __name__ == "__main__":
+    main()
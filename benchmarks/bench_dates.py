@@ -0,0 +1,242 @@
+"""Compare entry dates stored as ISO text against integer day numbers.
+
+Two databases hold the same generated entries: one in the schema version 7
+layout, with "%Y-%m-%d" text date columns, and one in the current layout,
+with day numbers since 1970-01-01. The same date-range queries and the
+weekly/monthly grouping of the report path are timed on both, then the
+sizes of the entry and daily rollup tables and their indexes are compared.
+
+Usage:
+    uv run python benchmarks/bench_dates.py [--entries 500000] [--projects 200] [--repeat 15]
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import polars as pl
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "time_tracker"))
+
+from db_operations import Database, day_sql, to_day  # noqa: E402
+from suite.datagen import generate_entries  # noqa: E402
+
+# The date-bearing tables in the schema version 7 layout and in the current
+# one, each copied from a generated database into a file of its own
+TEXT_SCHEMA = [
+    """CREATE TABLE entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_id INTEGER NOT NULL,
+        date DATE NOT NULL,
+        hours REAL NOT NULL,
+        description TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    f"""INSERT INTO entries (id, project_id, date, hours, description, created_at)
+        SELECT id, project_id, {day_sql("day")}, hours, description, created_at FROM current.entries""",
+    "CREATE INDEX idx_entries_project_date ON entries (project_id, date)",
+    "CREATE INDEX idx_entries_date ON entries (date)",
+    """CREATE TABLE daily_totals (
+        project_id INTEGER NOT NULL,
+        date DATE NOT NULL,
+        entry_count INTEGER NOT NULL DEFAULT 0,
+        total_hours REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (project_id, date)
+    ) WITHOUT ROWID""",
+    f"""INSERT INTO daily_totals (project_id, date, entry_count, total_hours)
+        SELECT project_id, {day_sql("day")}, entry_count, total_hours FROM current.daily_totals""",
+    "CREATE INDEX idx_daily_totals_date ON daily_totals (date)",
+]
+DAY_SCHEMA = [
+    """CREATE TABLE entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_id INTEGER NOT NULL,
+        day INTEGER NOT NULL,
+        hours REAL NOT NULL,
+        description TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """INSERT INTO entries (id, project_id, day, hours, description, created_at)
+        SELECT id, project_id, day, hours, description, created_at FROM current.entries""",
+    "CREATE INDEX idx_entries_project_day ON entries (project_id, day)",
+    "CREATE INDEX idx_entries_day ON entries (day)",
+    """CREATE TABLE daily_totals (
+        project_id INTEGER NOT NULL,
+        day INTEGER NOT NULL,
+        entry_count INTEGER NOT NULL DEFAULT 0,
+        total_hours REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (project_id, day)
+    ) WITHOUT ROWID""",
+    """INSERT INTO daily_totals (project_id, day, entry_count, total_hours)
+        SELECT project_id, day, entry_count, total_hours FROM current.daily_totals""",
+    "CREATE INDEX idx_daily_totals_day ON daily_totals (day)",
+]
+TEXT_OBJECTS = ("entries", "idx_entries_project_date", "idx_entries_date", "daily_totals", "idx_daily_totals_date")
+DAY_OBJECTS = ("entries", "idx_entries_project_day", "idx_entries_day", "daily_totals", "idx_daily_totals_day")
+
+# (label, text-layout SQL, day-layout SQL); parameters are project_id, first and last date
+QUERIES = [
+    (
+        "hours in a month, all projects",
+        "SELECT COUNT(*), SUM(hours) FROM entries WHERE date BETWEEN ?2 AND ?3",
+        "SELECT COUNT(*), SUM(hours) FROM entries WHERE day BETWEEN ?2 AND ?3",
+    ),
+    (
+        "project entries in a quarter",
+        """SELECT id, date, hours, description, created_at FROM entries
+           WHERE project_id = ?1 AND date BETWEEN ?2 AND ?3 ORDER BY date DESC""",
+        f"""SELECT id, {day_sql("day")}, hours, description, created_at FROM entries
+            WHERE project_id = ?1 AND day BETWEEN ?2 AND ?3 ORDER BY day DESC""",
+    ),
+    (
+        "daily totals in a year",
+        "SELECT project_id, date, entry_count, total_hours FROM daily_totals WHERE date BETWEEN ?2 AND ?3",
+        "SELECT project_id, day, entry_count, total_hours FROM daily_totals WHERE day BETWEEN ?2 AND ?3",
+    ),
+]
+QUERY_SPANS = {
+    "hours in a month, all projects": 30,
+    "project entries in a quarter": 91,
+    "daily totals in a year": 365,
+}
+
+
+def copy_tables(source_path: str, path: str, schema):
+    """Create a database at path by running schema against the attached source database."""
+    conn = sqlite3.connect(path)
+    conn.execute("ATTACH DATABASE ? AS current", (source_path,))
+    with conn:
+        for statement in schema:
+            conn.execute(statement)
+    conn.execute("DETACH DATABASE current")
+    conn.execute("ANALYZE")
+    conn.close()
+    return path
+
+
+def build_databases(tmp_dir: str, projects: int, entries: int):
+    """Generate entries through the Database API, then copy them into both layouts."""
+    source_path = os.path.join(tmp_dir, "source.db")
+    db = Database()
+    db.connect(source_path)
+    with db.transaction():
+        project_ids = [db.create_project(f"Project {index:04d}") for index in range(projects)]
+    start = date.today() - timedelta(days=3 * 365)
+    db.create_entries_bulk(generate_entries(project_ids, entries, start, 3 * 365, seed=0))
+    db.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    db.close()
+    
+    text_path = copy_tables(source_path, os.path.join(tmp_dir, "text.db"), TEXT_SCHEMA)
+    day_path = copy_tables(source_path, os.path.join(tmp_dir, "day.db"), DAY_SCHEMA)
+    return text_path, day_path, start
+
+
+def object_sizes(conn: sqlite3.Connection, names):
+    """Get the bytes used by each table or index, or None where dbstat is not compiled in."""
+    try:
+        rows = dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall())
+    except sqlite3.OperationalError:
+        return None
+    return [rows.get(name, 0) for name in names]
+
+
+def timed(func, repeat: int) -> float:
+    """Median milliseconds of repeated calls of func."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def group_text(conn, first: str, last: str, every: str):
+    df = pl.read_database(
+        "SELECT date AS Date, hours AS Hours FROM entries WHERE date BETWEEN ? AND ?",
+        connection=conn,
+        execute_options={"parameters": [first, last]},
+        schema_overrides={"Date": pl.String, "Hours": pl.Float64},
+    )
+    df = df.with_columns(pl.col("Date").str.to_date("%Y-%m-%d"))
+    return df.group_by(pl.col("Date").dt.truncate(every)).agg(pl.len(), pl.col("Hours").sum())
+
+
+def group_days(conn, first: int, last: int, every: str):
+    df = pl.read_database(
+        "SELECT day AS Date, hours AS Hours FROM entries WHERE day BETWEEN ? AND ?",
+        connection=conn,
+        execute_options={"parameters": [first, last]},
+        schema_overrides={"Date": pl.Int32, "Hours": pl.Float64},
+    )
+    df = df.with_columns(pl.col("Date").cast(pl.Date))
+    return df.group_by(pl.col("Date").dt.truncate(every)).agg(pl.len(), pl.col("Hours").sum())
+
+
+def report(label: str, text_ms: float, day_ms: float):
+    print(f"{label:<34} {text_ms:9.2f} ms {day_ms:9.2f} ms {text_ms / day_ms:7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=500_000, help="number of generated entries")
+    parser.add_argument("--projects", type=int, default=200, help="number of projects")
+    parser.add_argument("--repeat", type=int, default=15, help="runs per measurement, the median is shown")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        text_path, day_path, start = build_databases(tmp_dir, args.projects, args.entries)
+        text_conn = sqlite3.connect(text_path)
+        day_conn = sqlite3.connect(day_path)
+        last_day = start + timedelta(days=3 * 365 - 1)
+        
+        print(f"{args.entries:,} entries, {args.projects} projects")
+        print(f"{'':<34} {'text':>12} {'day':>12} {'speedup':>8}")
+        for label, text_sql, day_sql_text in QUERIES:
+            first = (last_day - timedelta(days=QUERY_SPANS[label] - 1)).isoformat()
+            last = last_day.isoformat()
+            # Project 1 is the busiest with the generator's skewed distribution
+            text_params = (1, first, last)
+            day_params = (1, to_day(first), to_day(last))
+            assert len(text_conn.execute(text_sql, text_params).fetchall()) == \
+                len(day_conn.execute(day_sql_text, day_params).fetchall())
+            report(
+                label,
+                timed(lambda: text_conn.execute(text_sql, text_params).fetchall(), args.repeat),
+                timed(lambda: day_conn.execute(day_sql_text, day_params).fetchall(), args.repeat),
+            )
+        
+        first = (last_day - timedelta(days=364)).isoformat()
+        last = last_day.isoformat()
+        for period, every in (("week", "1w"), ("month", "1mo")):
+            assert group_text(text_conn, first, last, every).sort("Date").equals(
+                group_days(day_conn, to_day(first), to_day(last), every).sort("Date"))
+            report(
+                f"hours per {period} over a year",
+                timed(lambda: group_text(text_conn, first, last, every), args.repeat),
+                timed(lambda: group_days(day_conn, to_day(first), to_day(last), every), args.repeat),
+            )
+        
+        text_sizes = object_sizes(text_conn, TEXT_OBJECTS)
+        day_sizes = object_sizes(day_conn, DAY_OBJECTS)
+        text_conn.close()
+        day_conn.close()
+    
+    if text_sizes is None or day_sizes is None:
+        print("table sizes need SQLite's dbstat table, which this build lacks")
+        return
+    print()
+    print(f"{'':<34} {'text':>12} {'day':>12} {'saved':>8}")
+    for name, text_size, day_size in zip(DAY_OBJECTS, text_sizes, day_sizes):
+        print(f"{name:<34} {text_size / 1_048_576:9.2f} MB {day_size / 1_048_576:9.2f} MB "
+              f"{1 - day_size / text_size:7.0%}")
+    text_total, day_total = sum(text_sizes), sum(day_sizes)
+    print(f"{'total':<34} {text_total / 1_048_576:9.2f} MB {day_total / 1_048_576:9.2f} MB "
+          f"{1 - day_total / text_total:7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Load-test the HTTP API with concurrent keep-alive clients.
+
+The server runs in its own process on a fresh database. Client processes,
+each with several threads, send a mix of single-entry writes and reads for a
+fixed time. Afterwards the number of stored entries is checked against the
+acknowledged writes, and the totals are verified.
+
+Usage:
+    uv run python benchmarks/bench_server.py [--processes 4] [--threads 8] [--duration 10]
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "time_tracker")
+PROJECTS = 20
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(port: int, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("server did not start")
+
+
+def request(conn, method: str, path: str, body=None):
+    data = None if body is None else json.dumps(body).encode()
+    conn.request(method, path, data, {"Content-Type": "application/json"} if data else {})
+    response = conn.getresponse()
+    return response.status, response.read()
+
+
+def client_thread(port: int, deadline: float, read_ratio: float, batch_size: int, results: dict):
+    rng = random.Random()
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    while time.monotonic() < deadline:
+        project_id = rng.randint(1, PROJECTS)
+        if rng.random() < read_ratio:
+            kind = "read"
+            path = rng.choice([f"/projects/{project_id}/totals", f"/entries?project_id={project_id}&limit=20"])
+            start = time.perf_counter()
+            status, _ = request(conn, "GET", path)
+        else:
+            kind = "write"
+            entry = {
+                "project_id": project_id,
+                "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "hours": rng.randint(1, 32) / 4,
+                "description": "load test",
+            }
+            start = time.perf_counter()
+            status, _ = request(conn, "POST", "/entries", [entry] * batch_size if batch_size > 1 else entry)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if status in (200, 201):
+            results[kind].append(elapsed_ms)
+        else:
+            results["errors"].append(status)
+    conn.close()
+
+
+def client_process(port: int, threads: int, duration: float, read_ratio: float, batch_size: int, queue):
+    deadline = time.monotonic() + duration
+    results = {"read": [], "write": [], "errors": []}
+    workers = [
+        threading.Thread(target=client_thread, args=(port, deadline, read_ratio, batch_size, results))
+        for _ in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    queue.put(results)
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=4, help="client processes")
+    parser.add_argument("--threads", type=int, default=8, help="keep-alive connections per process")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load")
+    parser.add_argument("--read-ratio", type=float, default=0.5, help="fraction of requests that are reads")
+    parser.add_argument("--batch-size", type=int, default=1, help="entries per write request")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(SRC_DIR, "cli.py"), "--db", db_path, "serve", "--port", str(port)],
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_server(port)
+            conn = http.client.HTTPConnection("127.0.0.1", port)
+            for number in range(PROJECTS):
+                request(conn, "POST", "/projects", {"name": f"Project {number:02d}"})
+            conn.close()
+            
+            queue = multiprocessing.Queue()
+            clients = [
+                multiprocessing.Process(
+                    target=client_process,
+                    args=(port, args.threads, args.duration, args.read_ratio, args.batch_size, queue),
+                )
+                for _ in range(args.processes)
+            ]
+            started = time.perf_counter()
+            for client in clients:
+                client.start()
+            results = {"read": [], "write": [], "errors": []}
+            for _ in clients:
+                for key, values in queue.get().items():
+                    results[key].extend(values)
+            for client in clients:
+                client.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            server.terminate()
+            server.wait()
+        
+        check = subprocess.run(
+            [sys.executable, os.path.join(SRC_DIR, "cli.py"), "--db", db_path, "check"],
+            capture_output=True, text=True,
+        )
+        sys.path.insert(0, SRC_DIR)
+        from db_operations import Database
+        db = Database()
+        db.connect(db_path)
+        stored = db.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        db.close()
+    
+    requests = len(results["read"]) + len(results["write"])
+    print(f"{args.processes * args.threads} connections, {elapsed:.1f} s, "
+          f"{requests / elapsed:,.0f} requests/s, {len(results['errors'])} errors")
+    for kind in ("read", "write"):
+        latencies = results[kind]
+        if latencies:
+            print(f"{kind:<6} {len(latencies) / elapsed:8,.0f}/s  median {statistics.median(latencies):6.2f} ms  "
+                  f"p99 {percentile(latencies, 0.99):6.2f} ms")
+    acknowledged = len(results["write"]) * args.batch_size
+    print(f"entries acknowledged {acknowledged}, stored {stored}: {'ok' if acknowledged == stored else 'MISMATCH'}")
+    print(check.stdout.strip() or check.stderr.strip())
+
+
+if __name__ == "__main__":
+    main()
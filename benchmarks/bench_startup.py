@@ -0,0 +1,98 @@
+"""Measure time-to-first-frame of Application.main on a cold and a warm database.
+
+Each run happens in a fresh interpreter so module imports are part of the
+measurement. The page is a headless stand-in: the first frame is the built
+projects view, without rendering.
+
+Usage:
+    uv run python benchmarks/bench_startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "time_tracker")
+
+# Runs in a child interpreter; prints a JSON object of timings in seconds
+CHILD_SCRIPT = """
+import asyncio
+import json
+import sys
+import time
+
+start = time.perf_counter()
+sys.path.insert(0, {src_dir!r})
+import main as app_module
+imported = time.perf_counter()
+
+
+class HeadlessPage:
+    def __init__(self):
+        self.controls = []
+
+    def add(self, *controls):
+        self.controls.extend(controls)
+
+    def update(self):
+        pass
+
+    def show_dialog(self, dialog):
+        pass
+
+    def pop_dialog(self):
+        pass
+
+
+async def first_frame():
+    app = app_module.Application()
+    app.update_content = lambda content: setattr(app.content, "content", content)
+    await app.main(HeadlessPage())
+    await app.db.close()
+
+
+asyncio.run(first_frame())
+done = time.perf_counter()
+print(json.dumps({{
+    "import": imported - start,
+    "main": done - imported,
+    "total": done - start,
+    "polars_loaded": "polars" in sys.modules,
+}}))
+"""
+
+
+def run_once(db_path: str):
+    """Start a fresh interpreter and return its timings."""
+    env = dict(os.environ, TIME_TRACKER_DB_PATH=db_path)
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT.format(src_dir=SRC_DIR)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="number of runs per scenario")
+    args = parser.parse_args()
+
+    results = {"cold": [], "warm": []}
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "bench.db")
+            results["cold"].append(run_once(db_path))
+            results["warm"].append(run_once(db_path))
+
+    for scenario, runs in results.items():
+        print(f"== {scenario} database ==")
+        for key in ("import", "main", "total"):
+            print(f"{key:<8} median {statistics.median(run[key] for run in runs) * 1000:8.1f} ms")
+        print(f"polars loaded at startup: {any(run['polars_loaded'] for run in runs)}")
+
+
+if __name__ == "__main__":
+    main()
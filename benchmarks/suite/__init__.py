@@ -0,0 +1,10 @@
+"""Benchmark suite: synthetic data generation and timing of database and view code.
+
+Usage:
+    uv run python -m benchmarks.suite --projects 1000 --entries 1000000 --output results.json
+"""
+import os
+import sys
+
+# The application modules import each other flat, as under `flet run`
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src", "time_tracker"))
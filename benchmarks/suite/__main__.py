@@ -0,0 +1,193 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from . import __doc__ as SUITE_DOC
+from .datagen import generate_database
+from .views import build_report, make_application
+
+from db_operations import Database  # noqa: E402
+
+
+def summarize(times):
+    """Summarize a list of durations in seconds as milliseconds."""
+    times = sorted(times)
+    return {
+        "runs": len(times),
+        "median_ms": statistics.median(times) * 1000,
+        "min_ms": times[0] * 1000,
+        "p95_ms": times[max(int(len(times) * 0.95) - 1, 0)] * 1000,
+    }
+
+
+def measure(func, *args, repeat: int):
+    """Time repeated calls of func(*args)."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return summarize(times)
+
+
+async def measure_async(func, *args, repeat: int):
+    """Time repeated awaits of func(*args)."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func(*args)
+        times.append(time.perf_counter() - start)
+    return summarize(times)
+
+
+def busiest_project(db: Database):
+    """Get the ID of the project with the most entries."""
+    return max(db.get_project_summaries(), key=lambda row: row[3])[0]
+
+
+def bench_database(db_path: str, repeat: int):
+    """Time the Database methods; write benchmarks run last as they change the data."""
+    db = Database()
+    db.connect(db_path)
+    project_id = busiest_project(db)
+    to_date = date.today().isoformat()
+    from_date = (date.today() - timedelta(days=90)).isoformat()
+    
+    results = {
+        "get_all_projects": measure(db.get_all_projects, repeat=repeat),
+        "get_project_summaries": measure(db.get_project_summaries, repeat=repeat),
+        "get_entries_for_project": measure(db.get_entries_for_project, project_id, repeat=repeat),
+        "get_entries_for_project_90_days": measure(
+            db.get_entries_for_project, project_id, from_date, to_date, repeat=repeat
+        ),
+        "get_entries_page": measure(db.get_entries_page, [project_id], repeat=repeat),
+        # Each generated description word is in about one entry in eight, the worst case for ranking
+        "search_entries": measure(db.search_entries, "client", repeat=repeat),
+        "search_entries_90_days": measure(db.search_entries, "client", from_date, to_date, repeat=repeat),
+        "create_entry": measure(db.create_entry, project_id, to_date, 1.0, "Benchmark", repeat=repeat),
+    }
+    
+    # Each run deletes a different project, the busiest ones first
+    victims = [row[0] for row in sorted(db.get_project_summaries(), key=lambda row: -row[3])[:repeat]]
+    times = []
+    for victim in victims:
+        start = time.perf_counter()
+        db.delete_project(victim)
+        times.append(time.perf_counter() - start)
+    results["delete_project"] = summarize(times)
+    
+    db.close()
+    return results
+
+
+async def bench_views(db_path: str, repeat: int):
+    """Time headless construction of the projects, project detail and report views."""
+    app = await make_application(db_path)
+    project_id = await app.db.run(busiest_project, app.db.db)
+    from_date = datetime.now() - timedelta(days=90)
+    
+    results = {
+        "show_projects_view": await measure_async(app.show_projects_view, repeat=repeat),
+        "view_project_detail": await measure_async(app.view_project_detail, project_id, repeat=repeat),
+        "generate_report_project": await measure_async(
+            build_report, app, str(project_id), "none", repeat=repeat
+        ),
+        "generate_report_project_by_week": await measure_async(
+            build_report, app, str(project_id), "week", repeat=repeat
+        ),
+        "generate_report_all_by_month": await measure_async(
+            build_report, app, "all", "month", repeat=repeat
+        ),
+        "generate_report_all_90_days": await measure_async(
+            build_report, app, "all", "none", from_date, None, repeat=repeat
+        ),
+    }
+    await app.db.close()
+    return results
+
+
+def git_commit():
+    """Get the current commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path: str):
+    """Print the median change of each benchmark against a previous results file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["median_ms"], result["median_ms"]
+        print(f"{name:<36} {before:10.2f} ms -> {after:10.2f} ms  ({(after / before - 1) * 100:+6.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=SUITE_DOC.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=100, help="number of projects to generate")
+    parser.add_argument("--entries", type=int, default=100_000, help="number of entries to generate")
+    parser.add_argument("--years", type=int, default=3, help="years of history to spread entries over")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the generator")
+    parser.add_argument("--repeat", type=int, default=10, help="runs per benchmark")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "time_tracker_bench"),
+                        help="where generated databases are kept between runs")
+    parser.add_argument("--output", default="benchmark_results.json", help="results file to write")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args()
+    
+    os.makedirs(args.data_dir, exist_ok=True)
+    name = f"p{args.projects}_e{args.entries}_y{args.years}_s{args.seed}.db"
+    start = time.perf_counter()
+    source = generate_database(os.path.join(args.data_dir, name), args.projects, args.entries, args.years, args.seed)
+    print(f"dataset {source} ready in {time.perf_counter() - start:.1f} s")
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Views first, on a copy, since the database benchmarks delete projects
+        for label, runner in (("view", lambda path: asyncio.run(bench_views(path, args.repeat))),
+                              ("db", lambda path: bench_database(path, args.repeat))):
+            working_copy = os.path.join(tmp_dir, f"{label}.db")
+            shutil.copyfile(source, working_copy)
+            for bench_name, result in runner(working_copy).items():
+                results[f"{label}.{bench_name}"] = result
+                print(f"{label + '.' + bench_name:<44} median {result['median_ms']:10.2f} ms")
+    
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "projects": args.projects,
+            "entries": args.entries,
+            "years": args.years,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+    
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Generate synthetic time tracker databases at a configurable scale."""
+import os
+import random
+from datetime import date, timedelta
+
+from db_operations import Database
+
+DESCRIPTIONS = (
+    "Code review",
+    "Planning meeting",
+    "Bug fixing",
+    "Client call",
+    "Documentation",
+    "Feature work",
+    "Testing",
+    "",
+)
+BATCH_SIZE = 50_000
+
+
+def generate_entries(project_ids, count: int, start: date, days: int, seed: int):
+    """Yield (project_id, date, hours, description) tuples with a skewed project distribution."""
+    rng = random.Random(seed)
+    # A few busy projects and a long tail, as in real timesheets
+    weights = [1 / (rank + 1) for rank in range(len(project_ids))]
+    for project_id in rng.choices(project_ids, weights=weights, k=count):
+        yield (
+            project_id,
+            (start + timedelta(days=rng.randrange(days))).isoformat(),
+            rng.choice((0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 4.0, 8.0)),
+            rng.choice(DESCRIPTIONS),
+        )
+
+
+def generate_database(path: str, projects: int, entries: int, years: int = 3, seed: int = 0) -> str:
+    """Create a database at path with the given number of projects and entries.
+    
+    Entries are spread over the last `years` years. An existing file at path
+    is reused as is, so large datasets are only generated once.
+    """
+    if os.path.exists(path):
+        return path
+    
+    db = Database()
+    db.connect(path)
+    try:
+        with db.transaction():
+            project_ids = [db.create_project(f"Project {index:05d}") for index in range(projects)]
+        
+        days = 365 * years
+        start = date.today() - timedelta(days=days)
+        batch = []
+        for row in generate_entries(project_ids, entries, start, days, seed):
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                db.create_entries_bulk(batch)
+                batch = []
+        if batch:
+            db.create_entries_bulk(batch)
+        
+        # Fold the WAL into the main file so the database can be copied on its own
+        db.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        db.close()
+    return path
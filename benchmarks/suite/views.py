@@ -0,0 +1,47 @@
+"""Headless construction of the application's view control trees."""
+import main as app_module
+
+
+class HeadlessPage:
+    """Minimal stand-in for flet.Page: controls are built but never rendered."""
+    
+    def __init__(self):
+        self.controls = []
+    
+    def add(self, *controls):
+        self.controls.extend(controls)
+    
+    def update(self):
+        pass
+    
+    def show_dialog(self, dialog):
+        pass
+    
+    def pop_dialog(self):
+        pass
+
+
+async def make_application(db_path: str):
+    """Create an Application on a headless page, connected to the database at db_path."""
+    app = app_module.Application()
+    app.page = HeadlessPage()
+    app.content = app_module.Container()
+    app.update_content = lambda content: setattr(app.content, "content", content)
+    await app.db.run(app.db.db.connect, db_path)
+    return app
+
+
+async def build_report(app, project_id, group_by: str, from_date=None, to_date=None):
+    """Build the Reports view and generate a report for one project or "all"."""
+    await app.show_report_view()
+    # The report area is never mounted on a page, so there is nothing to push
+    app.report_content.update = lambda: None
+    if project_id == "all":
+        app.report_projects = None
+    else:
+        project = await app.db.get_project(project_id)
+        app.report_projects = [(project[0], project[1])]
+    app.report_group_dropdown.value = group_by
+    app.from_date = from_date
+    app.to_date = to_date
+    await app.generate_report()
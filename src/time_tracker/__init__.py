@@ -1,6 +1,6 @@
 import flet
 from .main import Application
-from .db_operations import Database
+from .db_operations import Database, AsyncDatabase
 
 try:
     from importlib.metadata import version, PackageNotFoundError
@@ -14,6 +14,8 @@ except PackageNotFoundError:
 
 
 def run():
-    """Run the Time tracker application."""
-    app = Application()
-    flet.run(main=app.main)
+    """Run the Time tracker application, with one Application per page session."""
+    async def main(page: flet.Page):
+        await Application().main(page)
+    
+    flet.run(main=main)
@@ -0,0 +1,220 @@
+import glob
+import os
+import re
+import uuid
+from datetime import date, datetime
+import polars as pl
+from db_operations import to_day
+
+# Archived entries are stored as Parquet files partitioned by project and year:
+#   <archive dir>/project_id=<id>/year=<yyyy>/part-<batch>.parquet
+# Partition values live in the directory names, not in the files.
+ARCHIVE_FILE_SCHEMA = {
+    "id": pl.Int64,
+    "date": pl.Date,
+    "hours": pl.Float64,
+    "description": pl.String,
+    "created_at": pl.String,
+}
+ARCHIVE_PARTITION_SCHEMA = {
+    "project_id": pl.Int64,
+    "year": pl.Int32,
+}
+PENDING_SUFFIX = ".tmp"
+
+
+def _archive_files(archive_dir: str, pattern: str = "*.parquet"):
+    return glob.glob(os.path.join(archive_dir, "project_id=*", "year=*", pattern))
+
+
+def recover_archive(db):
+    """Finish or discard files left pending by an interrupted archive run.
+    
+    Files are written with a pending suffix and renamed only after the
+    entries were removed from the database. A pending file whose batch was
+    committed is renamed; any other pending file is deleted, as its entries
+    are still in the database.
+    """
+    archive_dir = db.get_archive_dir()
+    if archive_dir is None:
+        return
+    
+    pending = _archive_files(archive_dir, f"*.parquet{PENDING_SUFFIX}")
+    if not pending:
+        return
+    committed = db.get_archive_batches()
+    for path in pending:
+        batch = os.path.basename(path)[len("part-"):-len(f".parquet{PENDING_SUFFIX}")]
+        if batch in committed:
+            os.replace(path, path[:-len(PENDING_SUFFIX)])
+        else:
+            os.remove(path)
+
+
+def archive_entries(db, cutoff: str) -> int:
+    """Move entries dated before cutoff ("%Y-%m-%d") from SQLite to the Parquet archive.
+    
+    Entries are read and removed in one write transaction, so none can be
+    added or changed in between. Totals and aggregate reports keep including
+    them. Returns the number of entries archived.
+    """
+    archive_dir = db.get_archive_dir()
+    if archive_dir is None:
+        raise ValueError("In-memory databases cannot be archived")
+    cutoff_day = to_day(cutoff)
+    recover_archive(db)
+    
+    batch = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    written = []
+    try:
+        with db.transaction(immediate=True):
+            df = pl.read_database(
+                """SELECT id, project_id, day AS date, hours, description, created_at
+                   FROM entries WHERE day < ? ORDER BY project_id, day, id""",
+                connection=db.conn,
+                execute_options={"parameters": [cutoff_day]},
+                schema_overrides={**ARCHIVE_FILE_SCHEMA, "date": pl.Int32, "project_id": pl.Int64},
+            )
+            if df.is_empty():
+                return 0
+            
+            df = df.with_columns(pl.col("date").cast(pl.Date))
+            df = df.with_columns(pl.col("date").dt.year().cast(pl.Int32).alias("year"))
+            for (project_id, year), partition in df.group_by(["project_id", "year"]):
+                partition_dir = os.path.join(archive_dir, f"project_id={project_id}", f"year={year}")
+                os.makedirs(partition_dir, exist_ok=True)
+                path = os.path.join(partition_dir, f"part-{batch}.parquet{PENDING_SUFFIX}")
+                partition.select(ARCHIVE_FILE_SCHEMA.keys()).write_parquet(path, statistics=True)
+                written.append(path)
+            
+            archived = db.remove_archived_entries(cutoff, batch)
+    except BaseException:
+        for path in written:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    
+    for path in written:
+        os.replace(path, path[:-len(PENDING_SUFFIX)])
+    return archived
+
+
+def scan_archive(db, project_ids=None, from_date: str = None, to_date: str = None):
+    """Lazily scan archived entries, or return None if there are none.
+    
+    Project and date filters are pushed down to partition pruning and Parquet
+    row-group statistics. Columns are id, date (pl.Date), hours, description,
+    created_at, project_id and year.
+    """
+    archive_dir = db.get_archive_dir()
+    if archive_dir is None or not _archive_files(archive_dir):
+        return None
+    
+    lazy_frame = pl.scan_parquet(
+        os.path.join(archive_dir, "**", "*.parquet"),
+        hive_partitioning=True,
+        hive_schema=ARCHIVE_PARTITION_SCHEMA,
+        schema=ARCHIVE_FILE_SCHEMA,
+    )
+    if project_ids is not None:
+        lazy_frame = lazy_frame.filter(pl.col("project_id").is_in([int(project_id) for project_id in project_ids]))
+    if from_date:
+        from_date = date.fromisoformat(from_date)
+        lazy_frame = lazy_frame.filter((pl.col("year") >= from_date.year) & (pl.col("date") >= from_date))
+    if to_date:
+        to_date = date.fromisoformat(to_date)
+        lazy_frame = lazy_frame.filter((pl.col("year") <= to_date.year) & (pl.col("date") <= to_date))
+    return lazy_frame
+
+
+def get_archived_entries(db, project_id: int, from_date: str = None, to_date: str = None):
+    """Get a project's archived entries as rows of (id, date, hours, description, created_at), newest first."""
+    lazy_frame = scan_archive(db, [project_id], from_date, to_date)
+    if lazy_frame is None:
+        return []
+    return (
+        lazy_frame.sort(["date", "id"], descending=True)
+        .select(pl.col("id"), pl.col("date").dt.strftime("%Y-%m-%d"), "hours", "description", "created_at")
+        .collect()
+        .rows()
+    )
+
+
+def _project_names(db):
+    """Get a lazy frame of project_id and Project (name) for joining archived entries."""
+    return pl.LazyFrame(
+        [(project_id, name) for project_id, name, _ in db.get_all_projects()],
+        schema={"project_id": pl.Int64, "Project": pl.String},
+        orient="row",
+    )
+
+
+def load_archived_report_frame(db, project_ids=None, from_date: str = None, to_date: str = None):
+    """Load archived entries as a report frame (Project, Date, Hours, Description), or None."""
+    lazy_frame = scan_archive(db, project_ids, from_date, to_date)
+    if lazy_frame is None:
+        return None
+    
+    return (
+        lazy_frame.join(_project_names(db), on="project_id")
+        .select(
+            "Project",
+            pl.col("date").alias("Date"),
+            pl.col("hours").alias("Hours"),
+            pl.col("description").fill_null("").alias("Description"),
+        )
+        .collect()
+    )
+
+
+def iter_archived_chunks(db, project_ids=None, from_date: str = None, to_date: str = None,
+                         chunk_size: int = 10_000):
+    """Yield archived entries in chunks of (project_name, date, hours, description) rows, newest first.
+    
+    Year partitions are read one at a time, so at most a year of archived
+    entries is held in memory.
+    """
+    lazy_frame = scan_archive(db, project_ids, from_date, to_date)
+    if lazy_frame is None:
+        return
+    
+    names = _project_names(db)
+    year_dirs = glob.glob(os.path.join(glob.escape(db.get_archive_dir()), "project_id=*", "year=*"))
+    for year in sorted({int(os.path.basename(path)[len("year="):]) for path in year_dirs}, reverse=True):
+        df = (
+            lazy_frame.filter(pl.col("year") == year)
+            .join(names, on="project_id")
+            .sort("date", descending=True)
+            .select(
+                "Project",
+                pl.col("date").dt.strftime("%Y-%m-%d"),
+                "hours",
+                pl.col("description").fill_null(""),
+            )
+            .collect()
+        )
+        for offset in range(0, df.height, chunk_size):
+            yield df.slice(offset, chunk_size).rows()
+
+
+def search_archived_entries(db, terms, from_date: str = None, to_date: str = None, limit: int = 50):
+    """Get archived entries whose description has a word starting with each of terms.
+    
+    Matching is case-insensitive, like the full-text index of live entries.
+    Returns up to limit rows of (id, project_name, date, hours, description,
+    project_id), newest first.
+    """
+    lazy_frame = scan_archive(db, None, from_date, to_date)
+    if lazy_frame is None or not terms:
+        return []
+    
+    for term in terms:
+        lazy_frame = lazy_frame.filter(pl.col("description").str.contains(rf"(?i)\b{re.escape(term)}"))
+    return (
+        lazy_frame.join(_project_names(db), on="project_id")
+        .sort(["date", "id"], descending=True)
+        .head(limit)
+        .select("id", "Project", pl.col("date").dt.strftime("%Y-%m-%d"), "hours", "description", "project_id")
+        .collect()
+        .rows()
+    )
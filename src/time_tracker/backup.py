@@ -0,0 +1,332 @@
+import glob
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from db_operations import Database, day_sql, get_archive_dir
+
+# Snapshots are complete SQLite files next to the database, each with the
+# archive files of the batches it knows in a directory beside it:
+#   <database dir>/backups/<database name>-<yyyymmdd>-<hhmmss>[-<label>].db
+#   <database dir>/backups/<database name>-<yyyymmdd>-<hhmmss>[-<label>]-archive/
+BACKUP_DIR_NAME = "backups"
+SNAPSHOT_ARCHIVE_SUFFIX = "-archive"
+# Archive files of batches unknown to a restored database
+ORPHANED_SUFFIX = ".orphaned"
+BACKUP_PAGES_PER_STEP = 1024
+PENDING_SUFFIX = ".tmp"
+DEFAULT_BACKUP_KEEP = 7
+
+# Settings: hours between scheduled backups (0 turns them off), snapshots kept, last result
+BACKUP_INTERVAL_SETTING = "backup.interval_hours"
+BACKUP_KEEP_SETTING = "backup.keep"
+BACKUP_LAST_SETTING = "backup.last"
+# Seconds between checks of the schedule
+SCHEDULE_CHECK_INTERVAL = 60
+
+logger = logging.getLogger("time_tracker.backup")
+
+
+def get_backup_dir(db_path: str):
+    """Get the backup directory of a database, or None for in-memory databases."""
+    if not db_path or db_path == ":memory:":
+        return None
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), BACKUP_DIR_NAME)
+
+
+def list_backups(db_path: str):
+    """Get the database's snapshots as rows of (path, modified timestamp, size in bytes), newest first."""
+    backup_dir = get_backup_dir(db_path)
+    if backup_dir is None:
+        return []
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    paths = glob.glob(os.path.join(glob.escape(backup_dir), f"{glob.escape(stem)}-*.db"))
+    backups = [(path, os.path.getmtime(path), os.path.getsize(path)) for path in paths]
+    return sorted(backups, key=lambda backup: (backup[1], backup[0]), reverse=True)
+
+
+def get_snapshot_archive_dir(path: str) -> str:
+    """Get the directory holding the archive files of a snapshot."""
+    return f"{os.path.splitext(path)[0]}{SNAPSHOT_ARCHIVE_SUFFIX}"
+
+
+def _archive_files(archive_dir: str, suffix: str = ""):
+    """Map (partition directory, batch) to the path of each archive file ending in .parquet + suffix."""
+    files = {}
+    if archive_dir is None or not os.path.isdir(archive_dir):
+        return files
+    pattern = os.path.join(glob.escape(archive_dir), "project_id=*", "year=*", f"part-*.parquet{suffix}")
+    for path in glob.glob(pattern):
+        partition = os.path.relpath(os.path.dirname(path), archive_dir)
+        batch = os.path.basename(path)[len("part-"):-len(f".parquet{suffix}")]
+        files[(partition, batch)] = path
+    return files
+
+
+def _link_or_copy(source_path: str, target_path: str):
+    """Hard-link an archive file, or copy it where links are not supported; archive files are never modified."""
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    try:
+        os.link(source_path, target_path)
+    except OSError:
+        shutil.copy2(source_path, target_path)
+
+
+def _get_batches(conn: sqlite3.Connection):
+    """Get the archive batches recorded in a database of any schema version."""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'archive_batches'").fetchone():
+        return set()
+    return {row[0] for row in conn.execute("SELECT name FROM archive_batches")}
+
+
+def _get_archived_partitions(conn: sqlite3.Connection):
+    """Get the archive partition directories that a database's archived totals refer to."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(archived_daily_totals)")}
+    if not columns:
+        return set()
+    day = day_sql("day") if "day" in columns else "date"
+    rows = conn.execute(f"SELECT DISTINCT project_id, strftime('%Y', {day}) FROM archived_daily_totals")
+    return {os.path.join(f"project_id={project_id}", f"year={int(year)}") for project_id, year in rows}
+
+
+def _copy(source: sqlite3.Connection, target: sqlite3.Connection, progress=None) -> int:
+    """Copy source into target in page-limited steps; returns the number of pages copied."""
+    pages = 0
+    
+    def on_step(status, remaining, total):
+        nonlocal pages
+        pages = total
+        if progress is not None:
+            progress(total - remaining, total)
+    
+    source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=on_step)
+    return pages
+
+
+def create_backup(db_path: str, keep: int = DEFAULT_BACKUP_KEEP, label: str = None, progress=None):
+    """Take a consistent snapshot of the database while it stays in use.
+    
+    Pages are copied BACKUP_PAGES_PER_STEP at a time on the calling thread,
+    so run this off the UI. A read transaction held across all steps pins
+    the snapshot: concurrent writes do not restart the copy and, in WAL mode,
+    are not blocked by it. progress(copied, total) is called after each step.
+    The archive files of the batches in the snapshot are hard-linked (or
+    copied) next to it. The snapshot is written under a pending name and
+    renamed when complete, then all but the newest `keep` snapshots are deleted.
+    
+    Returns (path, pages, seconds).
+    """
+    backup_dir = get_backup_dir(db_path)
+    if backup_dir is None:
+        raise ValueError("In-memory databases cannot be backed up")
+    os.makedirs(backup_dir, exist_ok=True)
+    
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    name = f"{stem}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    if label:
+        name = f"{name}-{label}"
+    path = os.path.join(backup_dir, f"{name}.db")
+    suffix = 1
+    while os.path.exists(path):
+        suffix += 1
+        path = os.path.join(backup_dir, f"{name}-{suffix}.db")
+    
+    pending = path + PENDING_SUFFIX
+    snapshot_archive_dir = get_snapshot_archive_dir(path)
+    start = time.perf_counter()
+    source = sqlite3.connect(db_path)
+    try:
+        # Reading the batches starts the read transaction that pins the snapshot
+        source.execute("BEGIN")
+        batches = _get_batches(source)
+        target = sqlite3.connect(pending)
+        try:
+            pages = _copy(source, target, progress)
+            # Make the snapshot a single self-contained file
+            target.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            target.close()
+        
+        # Files are renamed from pending only after their batch commits, so either name may hold it
+        archive_dir = get_archive_dir(db_path)
+        archive_files = {**_archive_files(archive_dir, PENDING_SUFFIX), **_archive_files(archive_dir)}
+        for (partition, batch), file_path in archive_files.items():
+            if batch in batches:
+                _link_or_copy(file_path, os.path.join(snapshot_archive_dir, partition, f"part-{batch}.parquet"))
+        os.replace(pending, path)
+    except BaseException:
+        if os.path.exists(pending):
+            os.remove(pending)
+        shutil.rmtree(snapshot_archive_dir, ignore_errors=True)
+        raise
+    finally:
+        source.close()
+    seconds = time.perf_counter() - start
+    
+    rotate_backups(db_path, keep)
+    return path, pages, seconds
+
+
+def rotate_backups(db_path: str, keep: int, protected=()):
+    """Delete all but the newest `keep` snapshots, and never those in protected; keep 0 keeps them all."""
+    if not keep:
+        return
+    protected = {os.path.abspath(path) for path in protected}
+    for old_path, _, _ in list_backups(db_path)[keep:]:
+        if os.path.abspath(old_path) in protected:
+            continue
+        os.remove(old_path)
+        shutil.rmtree(get_snapshot_archive_dir(old_path), ignore_errors=True)
+
+
+def record_backup(db: Database, path: str, pages: int, seconds: float):
+    """Store the result of a backup in settings, for display."""
+    db.set_setting(BACKUP_LAST_SETTING, json.dumps({
+        "at": datetime.now().isoformat(timespec="seconds"),
+        "path": path,
+        "pages": pages,
+        "seconds": round(seconds, 3),
+    }))
+
+
+def get_last_backup(db: Database):
+    """Get the last recorded backup as a dict of at, path, pages and seconds, or None."""
+    value = db.get_setting(BACKUP_LAST_SETTING)
+    return json.loads(value) if value else None
+
+
+def restore_backup(db: Database, path: str):
+    """Replace the contents of db's database with a snapshot.
+    
+    The archive is first checked to hold every partition the snapshot's
+    archived totals refer to, taking files from the live archive, its
+    orphaned files and the snapshot's own archive copy; a ValueError is
+    raised if any is missing. The current contents are then saved as a
+    "pre-restore" snapshot. The snapshot is copied in through db's own
+    connection, so other connections see the restored data on their next
+    read; its schema is then upgraded if it is older. Old snapshots are
+    rotated only once the restore has succeeded, and never the restored one.
+    
+    Afterwards the archive holds exactly the snapshot's batches: files of
+    other batches hold entries that are live again and get a ".orphaned"
+    suffix, orphaned files of its batches get their name back, and files
+    missing from the archive are taken from the snapshot's copy.
+    
+    Returns (path of the pre-restore snapshot, pages restored).
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"No such backup: {path}")
+    
+    keep = int(db.get_setting(BACKUP_KEEP_SETTING, DEFAULT_BACKUP_KEEP))
+    source = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        batches = _get_batches(source)
+        partitions = _get_archived_partitions(source)
+        archive_dir = db.get_archive_dir()
+        live_files = _archive_files(archive_dir)
+        orphaned_files = _archive_files(archive_dir, ORPHANED_SUFFIX)
+        snapshot_files = _archive_files(get_snapshot_archive_dir(path))
+        known_files = {**snapshot_files, **orphaned_files, **live_files}
+        available = {partition for partition, batch in known_files if batch in batches}
+        missing = sorted(partitions - available)
+        if missing:
+            raise ValueError(
+                f"Cannot restore {os.path.basename(path)}: archive files are missing for {len(missing)} "
+                f"partitions, e.g. {missing[0]}"
+            )
+        
+        # Rotating now could delete the snapshot being restored
+        saved_path, _, _ = create_backup(db.db_path, keep=0, label="pre-restore")
+        if db.conn.in_transaction:
+            db.conn.commit()
+        pages = _copy(source, db.conn)
+    finally:
+        source.close()
+    db.invalidate_cache()
+    db._cache_data_version = None
+    db._ensure_schema()
+    
+    for (partition, batch), file_path in live_files.items():
+        if batch not in batches:
+            os.replace(file_path, f"{file_path}{ORPHANED_SUFFIX}")
+    for key, file_path in orphaned_files.items():
+        if key[1] in batches and key not in live_files:
+            os.replace(file_path, file_path[:-len(ORPHANED_SUFFIX)])
+    for key, file_path in snapshot_files.items():
+        if key[1] in batches and key not in live_files and key not in orphaned_files:
+            _link_or_copy(file_path, os.path.join(archive_dir, key[0], f"part-{key[1]}.parquet"))
+    
+    rotate_backups(db.db_path, keep, protected=(path, saved_path))
+    return saved_path, pages
+
+
+class BackupScheduler:
+    """Take a backup in a daemon thread whenever the interval set in settings has passed.
+    
+    There is one scheduler per database file, shared by all sessions of the
+    process. The interval and the number of snapshots kept are re-read from
+    settings on every check.
+    """
+    
+    _schedulers = {}
+    _schedulers_lock = threading.Lock()
+    
+    def __init__(self, db_path: str, check_interval: float = SCHEDULE_CHECK_INTERVAL):
+        self.db_path = db_path
+        self.check_interval = check_interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="time-tracker-backup", daemon=True)
+    
+    @classmethod
+    def start_for_path(cls, db_path: str):
+        """Start the scheduler of db_path unless it is running; returns it, or None for in-memory databases."""
+        if get_backup_dir(db_path) is None:
+            return None
+        db_path = os.path.abspath(db_path)
+        with cls._schedulers_lock:
+            scheduler = cls._schedulers.get(db_path)
+            if scheduler is None:
+                scheduler = cls._schedulers[db_path] = cls(db_path)
+                scheduler._thread.start()
+            return scheduler
+    
+    def stop(self):
+        """Stop checking the schedule; a backup in progress is finished first."""
+        self._stop.set()
+        self._thread.join()
+        with self._schedulers_lock:
+            if self._schedulers.get(self.db_path) is self:
+                del self._schedulers[self.db_path]
+    
+    def run_if_due(self):
+        """Take a backup if the interval has passed since the newest snapshot; returns its result or None."""
+        db = Database()
+        db.connect(self.db_path)
+        try:
+            interval_hours = float(db.get_setting(BACKUP_INTERVAL_SETTING, "0") or 0)
+            keep = int(db.get_setting(BACKUP_KEEP_SETTING, DEFAULT_BACKUP_KEEP))
+            if interval_hours <= 0:
+                return None
+            backups = list_backups(self.db_path)
+            if backups and time.time() - backups[0][1] < interval_hours * 3600:
+                return None
+            
+            path, pages, seconds = create_backup(self.db_path, keep)
+            record_backup(db, path, pages, seconds)
+            logger.info("backed up %d pages to %s in %.2f s", pages, path, seconds)
+            return path, pages, seconds
+        finally:
+            db.close()
+    
+    def _run(self):
+        while True:
+            try:
+                self.run_if_due()
+            except Exception:
+                logger.exception("scheduled backup failed")
+            if self._stop.wait(self.check_interval):
+                return
@@ -0,0 +1,322 @@
+import argparse
+import os
+import sys
+from datetime import date
+
+# Run as a script from any directory: sibling modules are imported flat, as under `flet run`
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from db_operations import Database
+
+# Report kinds accepted by `report --output KIND=PATH`, besides the report periods
+REPORT_KINDS = ("entries", "project", "day", "week", "month")
+# File formats by extension, mapped to Polars DataFrame writers
+REPORT_WRITERS = {
+    ".csv": "write_csv",
+    ".xlsx": "write_excel",
+    ".parquet": "write_parquet",
+    ".json": "write_json",
+}
+
+
+class CliError(Exception):
+    """A user error, reported on stderr without a traceback."""
+
+
+def _parse_date(value: str) -> str:
+    try:
+        return date.fromisoformat(value).strftime("%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date (expected YYYY-MM-DD): {value}")
+
+
+def _parse_hours(value: str) -> float:
+    try:
+        hours = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number of hours: {value}")
+    if hours <= 0:
+        raise argparse.ArgumentTypeError("hours must be greater than 0")
+    return hours
+
+
+def _parse_output(value: str):
+    kind, separator, path = value.partition("=")
+    if not separator or kind not in REPORT_KINDS or not path:
+        raise argparse.ArgumentTypeError(f"expected KIND=PATH with KIND one of {', '.join(REPORT_KINDS)}: {value}")
+    if path != "-" and os.path.splitext(path)[1].lower() not in REPORT_WRITERS:
+        raise argparse.ArgumentTypeError(f"unsupported file type, use one of {', '.join(REPORT_WRITERS)}: {path}")
+    return kind, path
+
+
+def _project_ids(db: Database, names, create: bool = False):
+    """Map project names to IDs; None (all projects) when no names are given."""
+    if not names:
+        return None
+    
+    ids = {name: project_id for project_id, name, _ in db.get_all_projects()}
+    project_ids = []
+    for name in names:
+        if name not in ids:
+            if not create:
+                raise CliError(f"No such project: {name}")
+            ids[name] = db.create_project(name)
+        project_ids.append(ids[name])
+    return project_ids
+
+
+def _print_rows(headers, rows):
+    """Print rows as left-aligned, space-separated columns."""
+    rows = [[str(value) for value in row] for row in rows]
+    widths = [max(len(cell) for cell in column) for column in zip(headers, *rows)]
+    for row in [headers, *rows]:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+
+def cmd_add(db: Database, args):
+    project_id, = _project_ids(db, [args.project], create=args.create)
+    entry_id = db.create_entry(project_id, args.date, args.hours, args.description)
+    print(f"Added entry {entry_id}: {args.project}, {args.date}, {args.hours:g} h")
+
+
+def cmd_totals(db: Database, args):
+    project_ids = _project_ids(db, args.project)
+    rows = []
+    total_entries = 0
+    total_hours_sum = 0.0
+    for project_id, name, _created_at, entry_count, total_hours in db.get_project_summaries():
+        if project_ids is not None and project_id not in project_ids:
+            continue
+        if args.from_date or args.to_date:
+            entry_count, total_hours = db.get_entry_totals(project_id, args.from_date, args.to_date)
+        if entry_count or not args.skip_empty:
+            rows.append((name, entry_count, f"{total_hours:.2f}"))
+            total_entries += entry_count
+            total_hours_sum += total_hours
+    
+    rows.append(("Total", total_entries, f"{total_hours_sum:.2f}"))
+    _print_rows(("Project", "Entries", "Hours"), rows)
+
+
+def cmd_report(db: Database, args):
+    from reports import ReportEngine  # loads Polars on first use
+    
+    engine = ReportEngine(db)
+    project_ids = _project_ids(db, args.project)
+    
+    # One scan for all outputs: raw entries if any output lists them, else the daily rollup
+    if any(kind == "entries" for kind, _ in args.outputs):
+        df = engine.load_entries(project_ids, args.from_date, args.to_date)
+    else:
+        df = engine.load_daily_totals(project_ids, args.from_date, args.to_date)
+    
+    for kind, path in args.outputs:
+        if kind == "entries":
+            report = df
+        elif kind != "project" and (project_ids is None or len(project_ids) > 1):
+            # Across projects, periods are pivoted per project as in the Reports view
+            report = engine.pivot(df, kind)
+        else:
+            report = engine.summarize(df, kind)
+        
+        if path == "-":
+            report.write_csv(sys.stdout)
+        else:
+            getattr(report, REPORT_WRITERS[os.path.splitext(path)[1].lower()])(path)
+            print(f"Wrote {report.height} rows of {kind} report to {path}")
+
+
+def cmd_export(db: Database, args):
+    from exporter import export_entries_to_excel
+    
+    project_ids = _project_ids(db, args.project)
+    written = export_entries_to_excel(db, args.path, project_ids, args.from_date, args.to_date)
+    print(f"Exported {written} entries to {args.path}")
+
+
+def cmd_import(db: Database, args):
+    from importer import import_entries  # loads Polars on first use
+    
+    imported, skipped = import_entries(db, args.path)
+    print(f"Imported {imported} entries, skipped {skipped} invalid rows")
+
+
+def cmd_start(db: Database, args):
+    project_id, = _project_ids(db, [args.project])
+    started_at = db.start_timer(project_id, args.description)
+    print(f"Timer for {args.project} running since {started_at}")
+
+
+def cmd_stop(db: Database, args):
+    project_id, = _project_ids(db, [args.project])
+    stopped = db.stop_timer(project_id, args.description)
+    if stopped is None:
+        raise CliError(f"No timer running for {args.project}")
+    entry_id, entry_date, hours, _description = stopped
+    print(f"Added entry {entry_id}: {args.project}, {entry_date}, {hours:g} h")
+
+
+def cmd_archive(db: Database, args):
+    from archive import archive_entries  # loads Polars on first use
+    
+    archived = archive_entries(db, args.before)
+    print(f"Archived {archived} entries dated before {args.before}")
+
+
+def cmd_check(db: Database, args):
+    wrong_projects = db.verify_project_totals()
+    wrong_days = db.verify_daily_totals()
+    if not wrong_projects and not wrong_days:
+        print("Totals are consistent")
+        return
+    
+    print(f"Wrong totals: {len(wrong_projects)} projects, {len(wrong_days)} project days")
+    if not args.repair:
+        raise CliError("Run with --repair to rebuild the totals")
+    with db.transaction():
+        db.rebuild_project_totals()
+        db.rebuild_daily_totals()
+    print("Totals rebuilt")
+
+
+def cmd_backup(db: Database, args):
+    from backup import BACKUP_KEEP_SETTING, DEFAULT_BACKUP_KEEP, create_backup, list_backups, record_backup
+    
+    if args.list:
+        _print_rows(
+            ("Snapshot", "Size (MB)"),
+            [(path, f"{size / 1_048_576:.1f}") for path, _, size in list_backups(db.db_path)],
+        )
+        return
+    keep = int(db.get_setting(BACKUP_KEEP_SETTING, DEFAULT_BACKUP_KEEP))
+    path, pages, seconds = create_backup(db.db_path, keep)
+    record_backup(db, path, pages, seconds)
+    print(f"Backed up {pages} pages in {seconds:.2f} s to {path}")
+
+
+def cmd_restore(db: Database, args):
+    from backup import restore_backup
+    
+    try:
+        saved_path, pages = restore_backup(db, args.path)
+    except (FileNotFoundError, ValueError) as ex:
+        raise CliError(str(ex)) from ex
+    print(f"Restored {pages} pages from {args.path}; previous data saved as {saved_path}")
+
+
+def cmd_serve(db: Database, args):
+    import logging
+    from backup import BackupScheduler
+    from server import serve
+    
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(asctime)s %(message)s")
+    BackupScheduler.start_for_path(db.db_path)
+    serve(db.db_path, args.host, args.port)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="time-tracker",
+        description="Add entries and produce reports without starting the app.",
+    )
+    parser.add_argument(
+        "--db", dest="db_path",
+        help="database file (default: $TIME_TRACKER_DB_PATH, else ~/.time_tracker/time_tracker.db)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    def add_filters(command):
+        command.add_argument("-p", "--project", action="append", help="project name; repeat for several (default: all)")
+        command.add_argument("--from", dest="from_date", type=_parse_date, help="first date, YYYY-MM-DD")
+        command.add_argument("--to", dest="to_date", type=_parse_date, help="last date, YYYY-MM-DD")
+    
+    command = commands.add_parser("add", help="add a time entry")
+    command.add_argument("project", help="project name")
+    command.add_argument("hours", type=_parse_hours)
+    command.add_argument("-d", "--date", type=_parse_date, default=date.today().strftime("%Y-%m-%d"),
+                         help="entry date, YYYY-MM-DD (default: today)")
+    command.add_argument("-m", "--description", default="")
+    command.add_argument("--create", action="store_true", help="create the project if it does not exist")
+    command.set_defaults(handler=cmd_add)
+    
+    command = commands.add_parser("totals", help="list entry counts and hours per project")
+    add_filters(command)
+    command.add_argument("--skip-empty", action="store_true", help="leave out projects without entries")
+    command.set_defaults(handler=cmd_totals)
+    
+    command = commands.add_parser(
+        "report", help="write several reports from one scan",
+        description="Write reports from a single scan of the data. Each output is KIND=PATH, with KIND one of "
+                    f"{', '.join(REPORT_KINDS)} and PATH a {', '.join(REPORT_WRITERS)} file, or - for CSV on stdout.",
+    )
+    add_filters(command)
+    command.add_argument("-o", "--output", dest="outputs", action="append", type=_parse_output, required=True,
+                         metavar="KIND=PATH", help="report to write; repeat for several")
+    command.set_defaults(handler=cmd_report)
+    
+    command = commands.add_parser("export", help="stream entries into an Excel file")
+    add_filters(command)
+    command.add_argument("path", help="output .xlsx file")
+    command.set_defaults(handler=cmd_export)
+    
+    command = commands.add_parser("import", help="import entries from a CSV or Excel file")
+    command.add_argument("path")
+    command.set_defaults(handler=cmd_import)
+    
+    command = commands.add_parser("start", help="start a project's timer")
+    command.add_argument("project", help="project name")
+    command.add_argument("-m", "--description", default="")
+    command.set_defaults(handler=cmd_start)
+    
+    command = commands.add_parser("stop", help="stop a project's timer and record the entry")
+    command.add_argument("project", help="project name")
+    command.add_argument("-m", "--description", help="replace the timer's description")
+    command.set_defaults(handler=cmd_stop)
+    
+    command = commands.add_parser("archive", help="move old entries to the Parquet archive")
+    command.add_argument("--before", type=_parse_date, required=True, help="archive entries dated before this day")
+    command.set_defaults(handler=cmd_archive)
+    
+    command = commands.add_parser("check", help="verify the stored totals")
+    command.add_argument("--repair", action="store_true", help="rebuild the totals if they are wrong")
+    command.set_defaults(handler=cmd_check)
+    
+    command = commands.add_parser("backup", help="take a snapshot of the database")
+    command.add_argument("--list", action="store_true", help="list the snapshots instead, newest first")
+    command.set_defaults(handler=cmd_backup)
+    
+    command = commands.add_parser("restore", help="replace the data with a snapshot")
+    command.add_argument("path", help="snapshot file, see backup --list")
+    command.set_defaults(handler=cmd_restore)
+    
+    command = commands.add_parser("serve", help="serve the local HTTP/JSON API")
+    command.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    command.add_argument("--port", type=int, default=8765, help="port to listen on (default: 8765)")
+    command.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    command.set_defaults(handler=cmd_serve)
+    
+    return parser
+
+
+def main(argv=None) -> int:
+    """Run the command line interface; returns the exit status."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    
+    db = Database()
+    try:
+        db.connect(args.db_path or Database.default_db_path())
+        args.handler(db, args)
+    except CliError as ex:
+        print(f"time-tracker: {ex}", file=sys.stderr)
+        return 1
+    finally:
+        pool = db.pool
+        db.close()
+        if pool is not None:
+            pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
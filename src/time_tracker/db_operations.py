@@ -1,27 +1,644 @@
+import asyncio
+import functools
+import glob
+import inspect
 import sqlite3
 import os
-from datetime import datetime
-from flet import StoragePaths, FletUnsupportedPlatformException
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime
+from instrumentation import (
+    DEFAULT_SLOW_QUERY_MS,
+    SLOW_QUERY_LOG_NAME,
+    InstrumentedConnection,
+    QueryStats,
+    instrument_methods,
+    open_slow_query_log,
+)
 
+# Schema migrations, applied in order on top of the base tables.
+# The schema version is stored in PRAGMA user_version: a database at
+# version N has had the first N migrations applied.
+MIGRATIONS = [
+    # 1: index entries by project and date for per-project and date range queries
+    [
+        "CREATE INDEX IF NOT EXISTS idx_entries_project_date ON entries (project_id, date)",
+    ],
+    # 2: index entries by date for reports across all projects
+    [
+        "CREATE INDEX IF NOT EXISTS idx_entries_date ON entries (date)",
+    ],
+    # 3: per-project totals kept in sync by triggers on entries
+    [
+        """CREATE TABLE IF NOT EXISTS project_totals (
+            project_id INTEGER PRIMARY KEY,
+            entry_count INTEGER NOT NULL DEFAULT 0,
+            total_hours REAL NOT NULL DEFAULT 0,
+            first_date DATE,
+            last_date DATE
+        )""",
+        """INSERT INTO project_totals (project_id, entry_count, total_hours, first_date, last_date)
+           SELECT project_id, COUNT(*), SUM(hours), MIN(date), MAX(date)
+           FROM entries GROUP BY project_id""",
+        """CREATE TRIGGER IF NOT EXISTS entries_totals_insert AFTER INSERT ON entries BEGIN
+            INSERT INTO project_totals (project_id, entry_count, total_hours, first_date, last_date)
+            VALUES (NEW.project_id, 1, NEW.hours, NEW.date, NEW.date)
+            ON CONFLICT (project_id) DO UPDATE SET
+                entry_count = entry_count + 1,
+                total_hours = total_hours + NEW.hours,
+                first_date = MIN(COALESCE(first_date, NEW.date), NEW.date),
+                last_date = MAX(COALESCE(last_date, NEW.date), NEW.date);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS entries_totals_delete AFTER DELETE ON entries BEGIN
+            UPDATE project_totals SET
+                entry_count = entry_count - 1,
+                total_hours = total_hours - OLD.hours,
+                first_date = CASE WHEN OLD.date = first_date
+                    THEN (SELECT MIN(date) FROM entries WHERE project_id = OLD.project_id)
+                    ELSE first_date END,
+                last_date = CASE WHEN OLD.date = last_date
+                    THEN (SELECT MAX(date) FROM entries WHERE project_id = OLD.project_id)
+                    ELSE last_date END
+            WHERE project_id = OLD.project_id;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS entries_totals_update AFTER UPDATE OF project_id, date, hours ON entries BEGIN
+            UPDATE project_totals SET
+                entry_count = entry_count - 1,
+                total_hours = total_hours - OLD.hours,
+                first_date = CASE WHEN OLD.date = first_date
+                    THEN (SELECT MIN(date) FROM entries WHERE project_id = OLD.project_id)
+                    ELSE first_date END,
+                last_date = CASE WHEN OLD.date = last_date
+                    THEN (SELECT MAX(date) FROM entries WHERE project_id = OLD.project_id)
+                    ELSE last_date END
+            WHERE project_id = OLD.project_id;
+            INSERT INTO project_totals (project_id, entry_count, total_hours, first_date, last_date)
+            VALUES (NEW.project_id, 1, NEW.hours, NEW.date, NEW.date)
+            ON CONFLICT (project_id) DO UPDATE SET
+                entry_count = entry_count + 1,
+                total_hours = total_hours + NEW.hours,
+                first_date = MIN(COALESCE(first_date, NEW.date), NEW.date),
+                last_date = MAX(COALESCE(last_date, NEW.date), NEW.date);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS projects_totals_delete AFTER DELETE ON projects BEGIN
+            DELETE FROM project_totals WHERE project_id = OLD.id;
+        END""",
+    ],
+    # 4: per-project daily rollup kept in sync by triggers on entries, for aggregate reports
+    [
+        """CREATE TABLE IF NOT EXISTS daily_totals (
+            project_id INTEGER NOT NULL,
+            date DATE NOT NULL,
+            entry_count INTEGER NOT NULL DEFAULT 0,
+            total_hours REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (project_id, date)
+        ) WITHOUT ROWID""",
+        "CREATE INDEX IF NOT EXISTS idx_daily_totals_date ON daily_totals (date)",
+        """INSERT INTO daily_totals (project_id, date, entry_count, total_hours)
+           SELECT project_id, date, COUNT(*), SUM(hours)
+           FROM entries GROUP BY project_id, date""",
+        """CREATE TRIGGER IF NOT EXISTS entries_daily_insert AFTER INSERT ON entries BEGIN
+            INSERT INTO daily_totals (project_id, date, entry_count, total_hours)
+            VALUES (NEW.project_id, NEW.date, 1, NEW.hours)
+            ON CONFLICT (project_id, date) DO UPDATE SET
+                entry_count = entry_count + 1,
+                total_hours = total_hours + NEW.hours;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS entries_daily_delete AFTER DELETE ON entries BEGIN
+            UPDATE daily_totals SET
+                entry_count = entry_count - 1,
+                total_hours = total_hours - OLD.hours
+            WHERE project_id = OLD.project_id AND date = OLD.date;
+            DELETE FROM daily_totals
+            WHERE project_id = OLD.project_id AND date = OLD.date AND entry_count <= 0;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS entries_daily_update AFTER UPDATE OF project_id, date, hours ON entries BEGIN
+            UPDATE daily_totals SET
+                entry_count = entry_count - 1,
+                total_hours = total_hours - OLD.hours
+            WHERE project_id = OLD.project_id AND date = OLD.date;
+            DELETE FROM daily_totals
+            WHERE project_id = OLD.project_id AND date = OLD.date AND entry_count <= 0;
+            INSERT INTO daily_totals (project_id, date, entry_count, total_hours)
+            VALUES (NEW.project_id, NEW.date, 1, NEW.hours)
+            ON CONFLICT (project_id, date) DO UPDATE SET
+                entry_count = entry_count + 1,
+                total_hours = total_hours + NEW.hours;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS projects_daily_delete AFTER DELETE ON projects BEGIN
+            DELETE FROM daily_totals WHERE project_id = OLD.id;
+        END""",
+    ],
+    # 5: full-text index over entry descriptions, kept in sync by triggers on entries
+    [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+            description, content='entries', content_rowid='id'
+        )""",
+        "INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')",
+        """CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+            INSERT INTO entries_fts (rowid, description) VALUES (NEW.id, NEW.description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN
+            INSERT INTO entries_fts (entries_fts, rowid, description) VALUES ('delete', OLD.id, OLD.description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS entries_fts_update AFTER UPDATE OF description ON entries BEGIN
+            INSERT INTO entries_fts (entries_fts, rowid, description) VALUES ('delete', OLD.id, OLD.description);
+            INSERT INTO entries_fts (rowid, description) VALUES (NEW.id, NEW.description);
+        END""",
+    ],
+    # 6: running timers, one per project, persisted so they survive restarts
+    [
+        """CREATE TABLE IF NOT EXISTS running_timers (
+            project_id INTEGER PRIMARY KEY,
+            started_at TIMESTAMP NOT NULL,
+            description TEXT
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS projects_timers_delete AFTER DELETE ON projects BEGIN
+            DELETE FROM running_timers WHERE project_id = OLD.id;
+        END""",
+    ],
+    # 7: Parquet archive bookkeeping; archived entries stay counted in the totals and rollups
+    [
+        """CREATE TABLE IF NOT EXISTS archived_daily_totals (
+            project_id INTEGER NOT NULL,
+            date DATE NOT NULL,
+            entry_count INTEGER NOT NULL DEFAULT 0,
+            total_hours REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (project_id, date)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS archive_batches (
+            name TEXT PRIMARY KEY,
+            cutoff DATE NOT NULL,
+            entry_count INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS projects_archive_delete AFTER DELETE ON projects BEGIN
+            DELETE FROM archived_daily_totals WHERE project_id = OLD.id;
+        END""",
+        # First and last dates now also look at archived entries
+        "DROP TRIGGER IF EXISTS entries_totals_delete",
+        "DROP TRIGGER IF EXISTS entries_totals_update",
+        """CREATE TRIGGER entries_totals_delete AFTER DELETE ON entries BEGIN
+            UPDATE project_totals SET
+                entry_count = entry_count - 1,
+                total_hours = total_hours - OLD.hours,
+                first_date = CASE WHEN OLD.date = first_date
+                    THEN (SELECT MIN(date) FROM (
+                        SELECT MIN(date) AS date FROM entries WHERE project_id = OLD.project_id
+                        UNION ALL
+                        SELECT MIN(date) FROM archived_daily_totals WHERE project_id = OLD.project_id
+                    ))
+                    ELSE first_date END,
+                last_date = CASE WHEN OLD.date = last_date
+                    THEN (SELECT MAX(date) FROM (
+                        SELECT MAX(date) AS date FROM entries WHERE project_id = OLD.project_id
+                        UNION ALL
+                        SELECT MAX(date) FROM archived_daily_totals WHERE project_id = OLD.project_id
+                    ))
+                    ELSE last_date END
+            WHERE project_id = OLD.project_id;
+        END""",
+        """CREATE TRIGGER entries_totals_update AFTER UPDATE OF project_id, date, hours ON entries BEGIN
+            UPDATE project_totals SET
+                entry_count = entry_count - 1,
+                total_hours = total_hours - OLD.hours,
+                first_date = CASE WHEN OLD.date = first_date
+                    THEN (SELECT MIN(date) FROM (
+                        SELECT MIN(date) AS date FROM entries WHERE project_id = OLD.project_id
+                        UNION ALL
+                        SELECT MIN(date) FROM archived_daily_totals WHERE project_id = OLD.project_id
+                    ))
+                    ELSE first_date END,
+                last_date = CASE WHEN OLD.date = last_date
+                    THEN (SELECT MAX(date) FROM (
+                        SELECT MAX(date) AS date FROM entries WHERE project_id = OLD.project_id
+                        UNION ALL
+                        SELECT MAX(date) FROM archived_daily_totals WHERE project_id = OLD.project_id
+                    ))
+                    ELSE last_date END
+            WHERE project_id = OLD.project_id;
+            INSERT INTO project_totals (project_id, entry_count, total_hours, first_date, last_date)
+            VALUES (NEW.project_id, 1, NEW.hours, NEW.date, NEW.date)
+            ON CONFLICT (project_id) DO UPDATE SET
+                entry_count = entry_count + 1,
+                total_hours = total_hours + NEW.hours,
+                first_date = MIN(COALESCE(first_date, NEW.date), NEW.date),
+                last_date = MAX(COALESCE(last_date, NEW.date), NEW.date);
+        END""",
+    ],
+    # 8: store dates as integer day numbers (days since 1970-01-01) in "day" columns,
+    # for smaller indexes and integer range scans. Tables are rebuilt, so every
+    # trigger on entries or on the rebuilt tables is dropped and recreated.
+    [
+        "DROP TRIGGER IF EXISTS entries_totals_insert",
+        "DROP TRIGGER IF EXISTS entries_totals_delete",
+        "DROP TRIGGER IF EXISTS entries_totals_update",
+        "DROP TRIGGER IF EXISTS entries_daily_insert",
+        "DROP TRIGGER IF EXISTS entries_daily_delete",
+        "DROP TRIGGER IF EXISTS entries_daily_update",
+        "DROP TRIGGER IF EXISTS entries_fts_insert",
+        "DROP TRIGGER IF EXISTS entries_fts_delete",
+        "DROP TRIGGER IF EXISTS entries_fts_update",
+        "DROP TRIGGER IF EXISTS projects_totals_delete",
+        "DROP TRIGGER IF EXISTS projects_daily_delete",
+        "DROP TRIGGER IF EXISTS projects_archive_delete",
+        """CREATE TABLE entries_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project_id INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            hours REAL NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
+        )""",
+        """INSERT INTO entries_new (id, project_id, day, hours, description, created_at)
+           SELECT id, project_id, CAST(julianday(date) - 2440587.5 AS INTEGER), hours, description, created_at
+           FROM entries""",
+        # Keep the AUTOINCREMENT counter, so IDs of deleted entries are not reused
+        "DELETE FROM sqlite_sequence WHERE name = 'entries_new'",
+        "UPDATE sqlite_sequence SET name = 'entries_new' WHERE name = 'entries'",
+        "DROP TABLE entries",
+        "ALTER TABLE entries_new RENAME TO entries",
+        "CREATE INDEX idx_entries_project_day ON entries (project_id, day)",
+        "CREATE INDEX idx_entries_day ON entries (day)",
+        """CREATE TABLE project_totals_new (
+            project_id INTEGER PRIMARY KEY,
+            entry_count INTEGER NOT NULL DEFAULT 0,
+            total_hours REAL NOT NULL DEFAULT 0,
+            first_day INTEGER,
+            last_day INTEGER
+        )""",
+        """INSERT INTO project_totals_new (project_id, entry_count, total_hours, first_day, last_day)
+           SELECT project_id, entry_count, total_hours,
+                  CAST(julianday(first_date) - 2440587.5 AS INTEGER),
+                  CAST(julianday(last_date) - 2440587.5 AS INTEGER)
+           FROM project_totals""",
+        "DROP TABLE project_totals",
+        "ALTER TABLE project_totals_new RENAME TO project_totals",
+        """CREATE TABLE daily_totals_new (
+            project_id INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            entry_count INTEGER NOT NULL DEFAULT 0,
+            total_hours REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (project_id, day)
+        ) WITHOUT ROWID""",
+        """INSERT INTO daily_totals_new (project_id, day, entry_count, total_hours)
+           SELECT project_id, CAST(julianday(date) - 2440587.5 AS INTEGER), entry_count, total_hours
+           FROM daily_totals""",
+        "DROP TABLE daily_totals",
+        "ALTER TABLE daily_totals_new RENAME TO daily_totals",
+        "CREATE INDEX idx_daily_totals_day ON daily_totals (day)",
+        """CREATE TABLE archived_daily_totals_new (
+            project_id INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            entry_count INTEGER NOT NULL DEFAULT 0,
+            total_hours REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (project_id, day)
+        ) WITHOUT ROWID""",
+        """INSERT INTO archived_daily_totals_new (project_id, day, entry_count, total_hours)
+           SELECT project_id, CAST(julianday(date) - 2440587.5 AS INTEGER), entry_count, total_hours
+           FROM archived_daily_totals""",
+        "DROP TABLE archived_daily_totals",
+        "ALTER TABLE archived_daily_totals_new RENAME TO archived_daily_totals",
+        """CREATE TRIGGER entries_totals_insert AFTER INSERT ON entries BEGIN
+            INSERT INTO project_totals (project_id, entry_count, total_hours, first_day, last_day)
+            VALUES (NEW.project_id, 1, NEW.hours, NEW.day, NEW.day)
+            ON CONFLICT (project_id) DO UPDATE SET
+                entry_count = entry_count + 1,
+                total_hours = total_hours + NEW.hours,
+                first_day = MIN(COALESCE(first_day, NEW.day), NEW.day),
+                last_day = MAX(COALESCE(last_day, NEW.day), NEW.day);
+        END""",
+        """CREATE TRIGGER entries_totals_delete AFTER DELETE ON entries BEGIN
+            UPDATE project_totals SET
+                entry_count = entry_count - 1,
+                total_hours = total_hours - OLD.hours,
+                first_day = CASE WHEN OLD.day = first_day
+                    THEN (SELECT MIN(day) FROM (
+                        SELECT MIN(day) AS day FROM entries WHERE project_id = OLD.project_id
+                        UNION ALL
+                        SELECT MIN(day) FROM archived_daily_totals WHERE project_id = OLD.project_id
+                    ))
+                    ELSE first_day END,
+                last_day = CASE WHEN OLD.day = last_day
+                    THEN (SELECT MAX(day) FROM (
+                        SELECT MAX(day) AS day FROM entries WHERE project_id = OLD.project_id
+                        UNION ALL
+                        SELECT MAX(day) FROM archived_daily_totals WHERE project_id = OLD.project_id
+                    ))
+                    ELSE last_day END
+            WHERE project_id = OLD.project_id;
+        END""",
+        """CREATE TRIGGER entries_totals_update AFTER UPDATE OF project_id, day, hours ON entries BEGIN
+            UPDATE project_totals SET
+                entry_count = entry_count - 1,
+                total_hours = total_hours - OLD.hours,
+                first_day = CASE WHEN OLD.day = first_day
+                    THEN (SELECT MIN(day) FROM (
+                        SELECT MIN(day) AS day FROM entries WHERE project_id = OLD.project_id
+                        UNION ALL
+                        SELECT MIN(day) FROM archived_daily_totals WHERE project_id = OLD.project_id
+                    ))
+                    ELSE first_day END,
+                last_day = CASE WHEN OLD.day = last_day
+                    THEN (SELECT MAX(day) FROM (
+                        SELECT MAX(day) AS day FROM entries WHERE project_id = OLD.project_id
+                        UNION ALL
+                        SELECT MAX(day) FROM archived_daily_totals WHERE project_id = OLD.project_id
+                    ))
+                    ELSE last_day END
+            WHERE project_id = OLD.project_id;
+            INSERT INTO project_totals (project_id, entry_count, total_hours, first_day, last_day)
+            VALUES (NEW.project_id, 1, NEW.hours, NEW.day, NEW.day)
+            ON CONFLICT (project_id) DO UPDATE SET
+                entry_count = entry_count + 1,
+                total_hours = total_hours + NEW.hours,
+                first_day = MIN(COALESCE(first_day, NEW.day), NEW.day),
+                last_day = MAX(COALESCE(last_day, NEW.day), NEW.day);
+        END""",
+        """CREATE TRIGGER entries_daily_insert AFTER INSERT ON entries BEGIN
+            INSERT INTO daily_totals (project_id, day, entry_count, total_hours)
+            VALUES (NEW.project_id, NEW.day, 1, NEW.hours)
+            ON CONFLICT (project_id, day) DO UPDATE SET
+                entry_count = entry_count + 1,
+                total_hours = total_hours + NEW.hours;
+        END""",
+        """CREATE TRIGGER entries_daily_delete AFTER DELETE ON entries BEGIN
+            UPDATE daily_totals SET
+                entry_count = entry_count - 1,
+                total_hours = total_hours - OLD.hours
+            WHERE project_id = OLD.project_id AND day = OLD.day;
+            DELETE FROM daily_totals
+            WHERE project_id = OLD.project_id AND day = OLD.day AND entry_count <= 0;
+        END""",
+        """CREATE TRIGGER entries_daily_update AFTER UPDATE OF project_id, day, hours ON entries BEGIN
+            UPDATE daily_totals SET
+                entry_count = entry_count - 1,
+                total_hours = total_hours - OLD.hours
+            WHERE project_id = OLD.project_id AND day = OLD.day;
+            DELETE FROM daily_totals
+            WHERE project_id = OLD.project_id AND day = OLD.day AND entry_count <= 0;
+            INSERT INTO daily_totals (project_id, day, entry_count, total_hours)
+            VALUES (NEW.project_id, NEW.day, 1, NEW.hours)
+            ON CONFLICT (project_id, day) DO UPDATE SET
+                entry_count = entry_count + 1,
+                total_hours = total_hours + NEW.hours;
+        END""",
+        """CREATE TRIGGER entries_fts_insert AFTER INSERT ON entries BEGIN
+            INSERT INTO entries_fts (rowid, description) VALUES (NEW.id, NEW.description);
+        END""",
+        """CREATE TRIGGER entries_fts_delete AFTER DELETE ON entries BEGIN
+            INSERT INTO entries_fts (entries_fts, rowid, description) VALUES ('delete', OLD.id, OLD.description);
+        END""",
+        """CREATE TRIGGER entries_fts_update AFTER UPDATE OF description ON entries BEGIN
+            INSERT INTO entries_fts (entries_fts, rowid, description) VALUES ('delete', OLD.id, OLD.description);
+            INSERT INTO entries_fts (rowid, description) VALUES (NEW.id, NEW.description);
+        END""",
+        """CREATE TRIGGER projects_totals_delete AFTER DELETE ON projects BEGIN
+            DELETE FROM project_totals WHERE project_id = OLD.id;
+        END""",
+        """CREATE TRIGGER projects_daily_delete AFTER DELETE ON projects BEGIN
+            DELETE FROM daily_totals WHERE project_id = OLD.id;
+        END""",
+        """CREATE TRIGGER projects_archive_delete AFTER DELETE ON projects BEGIN
+            DELETE FROM archived_daily_totals WHERE project_id = OLD.id;
+        END""",
+    ],
+]
 
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# Dates are stored as day numbers counted from 1970-01-01, the same count
+# Polars uses for pl.Date. The Database API takes and returns "%Y-%m-%d".
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# Julian day number of 1970-01-01, to turn day numbers into SQLite date() input
+EPOCH_JULIAN_DAY = 2440587.5
+
+
+def to_day(value: str) -> int:
+    """Convert a "%Y-%m-%d" date to its stored day number."""
+    return date.fromisoformat(value).toordinal() - EPOCH_ORDINAL
+
+
+def day_sql(column: str) -> str:
+    """SQL expression formatting a day number column as "%Y-%m-%d"."""
+    return f"date({column} + {EPOCH_JULIAN_DAY})"
+
+# Daily totals per project over live and archived entries; the source of truth
+# when rebuilding or verifying the project_totals and daily_totals rollups
+ALL_DAILY_TOTALS_SQL = """
+    SELECT project_id, day, SUM(entry_count) AS entry_count, SUM(total_hours) AS total_hours
+    FROM (
+        SELECT project_id, day, COUNT(*) AS entry_count, SUM(hours) AS total_hours
+        FROM entries GROUP BY project_id, day
+        UNION ALL
+        SELECT project_id, day, entry_count, total_hours FROM archived_daily_totals
+    )
+    GROUP BY project_id, day
+"""
+
+# Parquet archive of old entries, in a directory next to the database file
+# named after it: <database dir>/<database name>-archive
+ARCHIVE_DIR_SUFFIX = "-archive"
+# Directory shared by all databases of a folder in earlier versions
+LEGACY_ARCHIVE_DIR_NAME = "archive"
+
+
+def get_archive_dir(db_path: str):
+    """Get the Parquet archive directory of a database, or None for in-memory databases."""
+    if not db_path or db_path == ":memory:":
+        return None
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), f"{stem}{ARCHIVE_DIR_SUFFIX}")
+
+
+# Pragmas applied to every connection. Each one can be overridden by a
+# "sqlite.<pragma>" row in the settings table, e.g. sqlite.cache_size = -64000.
+CONNECTION_PROFILE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": "-16000",  # negative values are KiB, so ~16 MB
+    "mmap_size": "268435456",
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+
+CONNECTION_PROFILE_PREFIX = "sqlite."
+PRAGMA_VALUE_PATTERN = re.compile(r"-?[A-Za-z0-9_]+")
+
+# Words of a search query; each becomes a quoted FTS5 prefix term
+SEARCH_TERM_PATTERN = re.compile(r"\w+")
+
+# Environment variables for server and web deployments
+DB_PATH_ENV = "TIME_TRACKER_DB_PATH"
+POOL_SIZE_ENV = "TIME_TRACKER_DB_POOL_SIZE"
+DEFAULT_POOL_SIZE = 8
+
+# Settings controlling query instrumentation
+INSTRUMENTATION_SETTING = "instrumentation.enabled"
+SLOW_QUERY_SETTING = "instrumentation.slow_query_ms"
+# Database methods left out of the per-method stats: the transaction context
+# manager, and helpers that run no SQL
+UNTIMED_METHODS = (
+    "transaction",
+    "invalidate_cache",
+    "get_cache_stats",
+    "get_archive_dir",
+    "get_query_stats",
+    "reset_query_stats",
+)
+
+
+class ConnectionPool:
+    """Thread-safe pool of SQLite connections to one database file.
+    
+    Pools are shared process-wide, one per path, so every session of a web or
+    server deployment reuses the same store. Connections can be used from any
+    thread (but by one thread at a time). Up to `size` idle connections are
+    kept for reuse; the schema is set up by the first connection only.
+    """
+    
+    _pools = {}
+    _pools_lock = threading.Lock()
+    
+    def __init__(self, db_path: str, size: int = DEFAULT_POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self.schema_ready = False
+        self.schema_lock = threading.Lock()
+        self._idle = []
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def for_path(cls, db_path: str):
+        """Get the shared pool for db_path, creating it on first use."""
+        db_path = os.path.abspath(db_path)
+        with cls._pools_lock:
+            pool = cls._pools.get(db_path)
+            if pool is None:
+                size = int(os.environ.get(POOL_SIZE_ENV, DEFAULT_POOL_SIZE))
+                pool = cls._pools[db_path] = cls(db_path, size)
+            return pool
+    
+    def acquire(self) -> sqlite3.Connection:
+        """Take an idle connection, or open a new one if none is idle."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return sqlite3.connect(self.db_path, check_same_thread=False, factory=InstrumentedConnection)
+    
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, closing it if the pool is full."""
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+    
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+@instrument_methods(exclude=UNTIMED_METHODS)
 class Database:
     def __init__(self):
         self.db_path = None
         self.conn = None
+        self.pool = None
+        self._transaction_depth = 0
+        # Deleted projects whose archive files are removed once the deletion is committed
+        self._deleted_archive_projects = []
+        
+        # Read-through cache for projects and settings
+        self._projects_cache = None
+        self._settings_cache = None
+        self._cache_data_version = None
+        self.cache_stats = {"hits": 0, "misses": 0}
+        
+        # Query instrumentation, set while it is enabled in settings
+        self.stats = None
     
     async def initialize(self):
         """Initialize database with cross-platform path."""
+        self.connect(await self.resolve_db_path())
+    
+    @staticmethod
+    async def resolve_db_path() -> str:
+        """Get the cross-platform database path.
+        
+        The TIME_TRACKER_DB_PATH environment variable takes precedence. In web
+        mode and on unsupported platforms the database goes to the default
+        data directory, see default_db_path.
+        """
+        if os.environ.get(DB_PATH_ENV):
+            return os.environ[DB_PATH_ENV]
+        
+        # Imported here so headless callers never load Flet
+        from flet import StoragePaths, FletUnsupportedPlatformException
+        
         storage_paths = StoragePaths()
         try:
             app_dir = await storage_paths.get_application_support_directory()
-            self.db_path = os.path.join(app_dir, "time_tracker.db")
+            return os.path.join(app_dir, "time_tracker.db")
         except FletUnsupportedPlatformException:
             # Fallback for web mode or unsupported platforms
-            self.db_path = ":memory:"
+            return Database.default_db_path()
+    
+    @staticmethod
+    def default_db_path() -> str:
+        """Get the database path used without a Flet session.
         
-        # Connect and create tables
-        self.conn = sqlite3.connect(self.db_path)
+        TIME_TRACKER_DB_PATH takes precedence, then Flet's app data directory
+        (FLET_APP_STORAGE_DATA), then ~/.time_tracker.
+        """
+        if os.environ.get(DB_PATH_ENV):
+            return os.environ[DB_PATH_ENV]
+        data_dir = os.environ.get("FLET_APP_STORAGE_DATA") or os.path.join(os.path.expanduser("~"), ".time_tracker")
+        os.makedirs(data_dir, exist_ok=True)
+        return os.path.join(data_dir, "time_tracker.db")
+    
+    def connect(self, db_path: str):
+        """Open the database at db_path, upgrade its schema and apply the connection profile.
+        
+        File databases take their connection from the shared pool for that path;
+        ":memory:" databases get a private connection.
+        """
+        self.db_path = db_path
+        self.invalidate_cache()
+        self._cache_data_version = None
+        if db_path == ":memory:":
+            self.conn = sqlite3.connect(db_path, check_same_thread=False, factory=InstrumentedConnection)
+            self._ensure_schema()
+        else:
+            self.pool = ConnectionPool.for_path(db_path)
+            self.conn = self.pool.acquire()
+            with self.pool.schema_lock:
+                if not self.pool.schema_ready:
+                    self._ensure_schema()
+                    self._adopt_legacy_archive()
+                    self.pool.schema_ready = True
+        self._apply_connection_profile()
+        self._configure_instrumentation()
+    
+    def _ensure_schema(self):
+        """Create and migrate the schema, unless the stored version is already current.
+        
+        On a warm start this is a single PRAGMA read, with no DDL and no commit.
+        """
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == SCHEMA_VERSION:
+            return
         self._create_tables()
+        self._migrate()
     
     def _create_tables(self):
         """Create database tables if they don't exist."""
@@ -60,48 +677,296 @@ class Database:
         
         self.conn.commit()
     
+    def _migrate(self):
+        """Apply pending schema migrations, each in its own transaction."""
+        cursor = self.conn.cursor()
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have applied this migration meanwhile
+                if cursor.execute("PRAGMA user_version").fetchone()[0] < target:
+                    for statement in MIGRATIONS[target - 1]:
+                        cursor.execute(statement)
+                    cursor.execute(f"PRAGMA user_version = {target}")
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+    
+    def get_connection_profile(self):
+        """Get the effective connection pragmas, with overrides from settings applied."""
+        profile = dict(CONNECTION_PROFILE)
+        for key, value in self.get_all_settings().items():
+            if key.startswith(CONNECTION_PROFILE_PREFIX):
+                pragma = key[len(CONNECTION_PROFILE_PREFIX):]
+                if pragma in profile:
+                    profile[pragma] = value
+        return profile
+    
+    def set_connection_profile(self, pragma: str, value: str):
+        """Override a connection pragma, persist it in settings and apply it."""
+        if pragma not in CONNECTION_PROFILE:
+            raise ValueError(f"Unsupported connection pragma: {pragma}")
+        value = str(value)
+        if not PRAGMA_VALUE_PATTERN.fullmatch(value):
+            raise ValueError(f"Invalid value for pragma {pragma}: {value}")
+        self.set_setting(f"{CONNECTION_PROFILE_PREFIX}{pragma}", value)
+        self._apply_connection_profile()
+    
+    def _apply_connection_profile(self):
+        """Apply the connection profile pragmas to the open connection."""
+        cursor = self.conn.cursor()
+        for pragma, value in self.get_connection_profile().items():
+            if not PRAGMA_VALUE_PATTERN.fullmatch(value):
+                continue
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+    
+    @contextmanager
+    def transaction(self, immediate: bool = False):
+        """Group several operations into a single commit.
+        
+        Nested transactions join the outermost one; if an exception escapes,
+        everything done since the outermost transaction began is rolled back.
+        With immediate, the outermost transaction takes the write lock up front,
+        so rows read inside it cannot change before it commits.
+        """
+        if immediate and self._transaction_depth == 0 and not self.conn.in_transaction:
+            self.conn.execute("BEGIN IMMEDIATE")
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self.conn.rollback()
+                self.invalidate_cache()
+                self._deleted_archive_projects.clear()
+            raise
+        else:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self.conn.commit()
+                self._remove_deleted_archives()
+    
+    def _commit(self):
+        """Commit unless the change is part of an enclosing transaction."""
+        if self._transaction_depth == 0:
+            self.conn.commit()
+            self._remove_deleted_archives()
+    
+    # Cache operations
+    def invalidate_cache(self):
+        """Drop cached projects and settings so the next read goes to the database."""
+        self._projects_cache = None
+        self._settings_cache = None
+    
+    def get_cache_stats(self):
+        """Get cache hit and miss counters, plus the hit ratio."""
+        lookups = self.cache_stats["hits"] + self.cache_stats["misses"]
+        return {
+            **self.cache_stats,
+            "hit_ratio": self.cache_stats["hits"] / lookups if lookups else 0.0,
+        }
+    
+    def _check_cache_freshness(self):
+        """Invalidate the cache if another connection has committed since it was filled."""
+        data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._cache_data_version:
+            self.invalidate_cache()
+            self._cache_data_version = data_version
+    
+    def _get_projects_cache(self):
+        """Get the cached {id: (id, name, created_at)} mapping, in name order."""
+        self._check_cache_freshness()
+        if self._projects_cache is None:
+            self.cache_stats["misses"] += 1
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT id, name, created_at FROM projects ORDER BY name")
+            self._projects_cache = {row[0]: row for row in cursor.fetchall()}
+        else:
+            self.cache_stats["hits"] += 1
+        return self._projects_cache
+    
+    def _get_settings_cache(self):
+        """Get the cached {key: value} settings, loaded in one query."""
+        self._check_cache_freshness()
+        if self._settings_cache is None:
+            self.cache_stats["misses"] += 1
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT key, value FROM settings")
+            self._settings_cache = {row[0]: row[1] for row in cursor.fetchall()}
+        else:
+            self.cache_stats["hits"] += 1
+        return self._settings_cache
+    
     # Project operations
     def create_project(self, name: str) -> int:
         """Create a new project and return its ID."""
         cursor = self.conn.cursor()
         cursor.execute("INSERT INTO projects (name) VALUES (?)", (name,))
-        self.conn.commit()
+        self._projects_cache = None
+        self._commit()
         return cursor.lastrowid
     
     def get_all_projects(self):
         """Get all projects."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id, name, created_at FROM projects ORDER BY name")
-        return cursor.fetchall()
+        return list(self._get_projects_cache().values())
     
     def get_project(self, project_id: int):
         """Get a specific project by ID."""
+        try:
+            return self._get_projects_cache().get(int(project_id))
+        except (TypeError, ValueError):
+            return None
+    
+    def get_project_summaries(self):
+        """Get all projects with their entry count and total hours.
+        
+        Returns rows of (id, name, created_at, entry_count, total_hours), read
+        from the trigger-maintained project_totals table.
+        """
         cursor = self.conn.cursor()
-        cursor.execute("SELECT id, name, created_at FROM projects WHERE id = ?", (project_id,))
-        return cursor.fetchone()
+        cursor.execute("""
+            SELECT p.id, p.name, p.created_at,
+                   COALESCE(t.entry_count, 0) AS entry_count,
+                   COALESCE(t.total_hours, 0) AS total_hours
+            FROM projects p
+            LEFT JOIN project_totals t ON t.project_id = p.id
+            ORDER BY p.name
+        """)
+        return cursor.fetchall()
+    
+    def rebuild_project_totals(self):
+        """Recompute the project_totals table from live and archived entries."""
+        with self.transaction():
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM project_totals")
+            cursor.execute(f"""
+                INSERT INTO project_totals (project_id, entry_count, total_hours, first_day, last_day)
+                SELECT project_id, SUM(entry_count), SUM(total_hours), MIN(day), MAX(day)
+                FROM ({ALL_DAILY_TOTALS_SQL}) GROUP BY project_id
+            """)
+    
+    def verify_project_totals(self, tolerance: float = 1e-6):
+        """Compare project_totals with totals recomputed from live and archived entries.
+        
+        Returns the IDs of projects whose stored totals are wrong or missing.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            WITH all_daily AS ({ALL_DAILY_TOTALS_SQL}),
+            actual AS (
+                SELECT project_id, SUM(entry_count) AS entry_count, SUM(total_hours) AS total_hours,
+                       MIN(day) AS first_day, MAX(day) AS last_day
+                FROM all_daily GROUP BY project_id
+            )
+            SELECT a.project_id
+            FROM actual a
+            LEFT JOIN project_totals t ON t.project_id = a.project_id
+            WHERE t.project_id IS NULL
+               OR a.entry_count != t.entry_count
+               OR ABS(a.total_hours - t.total_hours) > ?
+               OR a.first_day IS NOT t.first_day
+               OR a.last_day IS NOT t.last_day
+            UNION
+            SELECT t.project_id
+            FROM project_totals t
+            WHERE NOT EXISTS (SELECT 1 FROM all_daily a WHERE a.project_id = t.project_id)
+              AND (t.entry_count != 0 OR ABS(t.total_hours) > ? OR t.first_day IS NOT NULL)
+        """, (tolerance, tolerance))
+        return [row[0] for row in cursor.fetchall()]
+    
+    def get_daily_totals(self, project_ids=None, from_date: str = None, to_date: str = None):
+        """Get per-project daily totals from the daily_totals rollup.
+        
+        Filters by a list of project IDs (all projects when None) and date
+        range. Returns rows of (project_name, date, entry_count, total_hours)
+        ordered by date and project name.
+        """
+        conditions = []
+        params = []
+        if project_ids is not None:
+            conditions.append(f"d.project_id IN ({', '.join('?' * len(project_ids))})")
+            params.extend(project_ids)
+        if from_date:
+            conditions.append("d.day >= ?")
+            params.append(to_day(from_date))
+        if to_date:
+            conditions.append("d.day <= ?")
+            params.append(to_day(to_date))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT p.name, {day_sql("d.day")}, d.entry_count, d.total_hours
+            FROM daily_totals d
+            JOIN projects p ON p.id = d.project_id
+            {where}
+            ORDER BY d.day, p.name
+        """, params)
+        return cursor.fetchall()
+    
+    def rebuild_daily_totals(self):
+        """Recompute the daily_totals table from live and archived entries."""
+        with self.transaction():
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM daily_totals")
+            cursor.execute(f"""
+                INSERT INTO daily_totals (project_id, day, entry_count, total_hours)
+                SELECT project_id, day, entry_count, total_hours FROM ({ALL_DAILY_TOTALS_SQL})
+            """)
+    
+    def verify_daily_totals(self, tolerance: float = 1e-6):
+        """Compare daily_totals with totals recomputed from live and archived entries.
+        
+        Returns (project_id, date) pairs whose stored totals are wrong, missing
+        or left over.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            WITH actual AS ({ALL_DAILY_TOTALS_SQL})
+            SELECT a.project_id, {day_sql("a.day")}
+            FROM actual a
+            LEFT JOIN daily_totals d ON d.project_id = a.project_id AND d.day = a.day
+            WHERE d.project_id IS NULL
+               OR a.entry_count != d.entry_count
+               OR ABS(a.total_hours - d.total_hours) > ?
+            UNION
+            SELECT d.project_id, {day_sql("d.day")}
+            FROM daily_totals d
+            WHERE NOT EXISTS (
+                SELECT 1 FROM actual a WHERE a.project_id = d.project_id AND a.day = d.day
+            )
+        """, (tolerance,))
+        return cursor.fetchall()
     
     def update_project(self, project_id: int, name: str):
         """Update a project name."""
         cursor = self.conn.cursor()
         cursor.execute("UPDATE projects SET name = ? WHERE id = ?", (name, project_id))
-        self.conn.commit()
+        self._projects_cache = None
+        self._commit()
     
     def delete_project(self, project_id: int):
-        """Delete a project and all its entries."""
+        """Delete a project and all its entries, including archived ones."""
         cursor = self.conn.cursor()
         cursor.execute("DELETE FROM entries WHERE project_id = ?", (project_id,))
         cursor.execute("DELETE FROM projects WHERE id = ?", (project_id,))
-        self.conn.commit()
+        self._projects_cache = None
+        self._deleted_archive_projects.append(int(project_id))
+        self._commit()
     
     # Entry operations
     def create_entry(self, project_id: int, date: str, hours: float, description: str) -> int:
         """Create a new entry and return its ID."""
         cursor = self.conn.cursor()
         cursor.execute(
-            "INSERT INTO entries (project_id, date, hours, description) VALUES (?, ?, ?, ?)",
-            (project_id, date, hours, description)
+            "INSERT INTO entries (project_id, day, hours, description) VALUES (?, ?, ?, ?)",
+            (project_id, to_day(date), hours, description)
         )
-        self.conn.commit()
+        self._commit()
         return cursor.lastrowid
     
     def get_entries_for_project(self, project_id: int, from_date: str = None, to_date: str = None):
@@ -110,44 +975,211 @@ class Database:
         
         if from_date and to_date:
             cursor.execute(
-                """SELECT id, date, hours, description, created_at 
+                f"""SELECT id, {day_sql("day")}, hours, description, created_at 
                    FROM entries 
-                   WHERE project_id = ? AND date BETWEEN ? AND ?
-                   ORDER BY date DESC""",
-                (project_id, from_date, to_date)
+                   WHERE project_id = ? AND day BETWEEN ? AND ?
+                   ORDER BY day DESC""",
+                (project_id, to_day(from_date), to_day(to_date))
             )
         elif from_date:
             cursor.execute(
-                """SELECT id, date, hours, description, created_at 
+                f"""SELECT id, {day_sql("day")}, hours, description, created_at 
                    FROM entries 
-                   WHERE project_id = ? AND date >= ?
-                   ORDER BY date DESC""",
-                (project_id, from_date)
+                   WHERE project_id = ? AND day >= ?
+                   ORDER BY day DESC""",
+                (project_id, to_day(from_date))
             )
         elif to_date:
             cursor.execute(
-                """SELECT id, date, hours, description, created_at 
+                f"""SELECT id, {day_sql("day")}, hours, description, created_at 
                    FROM entries 
-                   WHERE project_id = ? AND date <= ?
-                   ORDER BY date DESC""",
-                (project_id, to_date)
+                   WHERE project_id = ? AND day <= ?
+                   ORDER BY day DESC""",
+                (project_id, to_day(to_date))
             )
         else:
             cursor.execute(
-                """SELECT id, date, hours, description, created_at 
+                f"""SELECT id, {day_sql("day")}, hours, description, created_at 
                    FROM entries 
                    WHERE project_id = ?
-                   ORDER BY date DESC""",
+                   ORDER BY day DESC""",
                 (project_id,)
             )
         
+        entries = cursor.fetchall()
+        if self.get_archived_totals([project_id], from_date, to_date)[0]:
+            from archive import get_archived_entries
+            entries += get_archived_entries(self, project_id, from_date, to_date)
+            entries.sort(key=lambda entry: entry[1], reverse=True)
+        return entries
+    
+    def get_entries_page(self, project_ids=None, from_date: str = None, to_date: str = None,
+                         after: tuple = None, limit: int = 50):
+        """Get one page of entries, newest first, optionally filtered by projects and date range.
+        
+        Pages are keyed on (date, id): pass the (date, id) of the last entry of the
+        previous page as `after` to get the next one. Filters by a list of project
+        IDs; None pages through all projects. Rows are (id, date, hours,
+        description, created_at, project_id).
+        """
+        conditions = []
+        params = []
+        if project_ids is not None:
+            conditions.append(f"project_id IN ({', '.join('?' * len(project_ids))})")
+            params.extend(project_ids)
+        if from_date:
+            conditions.append("day >= ?")
+            params.append(to_day(from_date))
+        if to_date:
+            conditions.append("day <= ?")
+            params.append(to_day(to_date))
+        if after:
+            conditions.append("(day, id) < (?, ?)")
+            params.extend((to_day(after[0]), after[1]))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
+        
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"""SELECT id, {day_sql("day")}, hours, description, created_at, project_id
+                FROM entries
+                {where}
+                ORDER BY day DESC, id DESC
+                LIMIT ?""",
+            params
+        )
         return cursor.fetchall()
     
+    def get_entry_totals(self, project_id: int, from_date: str = None, to_date: str = None):
+        """Get (entry_count, total_hours) for a project, optionally filtered by date range.
+        
+        Archived entries are included.
+        """
+        if not from_date and not to_date:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "SELECT entry_count, total_hours FROM project_totals WHERE project_id = ?",
+                (project_id,)
+            )
+            return cursor.fetchone() or (0, 0)
+        
+        conditions = ["project_id = ?"]
+        params = [project_id]
+        if from_date:
+            conditions.append("day >= ?")
+            params.append(to_day(from_date))
+        if to_date:
+            conditions.append("day <= ?")
+            params.append(to_day(to_date))
+        
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"""SELECT COALESCE(SUM(entry_count), 0), COALESCE(SUM(total_hours), 0)
+                FROM daily_totals WHERE {' AND '.join(conditions)}""",
+            params
+        )
+        return cursor.fetchone()
+    
+    def iter_entry_chunks(self, project_ids=None, from_date: str = None, to_date: str = None,
+                          chunk_size: int = 10_000):
+        """Yield entries in chunks of rows, newest first, straight from the cursor.
+        
+        Filters by a list of project IDs (all projects when None) and date range.
+        Rows are (project_name, date, hours, description). Archived entries
+        follow the live ones.
+        """
+        conditions = []
+        params = []
+        if project_ids is not None:
+            conditions.append(f"e.project_id IN ({', '.join('?' * len(project_ids))})")
+            params.extend(project_ids)
+        if from_date:
+            conditions.append("e.day >= ?")
+            params.append(to_day(from_date))
+        if to_date:
+            conditions.append("e.day <= ?")
+            params.append(to_day(to_date))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"""SELECT p.name, {day_sql("e.day")}, e.hours, e.description
+                FROM entries e
+                JOIN projects p ON p.id = e.project_id
+                {where}
+                ORDER BY e.day DESC, e.id DESC""",
+            params
+        )
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+        
+        if self.get_archived_totals(project_ids, from_date, to_date)[0]:
+            from archive import iter_archived_chunks
+            yield from iter_archived_chunks(self, project_ids, from_date, to_date, chunk_size)
+    
+    def search_entries(self, query: str, from_date: str = None, to_date: str = None, limit: int = 50):
+        """Full-text search entry descriptions across all projects.
+        
+        Every word of query must match the start of a word in the description;
+        FTS5 syntax in query is not interpreted. All matches in the date range
+        are ranked by bm25, so the cost grows with the number of matches.
+        Archived entries are not in the index; their matches follow, newest
+        first. Returns up to limit rows of (id, project_name, date, hours,
+        description, project_id), best match first.
+        """
+        terms = SEARCH_TERM_PATTERN.findall(query)
+        if not terms:
+            return []
+        match = " ".join(f'"{term}"*' for term in terms)
+        
+        conditions = ["entries_fts MATCH ?"]
+        params = [match]
+        if from_date:
+            conditions.append("e.day >= ?")
+            params.append(to_day(from_date))
+        if to_date:
+            conditions.append("e.day <= ?")
+            params.append(to_day(to_date))
+        params.append(limit)
+        # Entries are only looked up for a date filter; bm25() in ORDER BY,
+        # unlike the rank column, is computed for the matches left after it
+        date_join = "JOIN entries e ON e.id = entries_fts.rowid" if len(conditions) > 1 else ""
+        
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT e.id, p.name, {day_sql("e.day")}, e.hours, e.description, e.project_id
+            FROM (
+                SELECT entries_fts.rowid AS id, bm25(entries_fts) AS rank
+                FROM entries_fts
+                {date_join}
+                WHERE {' AND '.join(conditions)}
+                ORDER BY bm25(entries_fts)
+                LIMIT ?
+            ) m
+            JOIN entries e ON e.id = m.id
+            JOIN projects p ON p.id = e.project_id
+            ORDER BY m.rank
+        """, params)
+        rows = cursor.fetchall()
+        
+        if len(rows) < limit and self.get_archived_totals(None, from_date, to_date)[0]:
+            from archive import search_archived_entries
+            rows.extend(search_archived_entries(self, terms, from_date, to_date, limit - len(rows)))
+        return rows
+    
+    def rebuild_search_index(self):
+        """Rebuild the full-text index from the entries table."""
+        with self.transaction():
+            self.conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+    
     def get_entry(self, entry_id: int):
         """Get a specific entry by ID."""
         cursor = self.conn.cursor()
         cursor.execute(
-            "SELECT id, project_id, date, hours, description, created_at FROM entries WHERE id = ?",
+            f"SELECT id, project_id, {day_sql('day')}, hours, description, created_at FROM entries WHERE id = ?",
             (entry_id,)
         )
         return cursor.fetchone()
@@ -156,24 +1188,230 @@ class Database:
         """Update an entry."""
         cursor = self.conn.cursor()
         cursor.execute(
-            "UPDATE entries SET date = ?, hours = ?, description = ? WHERE id = ?",
-            (date, hours, description, entry_id)
+            "UPDATE entries SET day = ?, hours = ?, description = ? WHERE id = ?",
+            (to_day(date), hours, description, entry_id)
         )
-        self.conn.commit()
+        self._commit()
     
     def delete_entry(self, entry_id: int):
         """Delete an entry."""
         cursor = self.conn.cursor()
         cursor.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
-        self.conn.commit()
+        self._commit()
+    
+    def create_entries_bulk(self, entries) -> int:
+        """Create many entries in one transaction.
+        
+        entries is an iterable of (project_id, date, hours, description) tuples.
+        Returns the number of entries created.
+        """
+        with self.transaction():
+            cursor = self.conn.cursor()
+            cursor.executemany(
+                "INSERT INTO entries (project_id, day, hours, description) VALUES (?, ?, ?, ?)",
+                ((project_id, to_day(date), hours, description) for project_id, date, hours, description in entries)
+            )
+        return cursor.rowcount
+    
+    def update_entries_bulk(self, entries) -> int:
+        """Update many entries in one transaction.
+        
+        entries is an iterable of (entry_id, date, hours, description) tuples.
+        Returns the number of entries updated.
+        """
+        with self.transaction():
+            cursor = self.conn.cursor()
+            cursor.executemany(
+                "UPDATE entries SET day = ?, hours = ?, description = ? WHERE id = ?",
+                ((to_day(date), hours, description, entry_id) for entry_id, date, hours, description in entries)
+            )
+        return cursor.rowcount
+    
+    def delete_entries_bulk(self, entry_ids) -> int:
+        """Delete many entries in one transaction. Returns the number of entries deleted."""
+        with self.transaction():
+            cursor = self.conn.cursor()
+            cursor.executemany(
+                "DELETE FROM entries WHERE id = ?",
+                ((entry_id,) for entry_id in entry_ids)
+            )
+        return cursor.rowcount
+    
+    # Archive operations
+    def get_archive_dir(self):
+        """Get the directory of the Parquet archive, or None for in-memory databases."""
+        return get_archive_dir(self.db_path)
+    
+    def _adopt_legacy_archive(self):
+        """Move this database's files out of the archive directory shared by earlier versions.
+        
+        Only files of batches recorded in this database are moved, so the
+        archives of other databases in the same folder stay where they are.
+        """
+        legacy_dir = os.path.join(os.path.dirname(os.path.abspath(self.db_path)), LEGACY_ARCHIVE_DIR_NAME)
+        if not os.path.isdir(legacy_dir):
+            return
+        
+        batches = self.get_archive_batches()
+        archive_dir = self.get_archive_dir()
+        # Pending files of committed batches are moved too, for recover_archive to finish
+        for path in glob.glob(os.path.join(legacy_dir, "project_id=*", "year=*", "part-*.parquet*")):
+            if os.path.basename(path)[len("part-"):].split(".parquet")[0] not in batches:
+                continue
+            target = os.path.join(archive_dir, os.path.relpath(path, legacy_dir))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(path, target)
+        
+        # Remove the directories left empty, deepest first
+        for dir_path, _, _ in sorted(os.walk(legacy_dir), key=lambda walked: -len(walked[0])):
+            try:
+                os.rmdir(dir_path)
+            except OSError:
+                pass
+    
+    def _remove_deleted_archives(self):
+        """Remove the archive files of projects whose deletion has been committed.
+        
+        Projects that still exist, because a savepoint holding their deletion
+        was rolled back, keep their files.
+        """
+        project_ids, self._deleted_archive_projects = self._deleted_archive_projects, []
+        archive_dir = self.get_archive_dir()
+        if not project_ids or archive_dir is None:
+            return
+        for project_id in project_ids:
+            if self.conn.execute("SELECT 1 FROM projects WHERE id = ?", (project_id,)).fetchone() is None:
+                shutil.rmtree(os.path.join(archive_dir, f"project_id={project_id}"), ignore_errors=True)
+    
+    def get_archived_totals(self, project_ids=None, from_date: str = None, to_date: str = None):
+        """Get (entry_count, total_hours) of archived entries, filtered like iter_entry_chunks."""
+        conditions = []
+        params = []
+        if project_ids is not None:
+            conditions.append(f"project_id IN ({', '.join('?' * len(project_ids))})")
+            params.extend(project_ids)
+        if from_date:
+            conditions.append("day >= ?")
+            params.append(to_day(from_date))
+        if to_date:
+            conditions.append("day <= ?")
+            params.append(to_day(to_date))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"""SELECT COALESCE(SUM(entry_count), 0), COALESCE(SUM(total_hours), 0)
+                FROM archived_daily_totals {where}""",
+            params
+        )
+        return cursor.fetchone()
+    
+    def get_archive_batches(self):
+        """Get the names of all committed archive batches."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT name FROM archive_batches")
+        return {row[0] for row in cursor.fetchall()}
+    
+    def remove_archived_entries(self, cutoff: str, batch: str) -> int:
+        """Delete entries dated before cutoff once they are written to the archive.
+        
+        Must run inside the transaction that read them. Their daily aggregates
+        move to archived_daily_totals and are added back to project_totals and
+        daily_totals, so totals and aggregate reports still include them. The
+        batch name is recorded with the deletion. Returns the number of entries removed.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("DROP TABLE IF EXISTS temp.archive_batch")
+        cursor.execute("""
+            CREATE TEMP TABLE archive_batch AS
+            SELECT project_id, day, COUNT(*) AS entry_count, SUM(hours) AS total_hours
+            FROM entries WHERE day < ? GROUP BY project_id, day
+        """, (to_day(cutoff),))
+        try:
+            cursor.execute("""
+                INSERT INTO archived_daily_totals (project_id, day, entry_count, total_hours)
+                SELECT project_id, day, entry_count, total_hours FROM temp.archive_batch WHERE true
+                ON CONFLICT (project_id, day) DO UPDATE SET
+                    entry_count = entry_count + excluded.entry_count,
+                    total_hours = total_hours + excluded.total_hours
+            """)
+            removed = cursor.execute("DELETE FROM entries WHERE day < ?", (to_day(cutoff),)).rowcount
+            
+            # The delete triggers subtracted the archived entries; add them back
+            cursor.execute("""
+                INSERT INTO daily_totals (project_id, day, entry_count, total_hours)
+                SELECT project_id, day, entry_count, total_hours FROM temp.archive_batch WHERE true
+                ON CONFLICT (project_id, day) DO UPDATE SET
+                    entry_count = entry_count + excluded.entry_count,
+                    total_hours = total_hours + excluded.total_hours
+            """)
+            cursor.execute("""
+                INSERT INTO project_totals (project_id, entry_count, total_hours, first_day, last_day)
+                SELECT project_id, SUM(entry_count), SUM(total_hours), MIN(day), MAX(day)
+                FROM temp.archive_batch WHERE true GROUP BY project_id
+                ON CONFLICT (project_id) DO UPDATE SET
+                    entry_count = entry_count + excluded.entry_count,
+                    total_hours = total_hours + excluded.total_hours,
+                    first_day = MIN(COALESCE(first_day, excluded.first_day), excluded.first_day),
+                    last_day = MAX(COALESCE(last_day, excluded.last_day), excluded.last_day)
+            """)
+            cursor.execute(
+                "INSERT INTO archive_batches (name, cutoff, entry_count) VALUES (?, ?, ?)",
+                (batch, cutoff, removed)
+            )
+        finally:
+            cursor.execute("DROP TABLE IF EXISTS temp.archive_batch")
+        return removed
+    
+    # Timer operations
+    def start_timer(self, project_id: int, description: str = "") -> str:
+        """Start the timer of a project and return its start time.
+        
+        Start times are local ISO timestamps. If the timer is already
+        running, it keeps its original start time.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "INSERT OR IGNORE INTO running_timers (project_id, started_at, description) VALUES (?, ?, ?)",
+            (project_id, datetime.now().isoformat(timespec="seconds"), description)
+        )
+        self._commit()
+        return self.get_running_timer(project_id)[0]
+    
+    def get_running_timer(self, project_id: int):
+        """Get (started_at, description) of a project's running timer, or None."""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT started_at, description FROM running_timers WHERE project_id = ?",
+            (project_id,)
+        )
+        return cursor.fetchone()
+    
+    def stop_timer(self, project_id: int, description: str = None):
+        """Stop a project's timer and record the elapsed time as an entry.
+        
+        The entry is dated on the day the timer started, with hours rounded to
+        two decimals (at least 0.01). The timer's own description is used
+        unless one is given. Returns (entry_id, date, hours, description), or
+        None if the timer was not running.
+        """
+        with self.transaction():
+            timer = self.get_running_timer(project_id)
+            if timer is None:
+                return None
+            started_at = datetime.fromisoformat(timer[0])
+            hours = max(round((datetime.now() - started_at).total_seconds() / 3600, 2), 0.01)
+            entry_date = started_at.strftime("%Y-%m-%d")
+            description = timer[1] if description is None else description
+            
+            entry_id = self.create_entry(project_id, entry_date, hours, description)
+            self.conn.execute("DELETE FROM running_timers WHERE project_id = ?", (project_id,))
+        return entry_id, entry_date, hours, description
     
     # Settings operations
     def get_setting(self, key: str, default: str = None):
         """Get a setting value by key. Returns default if not found."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
-        result = cursor.fetchone()
-        return result[0] if result else default
+        return self._get_settings_cache().get(key, default)
     
     def set_setting(self, key: str, value: str):
         """Set a setting value (insert or update)."""
@@ -182,15 +1420,104 @@ class Database:
             INSERT INTO settings (key, value) VALUES (?, ?)
             ON CONFLICT(key) DO UPDATE SET value = ?, updated_at = CURRENT_TIMESTAMP
         """, (key, value, value))
-        self.conn.commit()
+        self._settings_cache = None
+        self._commit()
     
     def get_all_settings(self):
         """Get all settings as a dictionary."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT key, value FROM settings")
-        return {row[0]: row[1] for row in cursor.fetchall()}
+        return dict(self._get_settings_cache())
+    
+    # Instrumentation operations
+    def _configure_instrumentation(self):
+        """Enable or disable query instrumentation according to the settings."""
+        if self.get_setting(INSTRUMENTATION_SETTING, "0") == "1":
+            slow_query_ms = float(self.get_setting(SLOW_QUERY_SETTING, str(DEFAULT_SLOW_QUERY_MS)))
+            if self.stats is None:
+                self.stats = QueryStats(slow_query_ms)
+                if self.db_path != ":memory:":
+                    log_dir = os.path.dirname(os.path.abspath(self.db_path))
+                    open_slow_query_log(os.path.join(log_dir, SLOW_QUERY_LOG_NAME))
+            else:
+                self.stats.slow_query_ms = slow_query_ms
+        else:
+            self.stats = None
+        self.conn.stats = self.stats
+    
+    def set_instrumentation(self, enabled: bool, slow_query_ms: float = None):
+        """Turn query instrumentation on or off, optionally changing the slow-query threshold."""
+        self.set_setting(INSTRUMENTATION_SETTING, "1" if enabled else "0")
+        if slow_query_ms is not None:
+            self.set_setting(SLOW_QUERY_SETTING, str(float(slow_query_ms)))
+        self._configure_instrumentation()
+    
+    def get_query_stats(self):
+        """Get a snapshot of the query stats, or None if instrumentation is off."""
+        if self.stats is None:
+            return None
+        snapshot = self.stats.snapshot()
+        snapshot["sqlite_version"] = sqlite3.sqlite_version
+        snapshot["schema_version"] = SCHEMA_VERSION
+        snapshot["cache"] = self.get_cache_stats()
+        return snapshot
+    
+    def reset_query_stats(self):
+        """Clear the collected query stats."""
+        if self.stats is not None:
+            self.stats.reset()
     
     def close(self):
-        """Close database connection."""
+        """Close database connection, returning pooled connections to their pool."""
         if self.conn:
-            self.conn.close()
\ No newline at end of file
+            self.conn.stats = None
+            if self.pool:
+                self.pool.release(self.conn)
+            else:
+                self.conn.close()
+            self.conn = None
+
+
+class AsyncDatabase:
+    """Run Database operations on a dedicated worker thread.
+    
+    Every public Database method is available as a coroutine with the same
+    signature. Calls run one at a time on a single worker thread, which owns
+    the SQLite connection, so the event loop is never blocked by a query.
+    Generators and context managers such as iter_entry_chunks and
+    transaction would run on the event loop once returned, so they are not
+    available; pass a function using them to run() instead.
+    """
+    
+    def __init__(self, db: Database = None):
+        self.db = db or Database()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="time-tracker-db")
+    
+    async def initialize(self):
+        """Initialize the database, connecting on the worker thread."""
+        db_path = await self.db.resolve_db_path()
+        await self.run(self.db.connect, db_path)
+    
+    async def run(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) on the database worker thread and return its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    async def close(self):
+        """Close the database connection and stop the worker thread."""
+        await self.run(self.db.close)
+        self._executor.shutdown(wait=False)
+    
+    def __getattr__(self, name):
+        attribute = getattr(self.db, name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+        if inspect.isgeneratorfunction(inspect.unwrap(attribute)):
+            raise AttributeError(
+                f"{type(self).__name__}.{name} would be used off the worker thread; "
+                f"call it inside a function passed to run()"
+            )
+        
+        @functools.wraps(attribute)
+        async def call(*args, **kwargs):
+            return await self.run(attribute, *args, **kwargs)
+        
+        return call
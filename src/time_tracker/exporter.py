@@ -0,0 +1,58 @@
+from datetime import datetime
+import xlsxwriter
+
+EXPORT_CHUNK_SIZE = 10_000
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def export_entries_to_excel(db, path: str, project_ids=None, from_date: str = None, to_date: str = None,
+                            chunk_size: int = EXPORT_CHUNK_SIZE) -> int:
+    """Stream entries from the database into an Excel file at path.
+    
+    Rows are fetched from the cursor in chunks and written with xlsxwriter's
+    constant_memory mode, so neither the query result nor the workbook is
+    held in memory. A Project column is included unless exactly one project
+    is exported. Entries that do not fit on one worksheet continue on the next.
+    
+    Returns the number of entries written.
+    """
+    include_project = project_ids is None or len(project_ids) != 1
+    headers = ["Date", "Hours", "Description"]
+    if include_project:
+        headers.insert(0, "Project")
+    
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    try:
+        header_format = workbook.add_format({"bold": True})
+        date_format = workbook.add_format({"num_format": "yyyy-mm-dd"})
+        
+        def add_worksheet():
+            sheet_number = len(workbook.worksheets()) + 1
+            worksheet = workbook.add_worksheet("Entries" if sheet_number == 1 else f"Entries {sheet_number}")
+            worksheet.write_row(0, 0, headers, header_format)
+            worksheet.set_column(0, len(headers) - 2, 12)
+            worksheet.set_column(len(headers) - 1, len(headers) - 1, 60)
+            return worksheet
+        
+        worksheet = add_worksheet()
+        row = 0
+        written = 0
+        for chunk in db.iter_entry_chunks(project_ids, from_date, to_date, chunk_size):
+            for project_name, entry_date, hours, description in chunk:
+                row += 1
+                if row == EXCEL_MAX_ROWS:
+                    worksheet = add_worksheet()
+                    row = 1
+                
+                column = 0
+                if include_project:
+                    worksheet.write_string(row, 0, project_name)
+                    column = 1
+                worksheet.write_datetime(row, column, datetime.strptime(entry_date, "%Y-%m-%d"), date_format)
+                worksheet.write_number(row, column + 1, hours)
+                worksheet.write_string(row, column + 2, description or "")
+                written += 1
+    finally:
+        workbook.close()
+    
+    return written
@@ -0,0 +1,98 @@
+import os
+import polars as pl
+
+# Columns expected in an import file; matching is case-insensitive and
+# Description is optional. This mirrors the columns of the Excel export.
+IMPORT_COLUMNS = ("Project", "Date", "Hours", "Description")
+REQUIRED_IMPORT_COLUMNS = ("Project", "Date", "Hours")
+IMPORT_DATE_FORMAT = "%Y-%m-%d"
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def _resolve_columns(columns) -> dict:
+    """Map the file's column names to IMPORT_COLUMNS, ignoring case and surrounding spaces."""
+    by_name = {column.strip().lower(): column for column in columns}
+    missing = [name for name in REQUIRED_IMPORT_COLUMNS if name.lower() not in by_name]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+    return {by_name[name.lower()]: name for name in IMPORT_COLUMNS if name.lower() in by_name}
+
+
+def _read_chunks(path: str, chunk_size: int):
+    """Yield DataFrame chunks with the import columns, without materializing the whole file."""
+    extension = os.path.splitext(path)[1].lower()
+    
+    if extension == ".csv":
+        # Read every column as text; parsing happens in _validate_chunk
+        lazy_frame = pl.scan_csv(path, infer_schema=False)
+    elif extension in (".xlsx", ".xls"):
+        lazy_frame = pl.read_excel(path).lazy()
+    else:
+        raise ValueError(f"Unsupported file type: {extension or path}")
+    
+    mapping = _resolve_columns(lazy_frame.collect_schema().names())
+    lazy_frame = lazy_frame.select(mapping.keys()).rename(mapping)
+    if "Description" not in mapping.values():
+        lazy_frame = lazy_frame.with_columns(pl.lit(None, dtype=pl.String).alias("Description"))
+    
+    yield from lazy_frame.collect_batches(chunk_size=chunk_size)
+
+
+def _validate_chunk(chunk: pl.DataFrame) -> pl.DataFrame:
+    """Parse and validate a chunk, keeping only rows with a project, a valid date and positive hours."""
+    if chunk.schema["Date"] in (pl.Date, pl.Datetime):
+        date_expr = pl.col("Date").cast(pl.Date)
+    else:
+        date_expr = pl.col("Date").cast(pl.String).str.strip_chars().str.to_date(IMPORT_DATE_FORMAT, strict=False)
+    
+    return (
+        chunk.select(
+            pl.col("Project").cast(pl.String).str.strip_chars(),
+            date_expr.dt.strftime(IMPORT_DATE_FORMAT).alias("Date"),
+            pl.col("Hours").cast(pl.String).str.strip_chars().cast(pl.Float64, strict=False),
+            pl.col("Description").cast(pl.String).fill_null(""),
+        )
+        .filter(
+            pl.col("Project").is_not_null()
+            & (pl.col("Project") != "")
+            & pl.col("Date").is_not_null()
+            & pl.col("Hours").is_not_null()
+            & (pl.col("Hours") > 0)
+        )
+    )
+
+
+def import_entries(db, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Import time entries from a CSV or Excel file.
+    
+    The file needs Project, Date (YYYY-MM-DD) and Hours columns, and may have
+    a Description column. Projects are matched by name and created when
+    missing. Rows with a missing project, an invalid date or non-positive
+    hours are skipped. The import runs in a single transaction.
+    
+    Returns a tuple of (imported, skipped) row counts.
+    """
+    project_ids = {name: project_id for project_id, name, _ in db.get_all_projects()}
+    imported = 0
+    skipped = 0
+    
+    with db.transaction():
+        for chunk in _read_chunks(path, chunk_size):
+            valid = _validate_chunk(chunk)
+            skipped += chunk.height - valid.height
+            if valid.is_empty():
+                continue
+            
+            for name in valid["Project"].unique().to_list():
+                if name not in project_ids:
+                    project_ids[name] = db.create_project(name)
+            
+            rows = valid.select(
+                pl.col("Project").replace_strict(project_ids, return_dtype=pl.Int64),
+                "Date",
+                "Hours",
+                "Description",
+            )
+            imported += db.create_entries_bulk(rows.iter_rows())
+    
+    return imported, skipped
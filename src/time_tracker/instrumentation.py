@@ -0,0 +1,248 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, float("inf"))
+DEFAULT_SLOW_QUERY_MS = 100.0
+SLOW_QUERY_LOG_SIZE = 200
+
+SLOW_QUERY_LOG_NAME = "slow_queries.log"
+
+# Silent unless a handler is attached, e.g. by open_slow_query_log
+slow_query_logger = logging.getLogger("time_tracker.slow_queries")
+slow_query_logger.addHandler(logging.NullHandler())
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_PLACEHOLDER_LIST_PATTERN = re.compile(r"\(\?(?:,\s*\?)+\)")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and variable-length placeholder lists so equal statements share stats."""
+    sql = _WHITESPACE_PATTERN.sub(" ", sql).strip()
+    return _PLACEHOLDER_LIST_PATTERN.sub("(?, ...)", sql)
+
+
+def open_slow_query_log(path: str):
+    """Append slow queries to the log file at path; repeated calls for one path are ignored."""
+    path = os.path.abspath(path)
+    for handler in slow_query_logger.handlers:
+        if isinstance(handler, logging.FileHandler) and handler.baseFilename == path:
+            return
+    handler = logging.FileHandler(path, delay=True)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    slow_query_logger.addHandler(handler)
+
+
+class QueryStats:
+    """Thread-safe call counts, latency histograms and row counts, plus a slow-query log.
+    
+    Stats are kept per Database method and per normalized SQL statement.
+    Statements slower than slow_query_ms are logged to the
+    "time_tracker.slow_queries" logger and kept in a bounded in-memory log.
+    """
+    
+    def __init__(self, slow_query_ms: float = DEFAULT_SLOW_QUERY_MS):
+        self.slow_query_ms = slow_query_ms
+        self.started_at = datetime.now()
+        self._methods = {}
+        self._statements = {}
+        self._slow_queries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+        self._lock = threading.Lock()
+    
+    def _record(self, table: dict, name: str, elapsed_ms: float, rows: int):
+        entry = table.get(name)
+        if entry is None:
+            entry = table[name] = {
+                "calls": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "rows": 0,
+                "histogram": [0] * len(LATENCY_BUCKETS_MS),
+            }
+        entry["calls"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["rows"] += rows
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                entry["histogram"][index] += 1
+                break
+    
+    def record_method(self, name: str, elapsed_ms: float, rows: int = 0):
+        """Record one call of a Database method."""
+        with self._lock:
+            self._record(self._methods, name, elapsed_ms, rows)
+    
+    def record_statement(self, sql: str, elapsed_ms: float):
+        """Record one execution of a SQL statement, logging it if it was slow."""
+        sql = normalize_sql(sql)
+        with self._lock:
+            self._record(self._statements, sql, elapsed_ms, 0)
+            if elapsed_ms >= self.slow_query_ms:
+                self._slow_queries.append({
+                    "at": datetime.now().isoformat(timespec="seconds"),
+                    "ms": round(elapsed_ms, 3),
+                    "sql": sql,
+                })
+        if elapsed_ms >= self.slow_query_ms:
+            slow_query_logger.warning("slow query (%.1f ms): %s", elapsed_ms, sql)
+    
+    def record_rows(self, sql: str, rows: int):
+        """Add fetched rows to a statement's row count."""
+        sql = normalize_sql(sql)
+        with self._lock:
+            entry = self._statements.get(sql)
+            if entry is not None:
+                entry["rows"] += rows
+    
+    def reset(self):
+        """Clear all stats and the slow-query log."""
+        with self._lock:
+            self._methods.clear()
+            self._statements.clear()
+            self._slow_queries.clear()
+            self.started_at = datetime.now()
+    
+    def snapshot(self) -> dict:
+        """Get a JSON-serializable copy of the stats, slowest totals first."""
+        def ordered(table):
+            return {
+                name: dict(entry, histogram=list(entry["histogram"]))
+                for name, entry in sorted(table.items(), key=lambda item: -item[1]["total_ms"])
+            }
+        
+        with self._lock:
+            return {
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "slow_query_ms": self.slow_query_ms,
+                "histogram_buckets_ms": [str(bound) for bound in LATENCY_BUCKETS_MS],
+                "methods": ordered(self._methods),
+                "statements": ordered(self._statements),
+                "slow_queries": list(self._slow_queries),
+            }
+    
+    def to_json(self) -> str:
+        """Serialize a snapshot of the stats as JSON."""
+        return json.dumps(self.snapshot(), indent=2)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that reports statement latency and fetched rows to its connection's stats."""
+    
+    _sql = None
+    
+    def execute(self, sql, parameters=()):
+        stats = self.connection.stats
+        if stats is None:
+            return super().execute(sql, parameters)
+        self._sql = sql
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            stats.record_statement(sql, (time.perf_counter() - start) * 1000)
+    
+    def executemany(self, sql, seq_of_parameters):
+        stats = self.connection.stats
+        if stats is None:
+            return super().executemany(sql, seq_of_parameters)
+        self._sql = sql
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            stats.record_statement(sql, (time.perf_counter() - start) * 1000)
+    
+    def _count_rows(self, rows: int):
+        stats = self.connection.stats
+        if stats is not None and self._sql is not None:
+            stats.record_rows(self._sql, rows)
+    
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            self._count_rows(1)
+        return row
+    
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._count_rows(len(rows))
+        return rows
+    
+    def fetchall(self):
+        rows = super().fetchall()
+        self._count_rows(len(rows))
+        return rows
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors are timed while stats is set; a no-op otherwise.
+    
+    Pass as the factory argument of sqlite3.connect.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = None
+    
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+    
+    # The built-in shortcuts create plain cursors without calling cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def instrument_methods(exclude=()):
+    """Class decorator timing every public, synchronous method while self.stats is set.
+    
+    Generator functions and the names in exclude are left alone, since their
+    call returns before any work is done.
+    """
+    def wrap(method):
+        name = method.__name__
+        
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            stats = self.stats
+            if stats is None:
+                return method(self, *args, **kwargs)
+            start = time.perf_counter()
+            rows = 0
+            try:
+                result = method(self, *args, **kwargs)
+                if isinstance(result, list):
+                    rows = len(result)
+                return result
+            finally:
+                stats.record_method(name, (time.perf_counter() - start) * 1000, rows)
+        
+        return wrapper
+    
+    def decorate(cls):
+        for name, attribute in list(vars(cls).items()):
+            if (
+                name.startswith("_")
+                or name in exclude
+                or not callable(attribute)
+                or isinstance(attribute, (staticmethod, classmethod))
+                or inspect.iscoroutinefunction(attribute)
+                or inspect.isgeneratorfunction(attribute)
+            ):
+                continue
+            setattr(cls, name, wrap(attribute))
+        return cls
+    
+    return decorate
@@ -1,3 +1,4 @@
+import asyncio
 import flet
 from flet import (
     Page,
@@ -22,6 +23,7 @@ from flet import (
     TextButton,
     OutlinedButton,
     Card,
+    Chip,
     FilePicker,
     InputFilter,
     Border,
@@ -29,23 +31,202 @@ from flet import (
     UrlLauncher,
 )
 from datetime import datetime, date
-from db_operations import Database
-import polars as pl
+from db_operations import AsyncDatabase
+from backup import (
+    BACKUP_INTERVAL_SETTING,
+    BACKUP_KEEP_SETTING,
+    DEFAULT_BACKUP_KEEP,
+    BackupScheduler,
+    create_backup,
+    get_last_backup,
+    list_backups,
+    record_backup,
+    restore_backup,
+)
 
 try:
     from time_tracker import __version__
 except ImportError:
     __version__ = "0.1.0"
-import tempfile
+import json
 import os
 
+ENTRIES_PAGE_SIZE = 50
+# Entries from before January 1st this many years ago are suggested for archiving
+ARCHIVE_AGE_YEARS = 2
+SEARCH_RESULTS_LIMIT = 100
+# Backup schedule choices in hours, 0 for off
+BACKUP_INTERVALS = [
+    ("0", "Off"),
+    ("1", "Every hour"),
+    ("6", "Every 6 hours"),
+    ("24", "Daily"),
+    ("168", "Weekly"),
+]
+
+
+class PagedEntryTable:
+    """Entries DataTable that holds only the current page of rows.
+    
+    Pages are fetched with keyset pagination through the coroutine
+    fetch_page(after, limit), where `after` is the (date, id) of the last row
+    of the previous page. After an edit, insert, replace and remove patch the
+    affected row in place instead of reloading the page.
+    """
+    
+    def __init__(self, columns, fetch_page, build_row, empty_row, page_size: int = ENTRIES_PAGE_SIZE):
+        self.fetch_page = fetch_page
+        self.build_row = build_row
+        self.empty_row = empty_row
+        self.page_size = page_size
+        self.total = 0
+        self.cursors = [None]
+        self.next_cursor = None
+        self.has_more = False
+        
+        # Entry tuples of the current page and their rows, newest first
+        self.entries = []
+        self.row_controls = []
+        
+        self.table = DataTable(
+            columns=columns,
+            rows=[],
+            border=Border.all(2, "grey"),
+            horizontal_margin=10,
+            data_row_max_height=100,
+            width=800,
+            show_bottom_border=True,
+        )
+        self.page_label = Text(size=14, color="grey")
+        self.previous_button = IconButton(Icons.CHEVRON_LEFT, on_click=self.previous_page, tooltip="Newer entries")
+        self.next_button = IconButton(Icons.CHEVRON_RIGHT, on_click=self.next_page, tooltip="Older entries")
+        self.control = Column(
+            [
+                self.table,
+                Row([self.previous_button, self.page_label, self.next_button], alignment="center"),
+            ]
+        )
+    
+    @staticmethod
+    def _key(entry):
+        """Pagination key of an entry tuple: (date, id)."""
+        return entry[1], entry[0]
+    
+    async def load(self, update: bool = True):
+        """Fetch the current page and rebuild its rows."""
+        rows = await self.fetch_page(self.cursors[-1], self.page_size + 1)
+        self.has_more = len(rows) > self.page_size
+        self.entries = rows[:self.page_size]
+        self.row_controls = [self.build_row(row) for row in self.entries]
+        self._refresh(update)
+    
+    def _refresh(self, update: bool):
+        """Sync the table rows, cursor and page label with the current page."""
+        self.table.rows = self.row_controls or [self.empty_row()]
+        self.next_cursor = self._key(self.entries[-1]) if self.has_more else None
+        
+        page = len(self.cursors)
+        pages = max(page, -(-self.total // self.page_size))
+        self.page_label.value = f"Page {page} of {pages}"
+        self.previous_button.disabled = page == 1
+        self.next_button.disabled = self.next_cursor is None
+        
+        if update:
+            self.control.update()
+    
+    def _place(self, entry):
+        """Add an entry's row if it sorts into the current page."""
+        key = self._key(entry)
+        upper = self.cursors[-1]
+        if upper is not None and key >= upper:
+            return
+        if self.has_more and (not self.entries or key < self._key(self.entries[-1])):
+            return
+        
+        index = 0
+        while index < len(self.entries) and self._key(self.entries[index]) > key:
+            index += 1
+        self.entries.insert(index, entry)
+        self.row_controls.insert(index, self.build_row(entry))
+    
+    def _take(self, entry_id: int):
+        """Remove an entry's row from the current page, returning its entry tuple or None."""
+        for index, entry in enumerate(self.entries):
+            if entry[0] == entry_id:
+                self.row_controls.pop(index)
+                return self.entries.pop(index)
+        return None
+    
+    async def _settle(self, update: bool):
+        """Trim or top up the current page to page_size rows after a change."""
+        if len(self.entries) > self.page_size:
+            self.entries.pop()
+            self.row_controls.pop()
+            self.has_more = True
+        elif len(self.entries) < self.page_size and self.has_more:
+            missing = self.page_size - len(self.entries)
+            after = self._key(self.entries[-1]) if self.entries else self.cursors[-1]
+            rows = await self.fetch_page(after, missing + 1)
+            self.has_more = len(rows) > missing
+            for row in rows[:missing]:
+                self.entries.append(row)
+                self.row_controls.append(self.build_row(row))
+        
+        if not self.entries and len(self.cursors) > 1:
+            # The last entry of a later page is gone; show the page before it
+            self.cursors.pop()
+            await self.load(update)
+            return
+        self._refresh(update)
+    
+    def get(self, entry_id: int):
+        """Get the entry tuple of a row on the current page, or None."""
+        for entry in self.entries:
+            if entry[0] == entry_id:
+                return entry
+        return None
+    
+    async def insert(self, entry, update: bool = True):
+        """Show a newly created entry, if it belongs on the current page."""
+        self.total += 1
+        self._place(entry)
+        await self._settle(update)
+    
+    async def replace(self, entry, update: bool = True):
+        """Show an edited entry, moving its row if its date changed."""
+        self._take(entry[0])
+        self._place(entry)
+        await self._settle(update)
+    
+    async def remove(self, entry_id: int, update: bool = True):
+        """Drop a deleted entry's row, topping the page up from the next one."""
+        self.total -= 1
+        self._take(entry_id)
+        await self._settle(update)
+    
+    async def next_page(self):
+        """Show the next (older) page."""
+        if self.next_cursor is None:
+            return
+        self.cursors.append(self.next_cursor)
+        await self.load()
+    
+    async def previous_page(self):
+        """Show the previous (newer) page."""
+        if len(self.cursors) == 1:
+            return
+        self.cursors.pop()
+        await self.load()
+
 
 class Application:
     def __init__(self):
         self.current_view = "projects"
-        self.db = Database()
+        self.db = AsyncDatabase()
+        self._report_engine = None
         self.current_project = None
         self.current_entry = None
+        self.current_entry_data = None
         self.editing_entry = False
         self.from_date = None
         self.to_date = None
@@ -64,9 +245,35 @@ class Application:
         
         # Report fields
         self.report_project_dropdown = None
+        self.report_project_chips = None
+        # Projects picked for reports as (id, name) pairs, or None for all projects
+        self.report_projects = []
+        self.report_group_dropdown = None
         self.report_from_date_picker = None
         self.report_to_date_picker = None
         self.report_content = None
+        
+        # Paged entry tables
+        self.detail_table = None
+        self.report_table = None
+        
+        # Project detail totals header
+        self.detail_totals = None
+        self.detail_count_text = None
+        self.detail_hours_text = None
+        
+        # Running timer display; timer_task ticks timer_text while the detail view is shown
+        self.timer_text = None
+        self.timer_button = None
+        self.timer_task = None
+    
+    @property
+    def report_engine(self):
+        """The report engine, created on first use so Polars is not loaded at startup."""
+        if self._report_engine is None:
+            from reports import ReportEngine
+            self._report_engine = ReportEngine(self.db.db)
+        return self._report_engine
     
     async def main(self, page: Page):
         """Main entry point for Flet application."""
@@ -80,19 +287,21 @@ class Application:
         self.page.padding = 10
         self.page.theme_mode = "light"
         
-        # Initialize database
+        # Initialize database and release it when the session ends
         await self.db.initialize()
+        self.page.on_close = self.handle_session_close
+        BackupScheduler.start_for_path(self.db.db.db_path)
         
         # Load and apply settings
-        saved_theme = self.db.get_setting("theme_mode", "light")
+        saved_theme = await self.db.get_setting("theme_mode", "light")
         self.page.theme_mode = saved_theme
         
         # Build navigation bar
         self.navbar = Row(
             [
-                IconButton(Icons.FOLDER, on_click=lambda e: self.show_projects_view(), tooltip="Projects"),
-                IconButton(Icons.ASSIGNMENT, on_click=lambda e: self.show_report_view(), tooltip="Reports"),
-                IconButton(Icons.SETTINGS, on_click=lambda e: self.show_settings_view(), tooltip="Settings"),
+                IconButton(Icons.FOLDER, on_click=self.show_projects_view, tooltip="Projects"),
+                IconButton(Icons.ASSIGNMENT, on_click=self.show_report_view, tooltip="Reports"),
+                IconButton(Icons.SETTINGS, on_click=self.show_settings_view, tooltip="Settings"),
             ],
             alignment="spaceBetween",
         )
@@ -113,7 +322,12 @@ class Application:
         )
         
         # Show initial view
-        self.show_projects_view()
+        await self.show_projects_view()
+    
+    async def handle_session_close(self, e):
+        """Return the session's database connection to the shared pool."""
+        self._stop_timer_tick()
+        await self.db.close()
     
     def get_local_date(self, dt: datetime) -> date:
         """Convert datetime (potentially in UTC) to local date.
@@ -128,6 +342,7 @@ class Application:
     
     def update_content(self, content):
         """Update the main content area."""
+        self._stop_timer_tick()
         self.content.content = content
         self.content.update()
     
@@ -153,26 +368,23 @@ class Application:
             content=Column([self.project_name_field], tight=True),
             actions=[
                 TextButton("Cancel", on_click=lambda e: self.close_dialog()),
-                Button("Create", on_click=lambda e: self.create_project(dialog, e)),
+                Button("Create", on_click=lambda e: self.page.run_task(self.create_project, dialog, e)),
             ],
         )
         
         self.page.show_dialog(dialog)
     
-    def show_projects_view(self):
+    async def show_projects_view(self):
         """Display the projects list view."""
         self.current_view = "projects"
         
-        # Get all projects
-        projects = self.db.get_all_projects()
+        # Get all projects with entry count and total hours
+        projects = await self.db.get_project_summaries()
         
         # Build project list
         project_rows = []
         for project in projects:
-            project_id, project_name, created_at = project
-            # Get entry count and total hours
-            entries = self.db.get_entries_for_project(project_id)
-            total_hours = sum(entry[2] for entry in entries)
+            project_id, project_name, created_at, entry_count, total_hours = project
             
             project_card = Card(
                 content=Container(
@@ -181,7 +393,7 @@ class Application:
                             Row(
                                 [
                                     Text(project_name, size=20, weight="bold", expand=True),
-                                    Text(f"{len(entries)} entries", size=14, color="grey"),
+                                    Text(f"{entry_count} entries", size=14, color="grey"),
                                 ],
                                 alignment="spaceBetween"
                             ),
@@ -189,9 +401,9 @@ class Application:
                                 [
                                     Text(f"Total: {total_hours:.1f} hours", size=14),
                                     Container(expand=True),
-                                    IconButton(Icons.VISIBILITY, on_click=lambda e, pid=project_id: self.view_project_detail(pid)),
-                                    IconButton(Icons.EDIT, on_click=lambda e, pid=project_id: self.edit_project(pid)),
-                                    IconButton(Icons.DELETE, on_click=lambda e, pid=project_id: self.confirm_delete_project(pid)),
+                                    IconButton(Icons.VISIBILITY, on_click=lambda e, pid=project_id: self.page.run_task(self.view_project_detail, pid)),
+                                    IconButton(Icons.EDIT, on_click=lambda e, pid=project_id: self.page.run_task(self.edit_project, pid)),
+                                    IconButton(Icons.DELETE, on_click=lambda e, pid=project_id: self.page.run_task(self.confirm_delete_project, pid)),
                                 ],
                                 alignment="spaceBetween"
                             )
@@ -220,6 +432,11 @@ class Application:
                                     icon=Icons.ADD,
                                     on_click=self.show_create_project_dialog
                                 ),
+                                OutlinedButton(
+                                    "Import Entries",
+                                    icon=Icons.UPLOAD,
+                                    on_click=self.handle_import_entries
+                                ),
                             ],
                             alignment="start"
                         ),
@@ -232,7 +449,7 @@ class Application:
             )
         )
     
-    def create_project(self, dialog, e):
+    async def create_project(self, dialog, e):
         """Create a new project."""
         project_name = self.project_name_field.value.strip()
         
@@ -241,17 +458,37 @@ class Application:
             return
         
         try:
-            self.db.create_project(project_name)
+            await self.db.create_project(project_name)
             dialog.open = False
             self.page.update()
-            self.show_projects_view()
+            await self.show_projects_view()
             self.show_snack_bar(f"Project '{project_name}' created successfully")
         except Exception as ex:
             self.show_snack_bar(f"Error creating project: {str(ex)}")
     
-    def edit_project(self, project_id: int):
+    async def handle_import_entries(self, e):
+        """Pick a CSV or Excel file and import its entries."""
+        files = await FilePicker().pick_files(
+            dialog_title="Import Entries",
+            allowed_extensions=["csv", "xlsx", "xls"],
+        )
+        if not files:
+            return
+        
+        from importer import import_entries  # loads Polars on first use
+        try:
+            imported, skipped = await self.db.run(import_entries, self.db.db, files[0].path)
+            await self.show_projects_view()
+            message = f"Imported {imported} entries"
+            if skipped:
+                message += f" ({skipped} invalid rows skipped)"
+            self.show_snack_bar(message)
+        except Exception as ex:
+            self.show_snack_bar(f"Error importing entries: {str(ex)}")
+    
+    async def edit_project(self, project_id: int):
         """Edit a project name."""
-        project = self.db.get_project(project_id)
+        project = await self.db.get_project(project_id)
         if not project:
             return
         
@@ -268,13 +505,13 @@ class Application:
             content=Column([self.project_name_field], tight=True),
             actions=[
                 TextButton("Cancel", on_click=lambda e: self.close_dialog()),
-                Button("Save", on_click=lambda e: self.update_project(dialog, e)),
+                Button("Save", on_click=lambda e: self.page.run_task(self.update_project, dialog, e)),
             ],
         )
         
         self.page.show_dialog(dialog)
     
-    def update_project(self, dialog, e):
+    async def update_project(self, dialog, e):
         """Update project name."""
         project_name = self.project_name_field.value.strip()
         
@@ -283,17 +520,17 @@ class Application:
             return
         
         try:
-            self.db.update_project(self.current_project, project_name)
+            await self.db.update_project(self.current_project, project_name)
             dialog.open = False
             self.page.update()
-            self.show_projects_view()
+            await self.show_projects_view()
             self.show_snack_bar(f"Project updated successfully")
         except Exception as ex:
             self.show_snack_bar(f"Error updating project: {str(ex)}")
     
-    def confirm_delete_project(self, project_id: int):
+    async def confirm_delete_project(self, project_id: int):
         """Show confirmation dialog for project deletion."""
-        project = self.db.get_project(project_id)
+        project = await self.db.get_project(project_id)
         if not project:
             return
         
@@ -304,18 +541,18 @@ class Application:
             content=Text(f"Are you sure you want to delete '{project[1]}'? All entries will be deleted too."),
             actions=[
                 TextButton("Cancel", on_click=lambda e: self.close_dialog()),
-                Button("Delete", icon=Icons.DELETE, on_click=lambda e: self.delete_project(e), bgcolor="red"),
+                Button("Delete", icon=Icons.DELETE, on_click=self.delete_project, bgcolor="red"),
             ],
         )
         
         self.page.show_dialog(self.confirm_delete_project_dialog)
     
-    def delete_project(self, e):
+    async def delete_project(self, e):
         """Delete a project."""
         try:
-            self.db.delete_project(self.current_project)
+            await self.db.delete_project(self.current_project)
             self.close_dialog()
-            self.show_projects_view()
+            await self.show_projects_view()
             self.show_snack_bar(f"Project deleted successfully")
         except Exception as ex:
             self.show_snack_bar(f"Error deleting project: {str(ex)}")
@@ -326,52 +563,54 @@ class Application:
     
     # ==================== PROJECT DETAIL VIEW ====================
     
-    def view_project_detail(self, project_id: int):
+    async def view_project_detail(self, project_id: int):
         """Show project detail with entries."""
         self.current_project = project_id
-        project = self.db.get_project(project_id)
+        project = await self.db.get_project(project_id)
         
         if not project:
             self.show_snack_bar("Project not found")
             return
         
         project_name = project[1]
-        entries = self.db.get_entries_for_project(project_id)
-        total_hours = sum(entry[2] for entry in entries)
-        
-        # Build entries table
-        entry_rows = []
-        for entry in entries:
-            entry_id, entry_date, hours, description, created_at = entry
-            entry_rows.append(
-                DataRow(
-                    cells=[
-                        DataCell(Text(entry_date)),
-                        DataCell(Text(f"{hours:.1f}")),
-                        DataCell(Text(description or "", max_lines=2, overflow="ellipsis")),
-                        DataCell(
-                            Row(
-                                [
-                                    IconButton(Icons.EDIT, icon_size=20, on_click=lambda e, eid=entry_id: self.edit_entry(eid)),
-                                    IconButton(Icons.DELETE, icon_size=20, on_click=lambda e, eid=entry_id: self.confirm_delete_entry(eid)),
-                                ]
-                            )
-                        ),
-                    ]
-                )
-            )
-        
-        if not entry_rows:
-            entry_rows.append(
-                DataRow(
-                    cells=[
-                        DataCell(Text("No entries yet", color="grey")),
-                        DataCell(Text("")),
-                        DataCell(Text("")),
-                        DataCell(Text("")),
-                    ]
-                )
-            )
+        entry_count, total_hours = await self.db.get_entry_totals(project_id)
+        
+        self.detail_table = PagedEntryTable(
+            columns=[
+                DataColumn(Text("Date")),
+                DataColumn(Text("Hours")),
+                DataColumn(Text("Description"), numeric=False),
+                DataColumn(Text("Actions")),
+            ],
+            fetch_page=lambda after, limit: self.db.get_entries_page([project_id], after=after, limit=limit),
+            build_row=self._build_detail_row,
+            empty_row=lambda: DataRow(
+                cells=[
+                    DataCell(Text("No entries yet", color="grey")),
+                    DataCell(Text("")),
+                    DataCell(Text("")),
+                    DataCell(Text("")),
+                ]
+            ),
+        )
+        # Archived entries count in the totals but are not paged through
+        archived_count, _ = await self.db.get_archived_totals([project_id])
+        self.detail_table.total = entry_count - archived_count
+        await self.detail_table.load(update=False)
+        
+        # Totals header, patched in place after each edit
+        self.detail_totals = [entry_count, total_hours]
+        self.detail_count_text = Text(f"{entry_count} entries", size=14, color="grey")
+        self.detail_hours_text = Text(f"Total: {total_hours:.1f} hours", size=14, color="grey")
+        
+        # Timer controls, resuming a timer left running before a restart
+        timer = await self.db.get_running_timer(project_id)
+        self.timer_text = Text("", size=14, weight="bold")
+        self.timer_button = OutlinedButton(
+            "Stop Timer" if timer else "Start Timer",
+            icon=Icons.STOP if timer else Icons.PLAY_ARROW,
+            on_click=self.toggle_timer,
+        )
         
         self.update_content(
             Container(
@@ -379,15 +618,17 @@ class Application:
                     [
                         Row(
                             [
-                                IconButton(Icons.ARROW_BACK, on_click=lambda e: self.show_projects_view()),
+                                IconButton(Icons.ARROW_BACK, on_click=self.show_projects_view),
                                 Text(project_name, size=24, weight="bold", expand=True),
                             ]
                         ),
                         Row(
                             [
-                                Text(f"{len(entries)} entries", size=14, color="grey"),
-                                Text(f"Total: {total_hours:.1f} hours", size=14, color="grey"),
+                                self.detail_count_text,
+                                self.detail_hours_text,
                                 Container(expand=True),
+                                self.timer_text,
+                                self.timer_button,
                                 OutlinedButton(
                                     "Add Entry",
                                     icon=Icons.ADD,
@@ -397,26 +638,93 @@ class Application:
                             alignment="spaceBetween"
                         ),
                         Container(height=20),
-                        DataTable(
-                            columns=[
-                                DataColumn(Text("Date")),
-                                DataColumn(Text("Hours")),
-                                DataColumn(Text("Description"), numeric=False),
-                                DataColumn(Text("Actions")),
-                            ],
-                            rows=entry_rows,
-                            border=Border.all(2, "grey"),
-                            horizontal_margin=10,
-                            data_row_max_height=100,
-                            width=800,
-                            show_bottom_border=True,
-                        ),
+                        self.detail_table.control,
                     ],
                     scroll="auto",
                 ),
                 padding=20,
             )
         )
+        
+        if timer:
+            self._start_timer_tick(datetime.fromisoformat(timer[0]))
+    
+    # ==================== TIMER ====================
+    
+    async def toggle_timer(self, e):
+        """Start the current project's timer, or stop it and record an entry."""
+        try:
+            if await self.db.get_running_timer(self.current_project) is None:
+                started_at = await self.db.start_timer(self.current_project)
+                self.timer_button.content = "Stop Timer"
+                self.timer_button.icon = Icons.STOP
+                self.timer_button.update()
+                self._start_timer_tick(datetime.fromisoformat(started_at))
+                return
+            
+            self._stop_timer_tick()
+            stopped = await self.db.stop_timer(self.current_project)
+            self.timer_text.value = ""
+            self.timer_text.update()
+            self.timer_button.content = "Start Timer"
+            self.timer_button.icon = Icons.PLAY_ARROW
+            self.timer_button.update()
+            if stopped:
+                entry_id, entry_date, hours, description = stopped
+                await self.detail_table.insert((entry_id, entry_date, hours, description, None, self.current_project))
+                self._update_detail_totals(1, hours)
+                self.show_snack_bar(f"Recorded {hours:.2f} hours")
+        except Exception as ex:
+            self.show_snack_bar(f"Error updating timer: {str(ex)}")
+    
+    def _start_timer_tick(self, started_at: datetime):
+        """Start refreshing the timer display."""
+        self._stop_timer_tick()
+        self.timer_task = self.page.run_task(self._tick_timer, started_at)
+    
+    def _stop_timer_tick(self):
+        """Stop refreshing the timer display; the timer itself keeps running."""
+        if self.timer_task is not None:
+            self.timer_task.cancel()
+            self.timer_task = None
+    
+    async def _tick_timer(self, started_at: datetime):
+        """Show the elapsed time, updating only timer_text once a second."""
+        while True:
+            elapsed = (datetime.now() - started_at).total_seconds()
+            seconds = max(int(elapsed), 0)
+            self.timer_text.value = f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+            self.timer_text.update()
+            # Wake up on the next whole second rather than drifting
+            await asyncio.sleep(1 - elapsed % 1)
+    
+    def _update_detail_totals(self, count_delta: int, hours_delta: float):
+        """Adjust the project detail totals header by the effect of one edit."""
+        self.detail_totals[0] += count_delta
+        self.detail_totals[1] += hours_delta
+        self.detail_count_text.value = f"{self.detail_totals[0]} entries"
+        self.detail_hours_text.value = f"Total: {self.detail_totals[1]:.1f} hours"
+        self.detail_count_text.update()
+        self.detail_hours_text.update()
+    
+    def _build_detail_row(self, entry):
+        """Build the project detail table row for an entry."""
+        entry_id, entry_date, hours, description, created_at, project_id = entry
+        return DataRow(
+            cells=[
+                DataCell(Text(entry_date)),
+                DataCell(Text(f"{hours:.1f}")),
+                DataCell(Text(description or "", max_lines=2, overflow="ellipsis")),
+                DataCell(
+                    Row(
+                        [
+                            IconButton(Icons.EDIT, icon_size=20, on_click=lambda e, eid=entry_id: self.page.run_task(self.edit_entry, eid)),
+                            IconButton(Icons.DELETE, icon_size=20, on_click=lambda e, eid=entry_id: self.confirm_delete_entry(eid)),
+                        ]
+                    )
+                ),
+            ]
+        )
     
     # ==================== ENTRY FORM ====================
     
@@ -472,7 +780,7 @@ class Application:
             ),
             actions=[
                 TextButton("Cancel", on_click=lambda e: self.close_dialog()),
-                Button("Save", on_click=lambda e: self.save_entry(e)),
+                Button("Save", on_click=self.save_entry),
             ],
         )
         
@@ -488,7 +796,7 @@ class Application:
                     control.text = f"Select Date: {e.control.value}"
                     control.update()
     
-    def save_entry(self, e):
+    async def save_entry(self, e):
         """Save a new or updated entry."""
         entry_date = self.entry_date_picker.value
         hours = self.entry_hours_field.value
@@ -515,26 +823,33 @@ class Application:
             # Extract date portion, converting from UTC to local time if needed
             date_str = self.get_local_date(entry_date).strftime("%Y-%m-%d")
             if self.editing_entry:
-                self.db.update_entry(self.current_entry, date_str, hours_float, description)
+                await self.db.update_entry(self.current_entry, date_str, hours_float, description)
+                entry_id, _, _, old_hours, _, created_at = self.current_entry_data
+                entry = (entry_id, date_str, hours_float, description, created_at, self.current_project)
+                await self.detail_table.replace(entry)
+                self._update_detail_totals(0, hours_float - old_hours)
                 self.show_snack_bar("Entry updated successfully")
             else:
-                self.db.create_entry(self.current_project, date_str, hours_float, description)
+                entry_id = await self.db.create_entry(self.current_project, date_str, hours_float, description)
+                entry = (entry_id, date_str, hours_float, description, None, self.current_project)
+                await self.detail_table.insert(entry)
+                self._update_detail_totals(1, hours_float)
                 self.show_snack_bar("Entry created successfully")
             
             self.entry_dialog.open = False
             self.page.update()
-            self.view_project_detail(self.current_project)
         except Exception as ex:
             self.show_snack_bar(f"Error saving entry: {str(ex)}")
     
-    def edit_entry(self, entry_id: int):
+    async def edit_entry(self, entry_id: int):
         """Edit an existing entry."""
-        entry = self.db.get_entry(entry_id)
+        entry = await self.db.get_entry(entry_id)
         if not entry:
             return
         
         self.editing_entry = True
         self.current_entry = entry_id
+        self.current_entry_data = entry
         
         entry_date = datetime.strptime(entry[2], "%Y-%m-%d")
         
@@ -586,7 +901,7 @@ class Application:
             ),
             actions=[
                 TextButton("Cancel", on_click=lambda e: self.close_dialog()),
-                Button("Save", on_click=lambda e: self.save_entry(e)),
+                Button("Save", on_click=self.save_entry),
             ],
         )
         
@@ -601,35 +916,55 @@ class Application:
             content=Text("Are you sure you want to delete this entry?"),
             actions=[
                 TextButton("Cancel", on_click=lambda e: self.close_dialog()),
-                Button("Delete", icon=Icons.DELETE, on_click=lambda e: self.delete_entry(e), bgcolor="red"),
+                Button("Delete", icon=Icons.DELETE, on_click=self.delete_entry, bgcolor="red"),
             ],
         )
         
         self.page.show_dialog(self.confirm_delete_entry_dialog)
     
-    def delete_entry(self, e):
+    async def delete_entry(self, e):
         """Delete an entry."""
         try:
-            self.db.delete_entry(self.current_entry)
+            # The delete button sits on the entry's row, so its data is at hand
+            entry = self.detail_table.get(self.current_entry)
+            await self.db.delete_entry(self.current_entry)
             self.close_dialog()
-            self.view_project_detail(self.current_project)
+            await self.detail_table.remove(self.current_entry)
+            self._update_detail_totals(-1, -entry[2])
             self.show_snack_bar("Entry deleted successfully")
         except Exception as ex:
             self.show_snack_bar(f"Error deleting entry: {str(ex)}")
     
     # ==================== REPORT VIEW ====================
     
-    def show_report_view(self):
+    async def show_report_view(self):
         """Display the report generation view."""
         self.current_view = "report"
         
-        # Get all projects for dropdown
-        projects = self.db.get_all_projects()
-        project_options = [("Select Project", None)] + [(p[1], p[0]) for p in projects]
+        # Projects are picked one at a time in the dropdown and listed as removable chips
+        projects = await self.db.get_all_projects()
+        project_options = [("All Projects", "all")] + [(p[1], str(p[0])) for p in projects]
         
         self.report_project_dropdown = Dropdown(
-            label="Project",
-            options=[dropdown.Option(value, label) for label, value in project_options]
+            label="Add project",
+            enable_filter=True,
+            editable=True,
+            options=[dropdown.Option(value, label) for label, value in project_options],
+            on_select=self.add_report_project,
+        )
+        self.report_project_chips = Row(wrap=True)
+        self._build_report_project_chips()
+        
+        self.report_group_dropdown = Dropdown(
+            label="Group by",
+            value="none",
+            options=[
+                dropdown.Option("none", "Entries only"),
+                dropdown.Option("day", "Day"),
+                dropdown.Option("week", "Week"),
+                dropdown.Option("month", "Month"),
+                dropdown.Option("project", "Project"),
+            ]
         )
         
         self.report_from_date_picker = DatePicker()
@@ -638,6 +973,14 @@ class Application:
         self.report_from_date_picker.on_change = self._update_from_date
         self.report_to_date_picker.on_change = self._update_to_date
         
+        self.report_search_field = TextField(
+            label="Search descriptions",
+            hint_text="Words to find in all projects...",
+            prefix_icon=Icons.SEARCH,
+            on_submit=self.search_entries,
+            expand=True
+        )
+        
         self.report_content = Container(
             Text("Select a project to generate a report", color="grey")
         )
@@ -650,9 +993,11 @@ class Application:
                         Row(
                             [
                                 self.report_project_dropdown,
+                                self.report_group_dropdown,
                             ],
                             alignment="start"
                         ),
+                        self.report_project_chips,
                         Row(
                             [
                                 OutlinedButton(
@@ -669,7 +1014,7 @@ class Application:
                                 OutlinedButton(
                                     "Generate Report",
                                     icon=Icons.ANALYTICS,
-                                    on_click=lambda e: self.generate_report(),
+                                    on_click=self.generate_report,
                                 ),
                                 OutlinedButton(
                                     "Export Excel",
@@ -679,6 +1024,16 @@ class Application:
                             ],
                             alignment="spaceBetween"
                         ),
+                        Row(
+                            [
+                                self.report_search_field,
+                                OutlinedButton(
+                                    "Search",
+                                    icon=Icons.SEARCH,
+                                    on_click=self.search_entries,
+                                ),
+                            ],
+                        ),
                         Container(height=20),
                         self.report_content,
                     ],
@@ -688,23 +1043,53 @@ class Application:
             )
         )
     
-    def on_project_change(self, e):
-        """Handle project dropdown change."""
-        pass
+    def _build_report_project_chips(self):
+        """Show the projects picked for reports as chips that remove them when deleted."""
+        if self.report_projects is None:
+            chips = [Chip(label="All Projects", on_delete=lambda e: self.remove_report_project(None))]
+        else:
+            chips = [
+                Chip(label=name, on_delete=lambda e, project_id=project_id: self.remove_report_project(project_id))
+                for project_id, name in self.report_projects
+            ]
+        self.report_project_chips.controls = chips
     
-    def _update_from_date(self, e):
+    async def add_report_project(self, e):
+        """Add the project picked in the dropdown to the report, or pick all projects."""
+        selection = e.control.value
+        if selection == "all":
+            self.report_projects = None
+        elif selection:
+            project = await self.db.get_project(int(selection))
+            projects = self.report_projects or []
+            if project and all(project_id != project[0] for project_id, _ in projects):
+                self.report_projects = projects + [(project[0], project[1])]
+        self.report_project_dropdown.value = None
+        self._build_report_project_chips()
+        self.page.update()
+    
+    def remove_report_project(self, project_id):
+        """Remove a project from the report; None clears the all-projects choice."""
+        if project_id is None:
+            self.report_projects = []
+        else:
+            self.report_projects = [project for project in self.report_projects if project[0] != project_id]
+        self._build_report_project_chips()
+        self.page.update()
+    
+    async def _update_from_date(self, e):
         """Update from date when date picker changes."""
         if e.control.value:
             # Extract date portion, converting from UTC to local time if needed
             self.from_date = self.get_local_date(e.control.value)
-            self.show_report_view()  # Refresh to show new date
+            await self.show_report_view()  # Refresh to show new date
     
-    def _update_to_date(self, e):
+    async def _update_to_date(self, e):
         """Update to date when date picker changes."""
         if e.control.value:
             # Extract date portion, converting from UTC to local time if needed
             self.to_date = self.get_local_date(e.control.value)
-            self.show_report_view()  # Refresh to show new date
+            await self.show_report_view()  # Refresh to show new date
     
     def pick_from_date(self):
         """Pick from date for report filter."""
@@ -718,132 +1103,223 @@ class Application:
         """Async wrapper for export to Excel button handler."""
         await self.export_to_excel()
     
-    def generate_report(self):
-        """Generate report using Polars and display as DataTable."""
-        project_id = self.report_project_dropdown.value
-        
-        if not project_id:
-            self.show_snack_bar("Please select a project")
-            return
+    async def get_report_criteria(self):
+        """Get (project_ids, from_date, to_date, report_name) from the report controls.
         
-        project = self.db.get_project(project_id)
-        if not project:
-            return
+        project_ids is None for all projects. Returns None if no project is selected.
+        """
+        if self.report_projects is None:
+            project_ids = None
+            report_name = "All Projects"
+        else:
+            # Projects deleted since they were picked are left out
+            existing = {project[0] for project in await self.db.get_all_projects()}
+            projects = [project for project in self.report_projects if project[0] in existing]
+            if not projects:
+                self.show_snack_bar("Please select a project")
+                return None
+            project_ids = [project_id for project_id, _ in projects]
+            report_name = ", ".join(name for _, name in projects)
         
-        # Get filtered entries
         from_date_str = self.from_date.strftime("%Y-%m-%d") if self.from_date else None
         to_date_str = self.to_date.strftime("%Y-%m-%d") if self.to_date else None
+        return project_ids, from_date_str, to_date_str, report_name
+    
+    async def generate_report(self):
+        """Generate report using Polars and display as DataTable."""
+        criteria = await self.get_report_criteria()
+        if not criteria:
+            return
+        project_ids, from_date_str, to_date_str, report_name = criteria
         
-        entries = self.db.get_entries_for_project(project_id, from_date_str, to_date_str)
+        # Totals and summaries come from the daily rollup; raw entries are only read page by page
+        df = await self.db.run(self.report_engine.load_daily_totals, project_ids, from_date_str, to_date_str)
         
-        if not entries:
+        if df.is_empty():
             self.report_content.content = Text("No entries found for the selected criteria", color="grey")
             self.report_content.update()
             return
         
-        # Convert to Polars DataFrame
-        df = pl.DataFrame({
-            "Date": [entry[1] for entry in entries],
-            "Hours": [entry[2] for entry in entries],
-            "Description": [entry[3] or "" for entry in entries],
-        })
-        
-        # Calculate total hours
-        total_hours = df["Hours"].sum()
+        entry_count, total_hours = self.report_engine.totals(df)
         
-        # Build entries table rows
-        entry_rows = []
-        for entry in entries:
-            entry_rows.append(
-                DataRow(
-                    cells=[
-                        DataCell(Text(entry[1])),
-                        DataCell(Text(f"{entry[2]:.1f}")),
-                        DataCell(Text(entry[3] or "", max_lines=2, overflow="ellipsis")),
-                    ]
-                )
-            )
+        # Grouped summary, if requested; across projects periods are pivoted per project
+        multiple_projects = project_ids is None or len(project_ids) > 1
+        summary_controls = []
+        group_by = self.report_group_dropdown.value
+        if group_by and group_by != "none":
+            if multiple_projects and group_by != "project":
+                summary = await self.db.run(self.report_engine.pivot, df, group_by)
+            else:
+                summary = await self.db.run(self.report_engine.summarize, df, group_by)
+            summary_controls = [
+                Text(f"Hours by {group_by}", size=16, weight="bold"),
+                Row([self._build_summary_table(summary)], scroll="auto"),
+                Container(height=20),
+            ]
+        
+        # Entries table, with a project column when reporting across projects
+        columns = [
+            DataColumn(Text("Date")),
+            DataColumn(Text("Hours")),
+            DataColumn(Text("Description"), numeric=False),
+        ]
+        project_names = {}
+        if multiple_projects:
+            columns.insert(0, DataColumn(Text("Project")))
+            project_names = {p[0]: p[1] for p in await self.db.get_all_projects()}
+        
+        def build_report_row(entry):
+            cells = [
+                DataCell(Text(entry[1])),
+                DataCell(Text(f"{entry[2]:.1f}")),
+                DataCell(Text(entry[3] or "", max_lines=2, overflow="ellipsis")),
+            ]
+            if multiple_projects:
+                cells.insert(0, DataCell(Text(project_names.get(entry[5], ""))))
+            return DataRow(cells=cells)
+        
+        self.report_table = PagedEntryTable(
+            columns=columns,
+            fetch_page=lambda after, limit: self.db.get_entries_page(
+                project_ids, from_date_str, to_date_str, after=after, limit=limit
+            ),
+            build_row=build_report_row,
+            empty_row=lambda: DataRow(cells=[DataCell(Text("")) for _ in columns]),
+        )
+        archived_count, _ = await self.db.get_archived_totals(project_ids, from_date_str, to_date_str)
+        self.report_table.total = entry_count - archived_count
+        await self.report_table.load(update=False)
         
         # Display as DataTable with summary statistics above
         self.report_content.content = Column(
             [
-                Text(f"Report: {project[1]}", size=20, weight="bold"),
+                Text(f"Report: {report_name}", size=20, weight="bold"),
                 Container(height=10),
                 Row(
                     [
-                        Text(f"Total Entries: {len(entries)}", size=14, color="grey"),
+                        Text(f"Total Entries: {entry_count}", size=14, color="grey"),
                         Text(f"Total Hours: {total_hours:.1f}", size=14, color="grey"),
                     ],
                     alignment="spaceBetween"
                 ),
                 Container(height=20),
+                *summary_controls,
+                self.report_table.control,
+            ],
+            scroll="auto"
+        )
+        
+        self.report_content.update()
+    
+    async def search_entries(self, e):
+        """Show entries whose description matches the search box, best match first."""
+        query = (self.report_search_field.value or "").strip()
+        if not query:
+            self.show_snack_bar("Please enter words to search for")
+            return
+        
+        from_date_str = self.from_date.strftime("%Y-%m-%d") if self.from_date else None
+        to_date_str = self.to_date.strftime("%Y-%m-%d") if self.to_date else None
+        results = await self.db.search_entries(query, from_date_str, to_date_str, limit=SEARCH_RESULTS_LIMIT)
+        
+        if not results:
+            self.report_content.content = Text(f"No entries found matching '{query}'", color="grey")
+            self.report_content.update()
+            return
+        
+        self.report_content.content = Column(
+            [
+                Text(f"Search: {query}", size=20, weight="bold"),
+                Container(height=10),
+                Text(
+                    f"Matching Entries: {len(results)}"
+                    + (" (best matches only)" if len(results) == SEARCH_RESULTS_LIMIT else ""),
+                    size=14,
+                    color="grey"
+                ),
+                Container(height=20),
                 DataTable(
                     columns=[
+                        DataColumn(Text("Project")),
                         DataColumn(Text("Date")),
                         DataColumn(Text("Hours")),
                         DataColumn(Text("Description"), numeric=False),
                     ],
-                    rows=entry_rows,
+                    rows=[
+                        DataRow(
+                            cells=[
+                                DataCell(Text(project_name)),
+                                DataCell(Text(entry_date)),
+                                DataCell(Text(f"{hours:.1f}")),
+                                DataCell(Text(description or "", max_lines=2, overflow="ellipsis")),
+                            ]
+                        )
+                        for _, project_name, entry_date, hours, description, _ in results
+                    ],
                     border=Border.all(2, "grey"),
                     horizontal_margin=10,
-                    data_row_max_height=100,
-                    width=800,
-                    show_bottom_border=True,
                 ),
             ],
             scroll="auto"
         )
-        
-        # Store current data for export
-        self.current_report_data = (df, project[1])
-        
         self.report_content.update()
     
+    def _build_summary_table(self, summary):
+        """Build a DataTable from a report summary or pivot frame."""
+        return DataTable(
+            columns=[
+                DataColumn(Text(str(name)), numeric=dtype.is_numeric())
+                for name, dtype in summary.schema.items()
+            ],
+            rows=[
+                DataRow(
+                    cells=[
+                        DataCell(Text(f"{value:.1f}" if isinstance(value, float) else str(value)))
+                        for value in row
+                    ]
+                )
+                for row in summary.iter_rows()
+            ],
+            border=Border.all(2, "grey"),
+            horizontal_margin=10,
+        )
+    
     async def export_to_excel(self):
-        """Export report to Excel."""
-        if not hasattr(self, 'current_report_data'):
-            self.show_snack_bar("Please generate a report first")
+        """Export the entries matching the report criteria to Excel."""
+        criteria = await self.get_report_criteria()
+        if not criteria:
             return
-        
-        df, project_name = self.current_report_data
+        project_ids, from_date_str, to_date_str, report_name = criteria
         
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(mode='wb', suffix='.xlsx', delete=False) as tmp:
-                tmp_path = tmp.name
-            
-            # Write to Excel using openpyxl
-            df.write_excel(tmp_path)
-            
             # Open file picker to save using new Flet pattern
             save_path = await FilePicker().save_file(
                 dialog_title="Save Report",
-                file_name=f"{project_name}_report_{datetime.now().strftime('%Y%m%d')}.xlsx",
+                file_name=f"{report_name}_report_{datetime.now().strftime('%Y%m%d')}.xlsx",
                 initial_directory=os.path.expanduser("~")
             )
             
-            if save_path:
-                # Copy temporary file to chosen location
-                import shutil
-                shutil.copy2(tmp_path, save_path)
-                self.show_snack_bar(f"Report exported to {save_path}")
-            else:
+            if not save_path:
                 self.show_snack_bar("Export cancelled")
+                return
             
-            # Clean up temporary file
-            os.unlink(tmp_path)
-            
+            # Stream entries from the database directly into the chosen file
+            from exporter import export_entries_to_excel  # loads xlsxwriter on first use
+            exported = await self.db.run(
+                export_entries_to_excel, self.db.db, save_path, project_ids, from_date_str, to_date_str
+            )
+            self.show_snack_bar(f"Exported {exported} entries to {save_path}")
         except Exception as ex:
             self.show_snack_bar(f"Error exporting to Excel: {str(ex)}")
     
     # ==================== SETTINGS VIEW ====================
     
-    def show_settings_view(self):
+    async def show_settings_view(self):
         """Display the settings view."""
         self.current_view = "settings"
         
         # Get current theme setting
-        current_theme = self.db.get_setting("theme_mode", "light")
+        current_theme = await self.db.get_setting("theme_mode", "light")
         is_dark = current_theme == "dark"
         
         # Create theme switch
@@ -853,6 +1329,59 @@ class Application:
             on_change=self.toggle_theme
         )
         
+        # Archive cutoff, defaulting to the start of the year ARCHIVE_AGE_YEARS ago
+        self.archive_cutoff_field = TextField(
+            label="Archive entries before",
+            value=f"{date.today().year - ARCHIVE_AGE_YEARS}-01-01",
+            hint_text="YYYY-MM-DD",
+            width=250
+        )
+        
+        # Query instrumentation controls
+        query_stats = await self.db.get_query_stats()
+        instrumentation_switch = Switch(
+            label="Record",
+            value=query_stats is not None,
+            on_change=self.toggle_instrumentation
+        )
+        self.slow_query_field = TextField(
+            label="Slow query threshold (ms)",
+            value=str(await self.db.get_setting("instrumentation.slow_query_ms", "100.0")),
+            keyboard_type="number",
+            input_filter=InputFilter(regex_string=r"[0-9.]*"),
+            on_submit=self.update_slow_query_threshold,
+            width=250
+        )
+        self.query_stats_text = Text(self._format_query_stats(query_stats), size=14, selectable=True)
+        
+        # Backup controls; snapshots are listed newest first
+        backup_interval_dropdown = Dropdown(
+            label="Automatic backups",
+            value=await self.db.get_setting(BACKUP_INTERVAL_SETTING, "0"),
+            options=[dropdown.Option(value, label) for value, label in BACKUP_INTERVALS],
+            on_select=self.update_backup_interval,
+            width=250
+        )
+        backup_keep_field = TextField(
+            label="Snapshots to keep",
+            value=await self.db.get_setting(BACKUP_KEEP_SETTING, str(DEFAULT_BACKUP_KEEP)),
+            keyboard_type="number",
+            input_filter=InputFilter(regex_string=r"[0-9]*"),
+            on_submit=self.update_backup_keep,
+            width=250
+        )
+        self.backup_status_text = Text(
+            self._format_last_backup(await self.db.run(get_last_backup, self.db.db)), size=14, color="grey"
+        )
+        self.restore_dropdown = Dropdown(
+            label="Snapshot",
+            options=[
+                dropdown.Option(path, f"{os.path.basename(path)} ({size / 1_048_576:.1f} MB)")
+                for path, _, size in list_backups(self.db.db.db_path)
+            ],
+            width=350
+        )
+        
         self.update_content(
             Container(
                 Column(
@@ -882,6 +1411,114 @@ class Application:
                             )
                         ),
                         Container(height=10),
+                        # Maintenance card
+                        Card(
+                            content=Container(
+                                Column(
+                                    [
+                                        Row(
+                                            [
+                                                Text("Maintenance", size=18, weight="bold"),
+                                            ],
+                                        ),
+                                        Container(height=10),
+                                        Text("Check the stored project and daily totals against the entries and rebuild them if needed.", size=14, color="grey"),
+                                        OutlinedButton(
+                                            "Verify Totals",
+                                            icon=Icons.BUILD,
+                                            on_click=self.verify_totals,
+                                        ),
+                                        Container(height=10),
+                                        Text("Move old entries to a compressed archive next to the database. They stay in totals, reports and exports but are no longer listed or editable.", size=14, color="grey"),
+                                        Row(
+                                            [
+                                                self.archive_cutoff_field,
+                                                OutlinedButton(
+                                                    "Archive",
+                                                    icon=Icons.ARCHIVE,
+                                                    on_click=self.confirm_archive_entries,
+                                                ),
+                                            ],
+                                        ),
+                                    ],
+                                    spacing=5,
+                                    tight=True
+                                ),
+                                padding=15,
+                                width=500
+                            )
+                        ),
+                        Container(height=10),
+                        # Backups card
+                        Card(
+                            content=Container(
+                                Column(
+                                    [
+                                        Row(
+                                            [
+                                                Text("Backups", size=18, weight="bold"),
+                                            ],
+                                        ),
+                                        Container(height=10),
+                                        Text("Snapshots of the database are taken in the background while you work and kept next to it. Restoring saves the current data as a snapshot first.", size=14, color="grey"),
+                                        backup_interval_dropdown,
+                                        backup_keep_field,
+                                        self.backup_status_text,
+                                        OutlinedButton("Back Up Now", icon=Icons.BACKUP, on_click=self.backup_now),
+                                        Container(height=10),
+                                        Row(
+                                            [
+                                                self.restore_dropdown,
+                                                OutlinedButton(
+                                                    "Restore",
+                                                    icon=Icons.RESTORE,
+                                                    on_click=self.confirm_restore_backup,
+                                                ),
+                                            ],
+                                            wrap=True
+                                        ),
+                                    ],
+                                    spacing=5,
+                                    tight=True
+                                ),
+                                padding=15,
+                                width=500
+                            )
+                        ),
+                        Container(height=10),
+                        # Diagnostics card
+                        Card(
+                            content=Container(
+                                Column(
+                                    [
+                                        Row(
+                                            [
+                                                Text("Diagnostics", size=18, weight="bold"),
+                                                instrumentation_switch,
+                                            ],
+                                            alignment="spaceBetween"
+                                        ),
+                                        Container(height=10),
+                                        Text("Record query timings to find out where time goes. Export them as JSON to share when reporting a problem.", size=14, color="grey"),
+                                        self.slow_query_field,
+                                        self.query_stats_text,
+                                        Row(
+                                            [
+                                                OutlinedButton("Refresh", icon=Icons.REFRESH, on_click=self.refresh_query_stats),
+                                                OutlinedButton("Reset", icon=Icons.DELETE_SWEEP, on_click=self.reset_query_stats),
+                                                OutlinedButton("Export JSON", icon=Icons.DOWNLOAD, on_click=self.export_query_stats),
+                                            ],
+                                            wrap=True
+                                        ),
+                                    ],
+                                    spacing=5,
+                                    tight=True
+                                ),
+                                padding=15,
+                                width=500
+                            )
+                        ),
+                        Container(height=10),
                         # About card
                         Card(
                             content=Container(
@@ -938,11 +1575,213 @@ class Application:
             )
         )
     
+    async def verify_totals(self, e):
+        """Verify the project and daily totals and rebuild them if they are out of sync."""
+        try:
+            mismatched = await self.db.verify_project_totals()
+            if mismatched:
+                await self.db.rebuild_project_totals()
+            mismatched_days = await self.db.verify_daily_totals()
+            if mismatched_days:
+                await self.db.rebuild_daily_totals()
+            
+            if mismatched or mismatched_days:
+                self.show_snack_bar(
+                    f"Rebuilt totals for {len(mismatched)} project(s) and {len(mismatched_days)} day(s)"
+                )
+            else:
+                self.show_snack_bar("Project and daily totals are up to date")
+        except Exception as ex:
+            self.show_snack_bar(f"Error verifying totals: {str(ex)}")
+    
+    def confirm_archive_entries(self, e):
+        """Ask for confirmation before archiving entries older than the cutoff."""
+        cutoff = (self.archive_cutoff_field.value or "").strip()
+        try:
+            datetime.strptime(cutoff, "%Y-%m-%d")
+        except ValueError:
+            self.show_snack_bar("Please enter the cutoff date as YYYY-MM-DD")
+            return
+        
+        self.page.show_dialog(
+            AlertDialog(
+                title=Text("Archive Entries"),
+                content=Text(f"Move all entries dated before {cutoff} to the archive? They can no longer be edited."),
+                actions=[
+                    TextButton("Cancel", on_click=lambda e: self.close_dialog()),
+                    Button("Archive", icon=Icons.ARCHIVE, on_click=lambda e: self.page.run_task(self.archive_entries, cutoff)),
+                ],
+            )
+        )
+    
+    async def archive_entries(self, cutoff: str):
+        """Move entries dated before cutoff to the Parquet archive."""
+        self.close_dialog()
+        try:
+            from archive import archive_entries  # loads Polars on first use
+            archived = await self.db.run(archive_entries, self.db.db, cutoff)
+            self.show_snack_bar(f"Archived {archived} entries dated before {cutoff}")
+        except Exception as ex:
+            self.show_snack_bar(f"Error archiving entries: {str(ex)}")
+    
+    def _format_last_backup(self, last_backup):
+        """Describe the last backup: when, and how many pages it took how long to copy."""
+        if last_backup is None:
+            return "No backup taken yet."
+        at = datetime.fromisoformat(last_backup["at"]).strftime("%Y-%m-%d %H:%M")
+        return f"Last backup {at}: {last_backup['pages']} pages in {last_backup['seconds']:.2f} s"
+    
+    def _show_backup_status(self, message: str):
+        """Show a backup status message if the settings view is still displayed."""
+        self.backup_status_text.value = message
+        if self.current_view == "settings":
+            self.backup_status_text.update()
+    
+    async def update_backup_interval(self, e):
+        """Save the backup schedule; the scheduler picks it up on its next check."""
+        await self.db.set_setting(BACKUP_INTERVAL_SETTING, e.control.value)
+        label = dict(BACKUP_INTERVALS)[e.control.value]
+        self.show_snack_bar(f"Automatic backups: {label.lower()}")
+    
+    async def update_backup_keep(self, e):
+        """Save how many snapshots are kept."""
+        try:
+            keep = int(e.control.value)
+            if keep < 1:
+                raise ValueError
+        except ValueError:
+            self.show_snack_bar("Please keep at least 1 snapshot")
+            return
+        await self.db.set_setting(BACKUP_KEEP_SETTING, str(keep))
+        self.show_snack_bar(f"Keeping the newest {keep} snapshots")
+    
+    async def backup_now(self, e):
+        """Take a backup on a separate thread, so neither the UI nor database calls wait for it."""
+        loop = asyncio.get_running_loop()
+        
+        def progress(copied, total):
+            loop.call_soon_threadsafe(self._show_backup_status, f"Backing up: {copied} of {total} pages")
+        
+        try:
+            keep = int(await self.db.get_setting(BACKUP_KEEP_SETTING, str(DEFAULT_BACKUP_KEEP)))
+            path, pages, seconds = await asyncio.to_thread(create_backup, self.db.db.db_path, keep, None, progress)
+            await self.db.run(record_backup, self.db.db, path, pages, seconds)
+            self.show_snack_bar(f"Backed up {pages} pages in {seconds:.2f} s to {os.path.basename(path)}")
+            if self.current_view == "settings":
+                await self.show_settings_view()
+        except Exception as ex:
+            self._show_backup_status("Backup failed.")
+            self.show_snack_bar(f"Error backing up: {str(ex)}")
+    
+    def confirm_restore_backup(self, e):
+        """Ask for confirmation before replacing the data with a snapshot."""
+        path = self.restore_dropdown.value
+        if not path:
+            self.show_snack_bar("Please select a snapshot")
+            return
+        
+        self.page.show_dialog(
+            AlertDialog(
+                title=Text("Restore Backup"),
+                content=Text(f"Replace all data with {os.path.basename(path)}? The current data is saved as a snapshot first."),
+                actions=[
+                    TextButton("Cancel", on_click=lambda e: self.close_dialog()),
+                    Button("Restore", icon=Icons.RESTORE, on_click=lambda e: self.page.run_task(self.restore_backup, path)),
+                ],
+            )
+        )
+    
+    async def restore_backup(self, path: str):
+        """Replace the data with a snapshot and reload the settings."""
+        self.close_dialog()
+        try:
+            saved_path, pages = await self.db.run(restore_backup, self.db.db, path)
+            self.page.theme_mode = await self.db.get_setting("theme_mode", "light")
+            self.page.update()
+            await self.show_settings_view()
+            self.show_snack_bar(
+                f"Restored {pages} pages from {os.path.basename(path)}; previous data saved as {os.path.basename(saved_path)}"
+            )
+        except Exception as ex:
+            self.show_snack_bar(f"Error restoring backup: {str(ex)}")
+    
+    def _format_query_stats(self, query_stats):
+        """Summarize query stats: totals and the slowest methods."""
+        if query_stats is None:
+            return "Recording is off."
+        methods = query_stats["methods"]
+        if not methods:
+            return "No calls recorded yet."
+        
+        calls = sum(method["calls"] for method in methods.values())
+        total_ms = sum(method["total_ms"] for method in methods.values())
+        lines = [
+            f"{calls} calls, {total_ms:.1f} ms in total, {len(query_stats['slow_queries'])} slow queries",
+        ]
+        for name, method in list(methods.items())[:5]:
+            lines.append(
+                f"{name}: {method['calls']} calls, {method['total_ms'] / method['calls']:.2f} ms avg, "
+                f"{method['max_ms']:.2f} ms max"
+            )
+        return "\n".join(lines)
+    
+    async def refresh_query_stats(self, e=None):
+        """Show the latest query stats."""
+        self.query_stats_text.value = self._format_query_stats(await self.db.get_query_stats())
+        self.query_stats_text.update()
+    
+    async def toggle_instrumentation(self, e):
+        """Turn query instrumentation on or off."""
+        await self.db.set_instrumentation(e.control.value)
+        await self.refresh_query_stats()
+        self.show_snack_bar(f"Query recording {'enabled' if e.control.value else 'disabled'}")
+    
+    async def update_slow_query_threshold(self, e):
+        """Save the slow query threshold."""
+        try:
+            threshold = float(self.slow_query_field.value)
+        except ValueError:
+            self.show_snack_bar("Please enter a valid threshold in milliseconds")
+            return
+        
+        enabled = await self.db.get_query_stats() is not None
+        await self.db.set_instrumentation(enabled, threshold)
+        self.show_snack_bar(f"Slow query threshold set to {threshold:g} ms")
+    
+    async def reset_query_stats(self, e):
+        """Clear the recorded query stats."""
+        await self.db.reset_query_stats()
+        await self.refresh_query_stats()
+    
+    async def export_query_stats(self, e):
+        """Save the recorded query stats to a JSON file."""
+        query_stats = await self.db.get_query_stats()
+        if query_stats is None:
+            self.show_snack_bar("Turn on recording first")
+            return
+        
+        try:
+            save_path = await FilePicker().save_file(
+                dialog_title="Export Query Stats",
+                file_name=f"time_tracker_stats_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                initial_directory=os.path.expanduser("~")
+            )
+            if not save_path:
+                self.show_snack_bar("Export cancelled")
+                return
+            
+            query_stats["app_version"] = __version__
+            with open(save_path, "w") as f:
+                json.dump(query_stats, f, indent=2)
+            self.show_snack_bar(f"Query stats exported to {save_path}")
+        except Exception as ex:
+            self.show_snack_bar(f"Error exporting query stats: {str(ex)}")
+    
     async def open_github_repo(self):
         """Open the GitHub repository in the browser."""
         await UrlLauncher().launch_url("https://github.com/paluigi/time-tracker")
     
-    def toggle_theme(self, e):
+    async def toggle_theme(self, e):
         """Toggle between light and dark theme."""
         is_dark = e.control.value
         new_theme = "dark" if is_dark else "light"
@@ -952,12 +1791,16 @@ class Application:
         self.page.update()
         
         # Save to database
-        self.db.set_setting("theme_mode", new_theme)
+        await self.db.set_setting("theme_mode", new_theme)
         
         # Show feedback
         self.show_snack_bar(f"Theme changed to {new_theme} mode")
 
 
+async def main(page: Page):
+    """Run a separate Application for each page session."""
+    await Application().main(page)
+
+
 if __name__ == '__main__':
-    app = Application()
-    flet.run(main=app.main)
\ No newline at end of file
+    flet.run(main=main)
\ No newline at end of file
@@ -0,0 +1,146 @@
+import polars as pl
+from db_operations import to_day
+
+# Column types of report frames as read from SQLite; also used so empty results
+# keep their schema. Date holds stored day numbers until it is cast to pl.Date.
+REPORT_SCHEMA = {
+    "Project": pl.String,
+    "Date": pl.Int32,
+    "Hours": pl.Float64,
+    "Description": pl.String,
+}
+
+# Column types of daily rollup frames, one row per project and day
+DAILY_SCHEMA = {
+    "Project": pl.String,
+    "Date": pl.Int32,
+    "Entries": pl.Int64,
+    "Hours": pl.Float64,
+}
+
+# Supported summary groupings; periods map to Polars truncate intervals
+REPORT_PERIODS = {
+    "day": "1d",
+    "week": "1w",
+    "month": "1mo",
+}
+
+
+class ReportEngine:
+    """Load report data straight into Polars and aggregate it there."""
+    
+    def __init__(self, db):
+        self.db = db
+    
+    @staticmethod
+    def _where(table: str, project_ids=None, from_date: str = None, to_date: str = None):
+        """Build the WHERE clause and parameters of the report filters on a table alias."""
+        conditions = []
+        params = []
+        if project_ids is not None:
+            conditions.append(f"{table}.project_id IN ({', '.join('?' * len(project_ids))})")
+            params.extend(project_ids)
+        if from_date:
+            conditions.append(f"{table}.day >= ?")
+            params.append(to_day(from_date))
+        if to_date:
+            conditions.append(f"{table}.day <= ?")
+            params.append(to_day(to_date))
+        return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+    
+    def load_entries(self, project_ids=None, from_date: str = None, to_date: str = None) -> pl.DataFrame:
+        """Load live and archived entries into a DataFrame, newest first.
+        
+        Filters by a list of project IDs (all projects when None) and date
+        range. Columns are Project, Date (pl.Date), Hours and Description.
+        """
+        where, params = self._where("e", project_ids, from_date, to_date)
+        df = pl.read_database(
+            f"""SELECT p.name AS Project, e.day AS Date, e.hours AS Hours,
+                       COALESCE(e.description, '') AS Description
+                FROM entries e
+                JOIN projects p ON p.id = e.project_id
+                {where}
+                ORDER BY e.day DESC, e.id DESC""",
+            connection=self.db.conn,
+            execute_options={"parameters": params},
+            schema_overrides=REPORT_SCHEMA,
+        )
+        # Day numbers count from 1970-01-01 like pl.Date, so the cast does not parse anything
+        df = df.with_columns(pl.col("Date").cast(pl.Date))
+        
+        if self.db.get_archived_totals(project_ids, from_date, to_date)[0]:
+            from archive import load_archived_report_frame
+            archived = load_archived_report_frame(self.db, project_ids, from_date, to_date)
+            if archived is not None:
+                df = pl.concat([df, archived]).sort("Date", descending=True, maintain_order=True)
+        return df
+    
+    def load_daily_totals(self, project_ids=None, from_date: str = None, to_date: str = None) -> pl.DataFrame:
+        """Load the daily rollup into a DataFrame, without reading raw entries.
+        
+        Takes the same filters as load_entries. Columns are Project, Date
+        (pl.Date), Entries and Hours, one row per project and day.
+        """
+        where, params = self._where("d", project_ids, from_date, to_date)
+        df = pl.read_database(
+            f"""SELECT p.name AS Project, d.day AS Date, d.entry_count AS Entries, d.total_hours AS Hours
+                FROM daily_totals d
+                JOIN projects p ON p.id = d.project_id
+                {where}
+                ORDER BY d.day, p.name""",
+            connection=self.db.conn,
+            execute_options={"parameters": params},
+            schema_overrides=DAILY_SCHEMA,
+        )
+        return df.with_columns(pl.col("Date").cast(pl.Date))
+    
+    def summarize(self, df: pl.DataFrame, by: str, by_project: bool = False) -> pl.DataFrame:
+        """Group a report or daily rollup frame by day, week, month or project.
+        
+        Periods are labelled by their first day. With by_project, periods are
+        further split per project. Returns the key columns (Project and/or
+        Period), Entries and Hours.
+        """
+        keys = []
+        if by_project or by == "project":
+            keys.append(pl.col("Project"))
+        if by in REPORT_PERIODS:
+            keys.append(pl.col("Date").dt.truncate(REPORT_PERIODS[by]).alias("Period"))
+        elif by != "project":
+            raise ValueError(f"Unsupported report grouping: {by}")
+        
+        return (
+            df.group_by(keys)
+            .agg(
+                self._entry_count_expr(df),
+                pl.col("Hours").sum(),
+            )
+            .sort([key.meta.output_name() for key in keys])
+        )
+    
+    def pivot(self, df: pl.DataFrame, by: str) -> pl.DataFrame:
+        """Pivot hours into one row per period and one column per project."""
+        if by not in REPORT_PERIODS:
+            raise ValueError(f"Unsupported report period: {by}")
+        
+        return (
+            self.summarize(df, by, by_project=True)
+            .pivot(on="Project", index="Period", values="Hours", sort_columns=True)
+            .sort("Period")
+            .fill_null(0)
+        )
+    
+    @staticmethod
+    def _entry_count_expr(df: pl.DataFrame) -> pl.Expr:
+        """Count entries: rollup frames carry an Entries column, report frames one row per entry."""
+        if "Entries" in df.columns:
+            return pl.col("Entries").sum()
+        return pl.len().alias("Entries")
+    
+    @staticmethod
+    def totals(df: pl.DataFrame):
+        """Get (entry_count, total_hours) of a report or daily rollup frame."""
+        if "Entries" in df.columns:
+            return df["Entries"].sum(), df["Hours"].sum()
+        return df.height, df["Hours"].sum()
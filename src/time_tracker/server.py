@@ -0,0 +1,514 @@
+import json
+import logging
+import queue
+import re
+import sqlite3
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from db_operations import Database
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Most writes applied in one transaction, and seconds a request waits for its write
+MAX_WRITE_BATCH = 1000
+WRITE_TIMEOUT = 30
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_PAGE_SIZE = 1000
+
+logger = logging.getLogger("time_tracker.server")
+
+
+class RequestError(Exception):
+    """An error reported to the client with an HTTP status and a JSON message."""
+    
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class WriteBatcher:
+    """Apply writes from many threads in grouped transactions on one connection.
+    
+    Writes queued while a batch is being committed are applied together in the
+    next one, so under load the commit cost is shared while a lone write is
+    not delayed. Each write runs in its own savepoint: a failing write is
+    rolled back and reported to its caller without affecting the rest.
+    """
+    
+    def __init__(self, db_path: str, max_batch: int = MAX_WRITE_BATCH):
+        self.db = Database()
+        self.db.connect(db_path)
+        self.max_batch = max_batch
+        self.batches = 0
+        self.writes = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="time-tracker-writer", daemon=True)
+        self._thread.start()
+    
+    def submit(self, func, *args):
+        """Run func(db, *args) in the next batch and return its result once committed.
+        
+        After WRITE_TIMEOUT seconds a write still in the queue is cancelled and
+        reported as 503: it was not applied and can be retried. A write already
+        being applied may still commit, and is reported as 202.
+        """
+        future = Future()
+        self._queue.put((func, args, future))
+        try:
+            return future.result(timeout=WRITE_TIMEOUT)
+        except FutureTimeoutError:
+            if future.cancel():
+                raise RequestError(
+                    HTTPStatus.SERVICE_UNAVAILABLE, "Write timed out in the queue and was not applied; retry it"
+                )
+            raise RequestError(
+                HTTPStatus.ACCEPTED,
+                "Write timed out while being applied and may have been applied; check before retrying",
+            )
+    
+    def close(self):
+        """Apply the writes already queued, then stop the writer and close its connection."""
+        self._queue.put(None)
+        self._thread.join()
+        self.db.close()
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._apply(batch)
+                    return
+                batch.append(item)
+            self._apply(batch)
+    
+    def _apply(self, batch):
+        conn = self.db.conn
+        results = []
+        try:
+            with self.db.transaction(immediate=True):
+                for func, args, future in batch:
+                    # Skip writes cancelled by a timed out submit
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    conn.execute("SAVEPOINT batched_write")
+                    try:
+                        result = func(self.db, *args)
+                    except Exception as ex:
+                        conn.execute("ROLLBACK TO batched_write")
+                        conn.execute("RELEASE batched_write")
+                        self.db.invalidate_cache()
+                        results.append((future, None, ex))
+                    else:
+                        conn.execute("RELEASE batched_write")
+                        results.append((future, result, None))
+        except Exception as ex:
+            logger.exception("write batch of %d failed", len(batch))
+            for _, _, future in batch:
+                if not future.cancelled():
+                    future.set_exception(ex)
+            return
+        
+        self.batches += 1
+        self.writes += len(batch)
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+# Payload validation
+def _require(payload: dict, field: str):
+    if field not in payload:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Missing field: {field}")
+    return payload[field]
+
+
+def _parse_date(value, field: str = "date") -> str:
+    try:
+        return date.fromisoformat(value).strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid {field} (expected YYYY-MM-DD): {value!r}")
+
+
+def _parse_hours(value) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not value > 0:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Hours must be a number greater than 0: {value!r}")
+    return float(value)
+
+
+def _parse_description(value) -> str:
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Description must be a string: {value!r}")
+    return value
+
+
+def _parse_name(value) -> str:
+    if not isinstance(value, str) or not value.strip():
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Project name must be a non-empty string")
+    return value.strip()
+
+
+def _parse_id(value, field: str) -> int:
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid {field}: {value!r}")
+    return value
+
+
+def _parse_new_entry(payload) -> tuple:
+    """Validate a new entry: (project_id or None, project name or None, date, hours, description)."""
+    if not isinstance(payload, dict):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Entries must be JSON objects")
+    if "project_id" in payload:
+        project = (_parse_id(payload["project_id"], "project_id"), None)
+    elif "project" in payload:
+        project = (None, _parse_name(payload["project"]))
+    else:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Missing field: project_id or project")
+    return (
+        *project,
+        _parse_date(_require(payload, "date")),
+        _parse_hours(_require(payload, "hours")),
+        _parse_description(payload.get("description")),
+    )
+
+
+def _parse_entry_changes(payload) -> dict:
+    """Validate the changed fields of an entry update."""
+    if not isinstance(payload, dict):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Entry updates must be JSON objects")
+    parsers = {"date": _parse_date, "hours": _parse_hours, "description": _parse_description}
+    return {field: parser(payload[field]) for field, parser in parsers.items() if field in payload}
+
+
+def _parse_entry_update(payload) -> tuple:
+    """Validate an entry update from a batch: (entry_id, changes)."""
+    changes = _parse_entry_changes(payload)
+    return _parse_id(_require(payload, "id"), "id"), changes
+
+
+def _entry_json(row) -> dict:
+    entry_id, project_id, entry_date, hours, description, created_at = row
+    return {
+        "id": entry_id,
+        "project_id": project_id,
+        "date": entry_date,
+        "hours": hours,
+        "description": description or "",
+        "created_at": created_at,
+    }
+
+
+# Writes, run by the WriteBatcher inside a transaction
+def _write_create_entries(db: Database, entries) -> list:
+    project_ids = None
+    entry_ids = []
+    for project_id, project_name, entry_date, hours, description in entries:
+        if project_id is None:
+            if project_ids is None:
+                project_ids = {name: existing_id for existing_id, name, _ in db.get_all_projects()}
+            if project_name not in project_ids:
+                project_ids[project_name] = db.create_project(project_name)
+            project_id = project_ids[project_name]
+        elif db.get_project(project_id) is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No such project: {project_id}")
+        entry_ids.append(db.create_entry(project_id, entry_date, hours, description))
+    return entry_ids
+
+
+def _write_update_entries(db: Database, updates) -> list:
+    entries = []
+    for entry_id, changes in updates:
+        entry = db.get_entry(entry_id)
+        if entry is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No such entry: {entry_id}")
+        values = {"date": entry[2], "hours": entry[3], "description": entry[4] or "", **changes}
+        db.update_entry(entry_id, values["date"], values["hours"], values["description"])
+        entries.append(_entry_json(db.get_entry(entry_id)))
+    return entries
+
+
+def _write_delete_entry(db: Database, entry_id: int):
+    if db.get_entry(entry_id) is None:
+        raise RequestError(HTTPStatus.NOT_FOUND, f"No such entry: {entry_id}")
+    db.delete_entry(entry_id)
+
+
+def _write_create_project(db: Database, name: str) -> int:
+    try:
+        return db.create_project(name)
+    except sqlite3.IntegrityError:
+        raise RequestError(HTTPStatus.CONFLICT, f"Project already exists: {name}")
+
+
+def _write_update_project(db: Database, project_id: int, name: str):
+    if db.get_project(project_id) is None:
+        raise RequestError(HTTPStatus.NOT_FOUND, f"No such project: {project_id}")
+    try:
+        db.update_project(project_id, name)
+    except sqlite3.IntegrityError:
+        raise RequestError(HTTPStatus.CONFLICT, f"Project already exists: {name}")
+
+
+def _write_delete_project(db: Database, project_id: int):
+    if db.get_project(project_id) is None:
+        raise RequestError(HTTPStatus.NOT_FOUND, f"No such project: {project_id}")
+    db.delete_project(project_id)
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """JSON API over one read connection per client connection; writes go through the server's WriteBatcher."""
+    
+    protocol_version = "HTTP/1.1"
+    server_version = "TimeTracker"
+    # Headers and body are written separately; without TCP_NODELAY each response stalls on a delayed ACK
+    disable_nagle_algorithm = True
+    
+    # (method, path pattern, handler name); path groups are passed as ints
+    ROUTES = [
+        ("GET", r"/projects", "list_projects"),
+        ("POST", r"/projects", "create_project"),
+        ("GET", r"/projects/(\d+)", "get_project"),
+        ("PATCH", r"/projects/(\d+)", "update_project"),
+        ("DELETE", r"/projects/(\d+)", "delete_project"),
+        ("GET", r"/projects/(\d+)/totals", "get_project_totals"),
+        ("GET", r"/entries", "list_entries"),
+        ("POST", r"/entries", "create_entries"),
+        ("PATCH", r"/entries", "update_entries"),
+        ("GET", r"/entries/(\d+)", "get_entry"),
+        ("PATCH", r"/entries/(\d+)", "update_entry"),
+        ("DELETE", r"/entries/(\d+)", "delete_entry"),
+        ("GET", r"/search", "search_entries"),
+    ]
+    _routes = [(method, re.compile(pattern + r"/?"), name) for method, pattern, name in ROUTES]
+    
+    def setup(self):
+        super().setup()
+        self.db = Database()
+        self.db.connect(self.server.db_path)
+    
+    def finish(self):
+        try:
+            super().finish()
+        finally:
+            self.db.close()
+    
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+    
+    def do_GET(self):
+        self._dispatch("GET")
+    
+    def do_POST(self):
+        self._dispatch("POST")
+    
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+    
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+    
+    def _dispatch(self, method: str):
+        url = urlsplit(self.path)
+        self.query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            body = self._read_body()
+            allowed = False
+            for route_method, pattern, name in self._routes:
+                match = pattern.fullmatch(url.path)
+                if match is None:
+                    continue
+                if route_method != method:
+                    allowed = True
+                    continue
+                status, result = getattr(self, f"handle_{name}")(*map(int, match.groups()), body=body)
+                self._send(status, result)
+                return
+            if allowed:
+                raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not allowed on {url.path}")
+            raise RequestError(HTTPStatus.NOT_FOUND, f"Not found: {url.path}")
+        except RequestError as ex:
+            self._send(ex.status, {"error": str(ex)})
+        except Exception as ex:
+            logger.exception("%s %s failed", method, self.path)
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(ex)})
+    
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        if not length:
+            return None
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Request body is not valid JSON")
+    
+    def _send(self, status: HTTPStatus, result):
+        data = b"" if result is None else json.dumps(result).encode()
+        self.send_response(status)
+        if data:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _write(self, func, *args):
+        return self.server.batcher.submit(func, *args)
+    
+    def _query_date(self, name: str):
+        value = self.query.get(name)
+        return _parse_date(value, name) if value else None
+    
+    def _query_int(self, name: str, default: int = None):
+        value = self.query.get(name)
+        if value is None:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid {name}: {value!r}")
+    
+    # Projects
+    def handle_list_projects(self, body):
+        return HTTPStatus.OK, [
+            {"id": project_id, "name": name, "created_at": created_at,
+             "entry_count": entry_count, "total_hours": total_hours}
+            for project_id, name, created_at, entry_count, total_hours in self.db.get_project_summaries()
+        ]
+    
+    def handle_create_project(self, body):
+        name = _parse_name(_require(body or {}, "name"))
+        project_id = self._write(_write_create_project, name)
+        return HTTPStatus.CREATED, {"id": project_id, "name": name}
+    
+    def handle_get_project(self, project_id, body):
+        project = self.db.get_project(project_id)
+        if project is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No such project: {project_id}")
+        return HTTPStatus.OK, {"id": project[0], "name": project[1], "created_at": project[2]}
+    
+    def handle_update_project(self, project_id, body):
+        name = _parse_name(_require(body or {}, "name"))
+        self._write(_write_update_project, project_id, name)
+        return HTTPStatus.OK, {"id": project_id, "name": name}
+    
+    def handle_delete_project(self, project_id, body):
+        self._write(_write_delete_project, project_id)
+        return HTTPStatus.NO_CONTENT, None
+    
+    def handle_get_project_totals(self, project_id, body):
+        if self.db.get_project(project_id) is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No such project: {project_id}")
+        entry_count, total_hours = self.db.get_entry_totals(
+            project_id, self._query_date("from"), self._query_date("to")
+        )
+        return HTTPStatus.OK, {"project_id": project_id, "entry_count": entry_count, "total_hours": total_hours}
+    
+    # Entries
+    def handle_list_entries(self, body):
+        """Page through live entries, newest first; pass the returned "next" as after_date and after_id."""
+        limit = min(max(self._query_int("limit", 50), 1), MAX_PAGE_SIZE)
+        after = None
+        if "after_date" in self.query:
+            # Without the ID, the entries of after_date would all be skipped
+            if "after_id" not in self.query:
+                raise RequestError(HTTPStatus.BAD_REQUEST, "after_id is required with after_date")
+            after = (self._query_date("after_date"), self._query_int("after_id"))
+        project_id = self._query_int("project_id")
+        rows = self.db.get_entries_page(
+            None if project_id is None else [project_id],
+            self._query_date("from"), self._query_date("to"), after, limit,
+        )
+        entries = [
+            _entry_json((entry_id, project_id, entry_date, hours, description, created_at))
+            for entry_id, entry_date, hours, description, created_at, project_id in rows
+        ]
+        next_page = None
+        if len(rows) == limit:
+            next_page = {"after_date": rows[-1][1], "after_id": rows[-1][0]}
+        return HTTPStatus.OK, {"entries": entries, "next": next_page}
+    
+    def handle_create_entries(self, body):
+        """Create one entry from an object, or many from a list in a single write."""
+        if isinstance(body, list):
+            entry_ids = self._write(_write_create_entries, [_parse_new_entry(entry) for entry in body])
+            return HTTPStatus.CREATED, {"ids": entry_ids}
+        entry_id, = self._write(_write_create_entries, [_parse_new_entry(body)])
+        return HTTPStatus.CREATED, {"id": entry_id}
+    
+    def handle_update_entries(self, body):
+        """Update many entries in a single write from a list of objects with an id."""
+        if not isinstance(body, list):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Expected a list of entry updates")
+        updates = [_parse_entry_update(update) for update in body]
+        return HTTPStatus.OK, self._write(_write_update_entries, updates)
+    
+    def handle_get_entry(self, entry_id, body):
+        entry = self.db.get_entry(entry_id)
+        if entry is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No such entry: {entry_id}")
+        return HTTPStatus.OK, _entry_json(entry)
+    
+    def handle_update_entry(self, entry_id, body):
+        entry, = self._write(_write_update_entries, [(entry_id, _parse_entry_changes(body))])
+        return HTTPStatus.OK, entry
+    
+    def handle_delete_entry(self, entry_id, body):
+        self._write(_write_delete_entry, entry_id)
+        return HTTPStatus.NO_CONTENT, None
+    
+    def handle_search_entries(self, body):
+        query = self.query.get("q", "")
+        limit = min(max(self._query_int("limit", 50), 1), MAX_PAGE_SIZE)
+        rows = self.db.search_entries(query, self._query_date("from"), self._query_date("to"), limit)
+        return HTTPStatus.OK, [
+            {"id": entry_id, "project_id": project_id, "project": project_name,
+             "date": entry_date, "hours": hours, "description": description or ""}
+            for entry_id, project_name, entry_date, hours, description, project_id in rows
+        ]
+
+
+class TimeTrackerServer(ThreadingHTTPServer):
+    """HTTP server with one thread per client connection and a shared WriteBatcher."""
+    
+    daemon_threads = True
+    request_queue_size = 128
+    
+    def __init__(self, db_path: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.db_path = db_path
+        self.batcher = WriteBatcher(db_path)
+        try:
+            super().__init__((host, port), RequestHandler)
+        except BaseException:
+            self.batcher.close()
+            raise
+    
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
+
+
+def serve(db_path: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    """Serve the JSON API until interrupted."""
+    with TimeTrackerServer(db_path, host, port) as server:
+        logger.info("serving %s on http://%s:%d", db_path, *server.server_address[:2])
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,177 @@
+"""Archived entries stay with their own database and survive rolled-back deletions and restores."""
+import os
+import shutil
+
+import pytest
+
+from archive import archive_entries, iter_archived_chunks
+from backup import BACKUP_KEEP_SETTING, create_backup, get_snapshot_archive_dir, list_backups, restore_backup
+from db_operations import Database
+
+
+@pytest.fixture
+def open_db(tmp_path):
+    databases = []
+    
+    def open_database(name: str) -> Database:
+        database = Database()
+        database.connect(str(tmp_path / f"{name}.db"))
+        databases.append(database)
+        return database
+    
+    yield open_database
+    for database in databases:
+        database.close()
+
+
+def add_archived_project(db: Database, description: str, archived: int) -> int:
+    project_id = db.create_project("Shared name")
+    db.create_entries_bulk((project_id, f"2020-01-{day:02d}", 1.0, description) for day in range(1, archived + 1))
+    db.create_entry(project_id, "2025-01-01", 1.0, description)
+    assert archive_entries(db, "2024-01-01") == archived
+    return project_id
+
+
+def test_databases_in_one_folder_keep_separate_archives(open_db):
+    personal = open_db("personal")
+    work = open_db("work")
+    personal_id = add_archived_project(personal, "personal", 3)
+    work_id = add_archived_project(work, "work", 5)
+    
+    assert personal.get_archive_dir() != work.get_archive_dir()
+    assert {entry[3] for entry in work.get_entries_for_project(work_id)} == {"work"}
+    assert len(work.get_entries_for_project(work_id)) == 6
+    
+    work.delete_project(work_id)
+    assert len(personal.get_entries_for_project(personal_id)) == 4
+    assert os.path.isdir(os.path.join(personal.get_archive_dir(), f"project_id={personal_id}"))
+
+
+def test_rolled_back_project_deletion_keeps_archive_files(open_db):
+    db = open_db("tracker")
+    project_id = add_archived_project(db, "kept", 3)
+    
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.delete_project(project_id)
+            raise RuntimeError("abort")
+    
+    # A deletion rolled back to a savepoint inside a committed transaction
+    with db.transaction():
+        db.conn.execute("SAVEPOINT deletion")
+        db.delete_project(project_id)
+        db.conn.execute("ROLLBACK TO deletion")
+        db.conn.execute("RELEASE deletion")
+    
+    assert len(db.get_entries_for_project(project_id)) == 4
+    assert db.verify_project_totals() == []
+    
+    with db.transaction():
+        db.delete_project(project_id)
+        assert os.path.isdir(os.path.join(db.get_archive_dir(), f"project_id={project_id}"))
+    assert not os.path.exists(os.path.join(db.get_archive_dir(), f"project_id={project_id}"))
+
+
+def assert_entries(db: Database, project_id: int, count: int):
+    assert len(db.get_entries_for_project(project_id)) == count
+    assert db.verify_project_totals() == []
+    assert db.verify_daily_totals() == []
+
+
+def test_restores_move_archive_files_both_ways(open_db):
+    db = open_db("tracker")
+    project_id = db.create_project("Project")
+    db.create_entries_bulk((project_id, f"2020-01-{day:02d}", 1.0, "old") for day in range(1, 6))
+    db.create_entries_bulk((project_id, f"2025-01-{day:02d}", 1.0, "new") for day in range(1, 6))
+    before_archive, _, _ = create_backup(db.db_path, keep=0)
+    assert archive_entries(db, "2024-01-01") == 5
+    
+    pre_restore, _ = restore_backup(db, before_archive)
+    assert_entries(db, project_id, 10)
+    
+    # Undoing the restore brings the orphaned archive file back
+    restore_backup(db, pre_restore)
+    assert_entries(db, project_id, 10)
+    assert archive_entries(db, "2024-01-01") == 0
+
+
+def test_restore_takes_deleted_archive_files_from_the_snapshot(open_db):
+    db = open_db("tracker")
+    project_id = add_archived_project(db, "archived", 3)
+    snapshot, _, _ = create_backup(db.db_path, keep=0)
+    assert os.path.isdir(os.path.join(get_snapshot_archive_dir(snapshot), f"project_id={project_id}"))
+    
+    db.delete_project(project_id)
+    restore_backup(db, snapshot)
+    assert_entries(db, project_id, 4)
+
+
+def test_restore_refuses_snapshot_with_missing_archive_files(open_db):
+    db = open_db("tracker")
+    project_id = add_archived_project(db, "archived", 3)
+    snapshot, _, _ = create_backup(db.db_path, keep=0)
+    shutil.rmtree(get_snapshot_archive_dir(snapshot))
+    db.delete_project(project_id)
+    
+    with pytest.raises(ValueError):
+        restore_backup(db, snapshot)
+    assert db.get_project(project_id) is None
+
+
+def test_restoring_the_oldest_snapshot_at_the_keep_limit(open_db):
+    db = open_db("tracker")
+    project_id = add_archived_project(db, "archived", 3)
+    db.set_setting(BACKUP_KEEP_SETTING, "3")
+    oldest, _, _ = create_backup(db.db_path, keep=3)
+    db.create_entry(project_id, "2025-02-01", 1.0, "after")
+    for _ in range(2):
+        create_backup(db.db_path, keep=3)
+    
+    pre_restore, _ = restore_backup(db, oldest)
+    assert_entries(db, project_id, 4)
+    paths = [path for path, _, _ in list_backups(db.db_path)]
+    assert oldest in paths and pre_restore in paths
+    
+    restore_backup(db, pre_restore)
+    assert_entries(db, project_id, 5)
+
+
+def test_search_finds_archived_entries(open_db):
+    db = open_db("tracker")
+    project_id = db.create_project("Project")
+    db.create_entry(project_id, "2020-03-02", 1.0, "Call with Client-X about invoices")
+    db.create_entry(project_id, "2025-03-02", 1.0, "client x follow-up")
+    db.create_entry(project_id, "2025-03-03", 1.0, "Unrelated work")
+    assert archive_entries(db, "2024-01-01") == 1
+    
+    results = db.search_entries("client x")
+    assert [row[4] for row in results] == ["client x follow-up", "Call with Client-X about invoices"]
+    assert results[1][1:4] == ("Project", "2020-03-02", 1.0)
+    assert [row[4] for row in db.search_entries("invoic")] == ["Call with Client-X about invoices"]
+    assert db.search_entries("client", from_date="2021-01-01") == results[:1]
+    assert len(db.search_entries("client", limit=1)) == 1
+
+
+def test_archived_chunks_stream_newest_first_across_years(open_db):
+    db = open_db("tracker")
+    first = db.create_project("First")
+    second = db.create_project("Second")
+    rows = []
+    for year in (2019, 2020, 2021):
+        for month in range(1, 13):
+            rows.append((first, f"{year}-{month:02d}-01", 1.0, f"first {year}"))
+            rows.append((second, f"{year}-{month:02d}-15", 2.0, None))
+    db.create_entries_bulk(rows)
+    assert archive_entries(db, "2024-01-01") == len(rows)
+    
+    chunks = list(iter_archived_chunks(db, chunk_size=10))
+    assert max(len(chunk) for chunk in chunks) == 10
+    archived = [row for chunk in chunks for row in chunk]
+    assert [row[1] for row in archived] == sorted((row[1] for row in rows), reverse=True)
+    assert archived[0] == ("Second", "2021-12-15", 2.0, "")
+    names = {first: "First", second: "Second"}
+    assert sorted(archived) == sorted((names[project_id], day, hours, description or "")
+                                      for project_id, day, hours, description in rows)
+    
+    filtered = [row for chunk in iter_archived_chunks(db, [first], "2020-03-01", "2020-05-31") for row in chunk]
+    assert filtered == [("First", f"2020-{month:02d}-01", 1.0, "first 2020") for month in (5, 4, 3)]
@@ -0,0 +1,43 @@
+"""AsyncDatabase runs methods on its worker thread and refuses generators and context managers."""
+import asyncio
+import threading
+
+import pytest
+
+from db_operations import AsyncDatabase, Database
+
+
+@pytest.fixture
+def async_db(tmp_path):
+    database = Database()
+    database.connect(str(tmp_path / "tracker.db"))
+    async_database = AsyncDatabase(database)
+    yield async_database
+    asyncio.run(async_database.close())
+
+
+def test_methods_run_on_the_worker_thread(async_db):
+    threads = []
+    
+    def create_and_read(db):
+        threads.append(threading.current_thread())
+        with db.transaction():
+            project_id = db.create_project("Project")
+            db.create_entry(project_id, "2025-01-01", 1.0, "Work")
+        return [row for chunk in db.iter_entry_chunks() for row in chunk]
+    
+    async def main():
+        rows = await async_db.run(create_and_read, async_db.db)
+        return rows, await async_db.get_all_projects()
+    
+    rows, projects = asyncio.run(main())
+    assert threads[0] is not threading.main_thread()
+    assert [row[0] for row in rows] == ["Project"]
+    assert [project[1] for project in projects] == ["Project"]
+
+
+@pytest.mark.parametrize("name", ["transaction", "iter_entry_chunks"])
+def test_generators_and_context_managers_are_not_exposed(async_db, name):
+    with pytest.raises(AttributeError, match="run()"):
+        getattr(async_db, name)
+    assert not hasattr(async_db, name)
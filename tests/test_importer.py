@@ -0,0 +1,108 @@
+"""Importing entries: validation, skip counts, project matching and the single transaction."""
+from datetime import date
+
+import polars as pl
+import pytest
+
+from db_operations import Database
+from importer import import_entries
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database()
+    database.connect(str(tmp_path / "tracker.db"))
+    yield database
+    database.close()
+
+
+def write_csv(tmp_path, text: str) -> str:
+    path = tmp_path / "entries.csv"
+    path.write_text(text)
+    return str(path)
+
+
+def all_entries(db: Database):
+    return sorted(
+        (db.get_project(project_id)[1], day, hours, description)
+        for project_id, _, _ in db.get_all_projects()
+        for _, day, hours, description, _ in db.get_entries_for_project(project_id)
+    )
+
+
+def test_invalid_rows_are_skipped_and_counted(db, tmp_path):
+    path = write_csv(tmp_path, "\n".join([
+        "project , DATE,Hours,Description",
+        "Acme,2024-01-31,1.5,Valid",
+        " Acme ,2024-02-29, 2 ,Padded",
+        "Acme,2023-02-29,1,No such day",
+        "Acme,31/01/2024,1,Wrong format",
+        "Acme,,1,No date",
+        "Acme,2024-01-31,0,Zero hours",
+        "Acme,2024-01-31,-1,Negative hours",
+        "Acme,2024-01-31,many,Hours not a number",
+        ",2024-01-31,1,No project",
+        "Globex,2024-03-01,8,",
+    ]))
+    
+    assert import_entries(db, path) == (3, 7)
+    assert all_entries(db) == [
+        ("Acme", "2024-01-31", 1.5, "Valid"),
+        ("Acme", "2024-02-29", 2.0, "Padded"),
+        ("Globex", "2024-03-01", 8.0, ""),
+    ]
+    assert db.verify_project_totals() == []
+
+
+def test_known_projects_are_reused_and_unknown_ones_created(db, tmp_path):
+    acme_id = db.create_project("Acme")
+    path = write_csv(tmp_path, "Project,Date,Hours\nAcme,2024-01-01,1\nInitech,2024-01-02,2\nInitech,2024-01-03,3\n")
+    
+    assert import_entries(db, path, chunk_size=1) == (3, 0)
+    projects = {name: project_id for project_id, name, _ in db.get_all_projects()}
+    assert projects["Acme"] == acme_id
+    assert sorted(projects) == ["Acme", "Initech"]
+    assert [row[3] for row in db.get_entries_for_project(projects["Initech"])] == ["", ""]
+
+
+def test_excel_dates_are_imported(db, tmp_path):
+    path = str(tmp_path / "entries.xlsx")
+    pl.DataFrame({
+        "Project": ["Acme", "Acme"],
+        "Date": [date(2024, 1, 31), date(1969, 12, 31)],
+        "Hours": [1.0, -2.0],
+        "Description": ["From Excel", "Negative"],
+    }).write_excel(path)
+    
+    assert import_entries(db, path) == (1, 1)
+    assert all_entries(db) == [("Acme", "2024-01-31", 1.0, "From Excel")]
+
+
+def test_a_failed_import_leaves_no_entries_or_projects(db, tmp_path, monkeypatch):
+    path = write_csv(tmp_path, "Project,Date,Hours\nAcme,2024-01-01,1\nGlobex,2024-01-02,2\n")
+    create_entries_bulk = db.create_entries_bulk
+    calls = []
+    
+    def fail_on_second_chunk(rows):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+        return create_entries_bulk(rows)
+    
+    monkeypatch.setattr(db, "create_entries_bulk", fail_on_second_chunk)
+    with pytest.raises(RuntimeError):
+        import_entries(db, path, chunk_size=1)
+    assert db.get_all_projects() == []
+    assert db.verify_project_totals() == []
+
+
+@pytest.mark.parametrize("name, text", [
+    ("entries.csv", "Project,Hours\nAcme,1\n"),
+    ("entries.txt", "Project,Date,Hours\nAcme,2024-01-01,1\n"),
+])
+def test_unreadable_files_are_rejected(db, tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    
+    with pytest.raises(ValueError):
+        import_entries(db, str(path))
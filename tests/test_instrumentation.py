@@ -0,0 +1,44 @@
+"""Query instrumentation records every statement, including those run on the connection."""
+import pytest
+
+from db_operations import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database()
+    database.connect(str(tmp_path / "tracker.db"))
+    database.set_instrumentation(True, slow_query_ms=0)
+    yield database
+    database.close()
+
+
+def test_connection_level_statements_are_recorded(db):
+    project_id = db.create_project("Project")
+    db.reset_query_stats()
+    
+    db.start_timer(project_id, "timed")
+    db.stop_timer(project_id)
+    db.get_all_projects()
+    with db.transaction(immediate=True):
+        pass
+    db.conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+    db.conn.executemany("INSERT INTO settings (key, value) VALUES (?, ?)", [("a", "1"), ("b", "2")])
+    
+    stats = db.get_query_stats()
+    statements = stats["statements"]
+    assert statements["SELECT COUNT(*) FROM entries"]["rows"] == 1
+    assert statements["INSERT INTO settings (key, value) VALUES (?, ...)"]["calls"] == 1
+    assert "PRAGMA data_version" in statements
+    assert "BEGIN IMMEDIATE" in statements
+    assert any(sql.startswith("DELETE FROM running_timers") for sql in statements)
+    assert any(query["sql"] == "SELECT COUNT(*) FROM entries" for query in stats["slow_queries"])
+
+
+def test_helpers_without_sql_are_not_timed(db):
+    db.reset_query_stats()
+    db.get_archive_dir()
+    db.invalidate_cache()
+    db.get_all_projects()
+    
+    assert set(db.get_query_stats()["methods"]) == {"get_all_projects"}
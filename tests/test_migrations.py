@@ -0,0 +1,92 @@
+"""Migration 8 turns the text dates of a version 7 database into day numbers."""
+import sqlite3
+
+import pytest
+
+import db_operations
+from db_operations import Database, to_day
+
+DATES = ["1900-02-28", "1969-12-31", "1970-01-01", "2023-01-31", "2024-02-29", "2024-12-31"]
+
+
+@pytest.fixture
+def version_7_path(tmp_path, monkeypatch):
+    """Create a version 7 database with text dates; the entry with the highest ID is deleted."""
+    path = str(tmp_path / "tracker.db")
+    db = Database()
+    db.conn = sqlite3.connect(path)
+    monkeypatch.setattr(db_operations, "SCHEMA_VERSION", 7)
+    db._create_tables()
+    db._migrate()
+    monkeypatch.undo()
+    
+    with db.conn:
+        db.conn.execute("INSERT INTO projects (name) VALUES ('Project')")
+        db.conn.executemany(
+            "INSERT INTO entries (project_id, date, hours, description) VALUES (1, ?, 1.5, ?)",
+            [(value, f"Work on {value}") for value in DATES + ["2025-06-30"]],
+        )
+        db.conn.execute("DELETE FROM entries WHERE date = '2025-06-30'")
+        db.conn.execute(
+            """INSERT INTO archived_daily_totals (project_id, date, entry_count, total_hours)
+               VALUES (1, '1899-12-31', 2, 3.0)"""
+        )
+        db.conn.execute(
+            "INSERT INTO daily_totals (project_id, date, entry_count, total_hours) VALUES (1, '1899-12-31', 2, 3.0)"
+        )
+        db.conn.execute(
+            "UPDATE project_totals SET entry_count = entry_count + 2, total_hours = total_hours + 3, "
+            "first_date = '1899-12-31'"
+        )
+    assert db.conn.execute("PRAGMA user_version").fetchone()[0] == 7
+    db.conn.close()
+    return path
+
+
+@pytest.fixture
+def db(version_7_path):
+    database = Database()
+    database.connect(version_7_path)
+    yield database
+    database.close()
+
+
+def test_dates_become_day_numbers(db):
+    assert db.conn.execute("PRAGMA user_version").fetchone()[0] == db_operations.SCHEMA_VERSION
+    assert db.conn.execute("SELECT day FROM entries ORDER BY id").fetchall() == [(to_day(value),) for value in DATES]
+    assert to_day("1969-12-31") == -1 and to_day("1970-01-01") == 0
+    assert db.conn.execute("SELECT first_day, last_day FROM project_totals").fetchone() == (
+        to_day("1899-12-31"), to_day("2024-12-31"),
+    )
+    assert db.conn.execute("SELECT day FROM archived_daily_totals").fetchall() == [(to_day("1899-12-31"),)]
+    assert db.verify_project_totals() == []
+    assert db.verify_daily_totals() == []
+
+
+def test_api_returns_iso_dates(db):
+    assert [row[1] for row in db.get_entries_for_project(1)] == sorted(DATES, reverse=True)
+    assert db.get_entry(2)[2] == "1969-12-31"
+    assert [row[1] for row in db.get_daily_totals([1])] == ["1899-12-31"] + DATES
+    assert db.get_entry_totals(1, "1969-12-31", "1970-01-01")[0] == 2
+
+
+def test_deleted_ids_are_not_reused(db):
+    assert db.create_entry(1, "2025-01-01", 1.0, "After the migration") == len(DATES) + 2
+
+
+def test_triggers_fire_after_migration(db):
+    assert [row[2] for row in db.search_entries("work 1969")] == ["1969-12-31"]
+    
+    entry_id = db.create_entry(1, "1969-07-20", 2.0, "Moon landing notes")
+    assert [row[0] for row in db.search_entries("moon")] == [entry_id]
+    assert ("Project", "1969-07-20", 1, 2.0) in db.get_daily_totals([1])
+    
+    db.update_entry(entry_id, "1969-07-21", 2.0, "Lunar notes")
+    assert db.search_entries("moon") == []
+    assert [row[1] for row in db.get_daily_totals([1], "1969-07-01", "1969-07-31")] == ["1969-07-21"]
+    
+    db.delete_entry(entry_id)
+    assert db.search_entries("lunar") == []
+    assert db.get_daily_totals([1], "1969-07-01", "1969-07-31") == []
+    assert db.verify_project_totals() == []
+    assert db.verify_daily_totals() == []
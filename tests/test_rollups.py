@@ -0,0 +1,151 @@
+"""The daily_totals and project_totals rollups match the raw entries after random changes."""
+import random
+
+import pytest
+from polars.testing import assert_frame_equal
+
+from archive import archive_entries
+from db_operations import Database
+from reports import REPORT_PERIODS, ReportEngine
+
+PROJECTS = 5
+SEEDS = range(5)
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database()
+    database.connect(str(tmp_path / "rollups.db"))
+    yield database
+    database.close()
+
+
+def create_projects(db: Database):
+    return [db.create_project(f"Project {number}") for number in range(PROJECTS)]
+
+
+def random_date(rng: random.Random) -> str:
+    return f"{rng.randint(2023, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+
+def random_hours(rng: random.Random) -> float:
+    return rng.randint(1, 32) / 4
+
+
+def live_entry_ids(db: Database):
+    return [row[0] for row in db.conn.execute("SELECT id FROM entries")]
+
+
+def apply_random_changes(db: Database, project_ids, rng: random.Random, steps: int):
+    """Insert, edit, move and delete entries one by one and in bulk."""
+    entry_ids = live_entry_ids(db)
+    for _ in range(steps):
+        action = rng.random()
+        if action < 0.35 or not entry_ids:
+            entry_ids.append(db.create_entry(rng.choice(project_ids), random_date(rng), random_hours(rng), "work"))
+        elif action < 0.45:
+            db.create_entries_bulk(
+                (rng.choice(project_ids), random_date(rng), random_hours(rng), "bulk")
+                for _ in range(rng.randint(1, 20))
+            )
+            entry_ids = live_entry_ids(db)
+        elif action < 0.6:
+            # Moves the entry to another day
+            db.update_entry(rng.choice(entry_ids), random_date(rng), random_hours(rng), "edited")
+        elif action < 0.7:
+            # No API moves entries between projects; the update triggers must still handle it
+            with db.transaction():
+                db.conn.execute(
+                    "UPDATE entries SET project_id = ? WHERE id = ?",
+                    (rng.choice(project_ids), rng.choice(entry_ids)),
+                )
+        elif action < 0.78:
+            db.update_entries_bulk(
+                (entry_id, random_date(rng), random_hours(rng), "bulk edited")
+                for entry_id in rng.sample(entry_ids, min(len(entry_ids), 10))
+            )
+        elif action < 0.93:
+            db.delete_entry(entry_ids.pop(rng.randrange(len(entry_ids))))
+        else:
+            removed = rng.sample(entry_ids, min(len(entry_ids), 10))
+            db.delete_entries_bulk(removed)
+            entry_ids = [entry_id for entry_id in entry_ids if entry_id not in removed]
+
+
+def assert_rollups_match(db: Database):
+    assert db.verify_daily_totals() == []
+    assert db.verify_project_totals() == []
+
+
+def assert_summaries_match(db: Database, project_ids=None, from_date: str = None, to_date: str = None):
+    """Rollup-based report summaries equal the ones computed from raw entries."""
+    engine = ReportEngine(db)
+    daily = engine.load_daily_totals(project_ids, from_date, to_date)
+    entries = engine.load_entries(project_ids, from_date, to_date)
+    
+    assert engine.totals(daily) == pytest.approx(engine.totals(entries))
+    for by in (*REPORT_PERIODS, "project"):
+        assert_frame_equal(engine.summarize(daily, by), engine.summarize(entries, by), check_dtypes=False)
+        assert_frame_equal(
+            engine.summarize(daily, by, by_project=True),
+            engine.summarize(entries, by, by_project=True),
+            check_dtypes=False,
+        )
+    for by in REPORT_PERIODS:
+        assert_frame_equal(engine.pivot(daily, by), engine.pivot(entries, by), check_dtypes=False)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_rollups_match_entries_after_random_changes(db, seed):
+    rng = random.Random(seed)
+    project_ids = create_projects(db)
+    apply_random_changes(db, project_ids, rng, 1500)
+    
+    assert_rollups_match(db)
+    assert_summaries_match(db)
+    assert_summaries_match(db, project_ids[:2], "2024-01-01", "2024-12-31")
+    assert_summaries_match(db, project_ids[2:3], from_date="2025-03-01")
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_rollups_match_entries_with_archived_entries(db, seed):
+    rng = random.Random(seed)
+    project_ids = create_projects(db)
+    apply_random_changes(db, project_ids, rng, 800)
+    archive_entries(db, "2024-01-01")
+    # New entries land on archived days too
+    apply_random_changes(db, project_ids, rng, 800)
+    
+    assert_rollups_match(db)
+    assert_summaries_match(db)
+    assert_summaries_match(db, project_ids[1:4], "2023-06-01", "2024-06-30")
+
+
+def test_rollups_match_entries_after_deleting_a_project(db):
+    rng = random.Random(0)
+    project_ids = create_projects(db)
+    apply_random_changes(db, project_ids, rng, 800)
+    archive_entries(db, "2024-01-01")
+    db.delete_project(project_ids[0])
+    
+    assert_rollups_match(db)
+    assert_summaries_match(db)
+    assert db.get_daily_totals([project_ids[0]]) == []
+
+
+def test_verify_finds_and_rebuild_repairs_drift(db):
+    rng = random.Random(0)
+    project_ids = create_projects(db)
+    apply_random_changes(db, project_ids, rng, 300)
+    with db.transaction():
+        db.conn.execute("""
+            UPDATE daily_totals SET total_hours = total_hours + 1
+            WHERE (project_id, day) IN (SELECT project_id, day FROM daily_totals LIMIT 3)
+        """)
+        db.conn.execute("UPDATE project_totals SET entry_count = entry_count + 1")
+    
+    assert len(db.verify_daily_totals()) == 3
+    assert len(db.verify_project_totals()) == PROJECTS
+    db.rebuild_daily_totals()
+    db.rebuild_project_totals()
+    assert_rollups_match(db)
@@ -0,0 +1,80 @@
+"""Full-text search: prefix matching, literal queries, date filters and ranking over all matches."""
+import pytest
+
+from db_operations import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database()
+    database.connect(str(tmp_path / "tracker.db"))
+    yield database
+    database.close()
+
+
+def descriptions(rows):
+    return [row[4] for row in rows]
+
+
+def test_every_word_matches_a_word_prefix(db):
+    project_id = db.create_project("Project")
+    db.create_entry(project_id, "2025-01-01", 1.0, "Invoice for Acme Corp")
+    db.create_entry(project_id, "2025-01-02", 1.0, "Acme planning")
+    db.create_entry(project_id, "2025-01-03", 1.0, "Unrelated")
+    
+    assert descriptions(db.search_entries("acm inv")) == ["Invoice for Acme Corp"]
+    assert sorted(descriptions(db.search_entries("ACME"))) == ["Acme planning", "Invoice for Acme Corp"]
+    assert db.search_entries("corporate") == []
+    row = db.search_entries("planning")[0]
+    assert row[1:4] == ("Project", "2025-01-02", 1.0) and row[5] == project_id
+
+
+@pytest.mark.parametrize("query", ['"acme', "acme AND", "NEAR(acme", "acme*", "-acme", "description:acme", "acme^"])
+def test_fts_syntax_is_not_interpreted(db, query):
+    project_id = db.create_project("Project")
+    db.create_entry(project_id, "2025-01-01", 1.0, "Acme and the near description")
+    
+    assert descriptions(db.search_entries(query)) == ["Acme and the near description"]
+
+
+def test_queries_without_words_match_nothing(db):
+    project_id = db.create_project("Project")
+    db.create_entry(project_id, "2025-01-01", 1.0, "Acme")
+    
+    assert db.search_entries("") == []
+    assert db.search_entries('"*() -') == []
+
+
+def test_date_range_filters_matches(db):
+    project_id = db.create_project("Project")
+    for day in range(1, 6):
+        db.create_entry(project_id, f"2025-01-{day:02d}", 1.0, f"Acme day {day}")
+    
+    rows = db.search_entries("acme", from_date="2025-01-02", to_date="2025-01-04")
+    assert sorted(row[2] for row in rows) == ["2025-01-02", "2025-01-03", "2025-01-04"]
+    assert len(db.search_entries("acme", to_date="2025-01-01")) == 1
+
+
+def test_best_matches_come_first_regardless_of_age(db):
+    project_id = db.create_project("Project")
+    db.create_entry(project_id, "2020-01-01", 1.0, "Acme Acme")
+    db.create_entries_bulk(
+        (project_id, "2025-01-01", 1.0, f"Weekly sync with the team about Acme item {index}")
+        for index in range(3000)
+    )
+    
+    rows = db.search_entries("acme", limit=5)
+    assert len(rows) == 5
+    assert rows[0][4] == "Acme Acme"
+    assert descriptions(db.search_entries("acme", from_date="2019-01-01", to_date="2021-01-01")) == ["Acme Acme"]
+
+
+def test_index_follows_edits_and_deletes(db):
+    project_id = db.create_project("Project")
+    entry_id = db.create_entry(project_id, "2025-01-01", 1.0, "Acme")
+    db.update_entry(entry_id, "2025-01-01", 1.0, "Globex")
+    assert db.search_entries("acme") == []
+    assert descriptions(db.search_entries("globex")) == ["Globex"]
+    
+    db.delete_entry(entry_id)
+    assert db.search_entries("globex") == []